@@ -43,6 +43,8 @@ class CWRFile(object):
     the metadata, and Transmission for the file contents.
     """
 
+    __slots__ = ('_tag', '_transmission')
+
     def __init__(self,
                  tag,
                  transmission
@@ -117,6 +119,8 @@ class FileTag(object):
     indicating the version of the CWR standard specification used on the file.
     """
 
+    __slots__ = ('_year', '_sequence_n', '_sender', '_receiver', '_version')
+
     def __init__(self,
                  year,
                  sequence_n,
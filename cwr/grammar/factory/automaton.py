@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+from cwr.grammar.factory.config import rule_options_list
+from cwr.grammar.factory.rule import RuleFactory
+
+"""
+Automatons for the structure of the CWR transactions and groups.
+
+The Pyparsing grammar checks the structure of a transaction by trying its
+rules in order, which means that a record may be parsed several times before
+finding the alternative which accepts it.
+
+But the structure of transactions and groups, as defined on the configuration
+files, only depends on the record type of each record. So it can be checked
+with an automaton which reads the record types one by one, without parsing
+the records.
+
+The automatons are created from the same configuration as the grammar. As the
+rules do not contain recursion, the nested rules are expanded into a single
+nondeterministic automaton. Its deterministic states are computed while
+reading the records, and stored for the next time, so each record is
+processed with a single lookup.
+
+For each record type, the automaton returns the ids of the record rules which
+accept it, along the state reached for each of them, so the record can be
+parsed directly with the correct rule.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Rule types parsed as a single record
+_record_types = ('record', 'transaction_record')
+
+
+class RecordAutomaton(object):
+    """
+    Automaton accepting sequences of record types.
+
+    It is composed of a nondeterministic automaton, whose transitions are the
+    record rules. The states used while reading are the sets of these
+    automaton's states.
+    """
+
+    def __init__(self, rule_id, node, heads):
+        """
+        Constructs a RecordAutomaton.
+
+        :param rule_id: id of the rule for the automaton
+        :param node: tree of the rule structure
+        :param heads: record types accepted by each record rule
+        """
+        self._rule_id = rule_id
+        self._node = node
+        self._heads = heads
+
+        # Transitions for each state, as (record rule id, state) tuples
+        self._transitions = []
+        # Empty transitions for each state
+        self._empty = []
+
+        start = self._new_state()
+        self._final = self._compile(node, start)
+
+        self._start = self._closure([start])
+
+        # Transitions already computed, indexed by state and record type
+        self._steps = {}
+
+    def __or__(self, other):
+        rule_id = '%s | %s' % (self._rule_id, other.rule_id)
+        return RecordAutomaton(rule_id, ('option', [self._node, other.node]),
+                               self._heads)
+
+    @property
+    def node(self):
+        """
+        Tree with the structure of the rule.
+
+        :return: the rule structure
+        """
+        return self._node
+
+    @property
+    def rule_id(self):
+        """
+        Id of the rule for the automaton.
+
+        :return: the rule id
+        """
+        return self._rule_id
+
+    @property
+    def start(self):
+        """
+        Initial state of the automaton.
+
+        :return: the initial state
+        """
+        return self._start
+
+    def accepts(self, state):
+        """
+        Indicates if the state is a final one, and so the records read until
+        reaching it compose a valid sequence.
+
+        :param state: the state to check
+        :return: True if the state is final, False otherwise
+        """
+        return self._final in state
+
+    def step(self, state, record_type):
+        """
+        Reads a record type.
+
+        This returns the ids of the rules which can parse the record, along
+        the state reached for each. These are sorted in the same order as
+        they appear on the rules, so the first one is the one the grammar
+        would try first.
+
+        If the record type is not accepted, then an empty list is returned.
+
+        :param state: the current state
+        :param record_type: the record type to read
+        :return: a list of (record rule id, state) tuples
+        """
+        key = (state, record_type)
+
+        if key not in self._steps:
+            self._steps[key] = self._compute_step(state, record_type)
+
+        return self._steps[key]
+
+    def match(self, record_types):
+        """
+        Reads a sequence of record types.
+
+        This returns, for each record, the ids of the rules which can parse
+        it, or None if the sequence is not accepted.
+
+        As the records are not parsed, it is expected that the first rule
+        accepts each record.
+
+        :param record_types: the record types to read
+        :return: a list with the rule ids for each record, or None
+        """
+        state = self._start
+        rule_ids = []
+        for record_type in record_types:
+            options = self.step(state, record_type)
+            if not options:
+                return None
+
+            rule_ids.append([rule_id for rule_id, _ in options])
+            state = options[0][1]
+
+        if not self.accepts(state):
+            return None
+
+        return rule_ids
+
+    def _compute_step(self, state, record_type):
+        targets = []
+        reached = {}
+        for source in sorted(state):
+            for rule_id, target in self._transitions[source]:
+                if record_type in self._heads[rule_id]:
+                    if rule_id not in reached:
+                        reached[rule_id] = []
+                        targets.append(rule_id)
+                    reached[rule_id].append(target)
+
+        return [(rule_id, self._closure(reached[rule_id]))
+                for rule_id in targets]
+
+    def _closure(self, states):
+        closure = set(states)
+        pending = list(states)
+        while pending:
+            for target in self._empty[pending.pop()]:
+                if target not in closure:
+                    closure.add(target)
+                    pending.append(target)
+
+        return frozenset(closure)
+
+    def _new_state(self):
+        self._transitions.append([])
+        self._empty.append([])
+        return len(self._transitions) - 1
+
+    def _compile(self, node, start):
+        node_type = node[0]
+
+        if node_type == 'record':
+            end = self._new_state()
+            self._transitions[start].append((node[1], end))
+        elif node_type == 'sequence':
+            end = start
+            for child in node[1]:
+                end = self._compile(child, end)
+        elif node_type == 'option':
+            end = self._new_state()
+            for child in node[1]:
+                child_start = self._new_state()
+                self._empty[start].append(child_start)
+                self._empty[self._compile(child, child_start)].append(end)
+        elif node_type == 'optional':
+            child_start = self._new_state()
+            self._empty[start].append(child_start)
+            end = self._compile(node[1], child_start)
+            self._empty[start].append(end)
+        else:
+            # Repetition, with a minimum number of times
+            end = start
+            for _ in range(node[2]):
+                end = self._compile(node[1], end)
+
+            loop = self._new_state()
+            self._empty[end].append(loop)
+            self._empty[self._compile(node[1], loop)].append(loop)
+
+            end = self._new_state()
+            self._empty[loop].append(end)
+
+        return end
+
+
+class AutomatonFactory(RuleFactory):
+    """
+    Factory for the automatons of the transactions and groups rules.
+
+    It receives the configuration of all the rules, including the records,
+    which are the transitions of the automatons.
+    """
+
+    def __init__(self, rule_configs):
+        super(AutomatonFactory, self).__init__()
+
+        self._rule_configs = rule_configs
+
+        # Record types accepted by each record rule
+        self._heads = {}
+        for rule_id, rule_config in rule_configs.items():
+            if rule_config.rule_type in _record_types:
+                self._heads[rule_id] = frozenset(rule_config['head'])
+
+        # Automatons already created
+        self._automatons = {}
+
+    def get_rule(self, rule_id):
+        """
+        Returns the automaton for a rule.
+
+        :param rule_id: id of the rule
+        :return: the automaton for the rule
+        """
+        if rule_id not in self._automatons:
+            self._automatons[rule_id] = RecordAutomaton(
+                rule_id, self._build_node(rule_id), self._heads)
+
+        return self._automatons[rule_id]
+
+    def _build_node(self, rule_id):
+        rule_config = self._rule_configs[rule_id]
+
+        if rule_config.rule_type in _record_types:
+            return 'record', rule_id
+
+        return self._process_rules(rule_config.rules, 'sequence')
+
+    def _process_rules(self, rules_data, strategy):
+        sequence = []
+
+        for rule in rules_data:
+            if rule.rules:
+                node = self._process_rules_group(rule)
+            else:
+                node = self._build_terminal(rule)
+
+            sequence.append(node)
+
+        return strategy, sequence
+
+    def _process_rules_group(self, rules):
+        group_type = rules.list_type
+        data = rules.rules
+
+        if group_type == 'option':
+            node = self._process_rules(data, 'option')
+        elif group_type == 'optional':
+            node = 'optional', self._process_rules(data, 'sequence')
+        else:
+            node = self._process_rules(data, 'sequence')
+
+        return node
+
+    def _build_terminal(self, rule):
+        node = self._build_node(rule.rule_name)
+        modifiers = rule_options_list(rule)
+
+        if 'optional' in modifiers:
+            node = 'optional', node
+        else:
+            for modifier in modifiers:
+                if modifier.startswith('at_least'):
+                    node = 'repeat', node, int(modifier[len('at_least_'):])
+
+        return node
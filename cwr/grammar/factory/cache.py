@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+import config_cwr
+import cwr
+import data_cwr
+from cwr.grammar.factory.rule import RuleFactory
+
+"""
+On-disk cache for the record layouts.
+
+Building the record layouts requires reading all the configuration files,
+including the records configuration, which is parsed with its own grammar,
+and all the tables. This takes time on each process start.
+
+As the layouts only depend on these files, they can be stored on disk and
+loaded on the next start. The cached files are identified by a hash of the
+contents of the configuration and data folders, and the library version, so
+any change on them will make the cache build the layouts again.
+
+Only the layouts are cached, as the Pyparsing grammar makes use of parse
+actions which can't be serialized.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Changes when the layouts structure changes, invalidating old caches
+_CACHE_VERSION = '1'
+
+
+def config_hash():
+    """
+    Creates a hash for the contents of the configuration and data folders,
+    and the library version.
+
+    :return: hexadecimal digest of the configuration files
+    """
+    digest = hashlib.sha256(_CACHE_VERSION.encode('utf-8'))
+    digest.update(cwr.__version__.encode('utf-8'))
+
+    for module in (config_cwr, data_cwr):
+        _update_digest(digest, os.path.dirname(module.__file__))
+
+    return digest.hexdigest()
+
+
+def model_hash():
+    """
+    Creates a hash for the source of the model classes, and the library
+    version.
+
+    This is used by caches storing model instances, which can't be read
+    once the classes change.
+
+    :return: hexadecimal digest of the model modules
+    """
+    digest = hashlib.sha256(cwr.__version__.encode('utf-8'))
+
+    _update_digest(digest, os.path.dirname(cwr.__file__))
+
+    return digest.hexdigest()
+
+
+def _update_digest(digest, path):
+    for file_name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, file_name)
+        if not os.path.isfile(file_path) or file_name.endswith('.pyc'):
+            continue
+
+        digest.update(file_name.encode('utf-8'))
+        with open(file_path, 'rb') as source_file:
+            digest.update(source_file.read())
+
+
+def load_pickle(path):
+    """
+    Reads a value stored with the save_pickle method.
+
+    :param path: path to the file
+    :return: the value stored, or None if it can't be read
+    """
+    try:
+        with open(path, 'rb') as cache_file:
+            return pickle.load(cache_file)
+    except Exception:
+        # Missing, incomplete or written by an incompatible version
+        return None
+
+
+def save_pickle(value, path):
+    """
+    Stores a value on a file, creating its folder if needed.
+
+    The file is written first under a temporary name, so other processes
+    never read an incomplete file.
+
+    :param value: value to store
+    :param path: path to the file
+    """
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    handle, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as cache_file:
+            pickle.dump(value, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+class CachedLayoutFactory(RuleFactory):
+    """
+    Record layouts factory which stores the layouts on disk.
+
+    The first time the layouts are requested they are read from the cache
+    folder. If they are not there, they are built with the received factory
+    function, and then stored for the next time.
+    """
+
+    def __init__(self, directory, build_factory, key=None):
+        """
+        Constructs a CachedLayoutFactory.
+
+        :param directory: folder for the cached files
+        :param build_factory: function returning a layouts factory
+        :param key: key identifying the cached layouts, by default the hash
+        of the configuration files
+        """
+        super(CachedLayoutFactory, self).__init__()
+
+        self._directory = directory
+        self._build_factory = build_factory
+
+        if key is None:
+            key = config_hash()
+        self._key = key
+
+        # Layouts, indexed by rule id
+        self._layouts = None
+        # Indicates if the layouts were read from the cache
+        self._loaded = False
+
+    @property
+    def loaded(self):
+        """
+        Indicates if the layouts were read from the cache, instead of being
+        built.
+
+        :return: True if the layouts come from the cache, False otherwise
+        """
+        return self._loaded
+
+    @property
+    def path(self):
+        """
+        Path to the cached layouts file.
+
+        :return: the cache file path
+        """
+        return os.path.join(self._directory, 'layouts-%s.pickle' % self._key)
+
+    def get_rule(self, rule_id):
+        """
+        Returns the layout for the record identified by the id.
+
+        :param rule_id: id of the record rule
+        :return: the layout for the record
+        """
+        return self._get_layouts()[rule_id]
+
+    def get_layouts(self):
+        """
+        Returns the layouts for all the records.
+
+        :return: a list with all the record layouts
+        """
+        return list(self._get_layouts().values())
+
+    def _get_layouts(self):
+        if self._layouts is None:
+            self._layouts = load_pickle(self.path)
+
+            if self._layouts is None:
+                factory = self._build_factory()
+                self._layouts = {}
+                for layout in factory.get_layouts():
+                    self._layouts[layout.rule_id] = layout
+                save_pickle(self._layouts, self.path)
+            else:
+                self._loaded = True
+
+        return self._layouts
@@ -79,3 +79,23 @@ rule_config_set = \
     pp.Group(_rule_rules_root).setResultsName('rules')
 
 rule_config_file = pp.ZeroOrMore(pp.Group(rule_config_set))
+
+
+def rule_options_list(rule):
+    """
+    Returns the options of a terminal rule, such as 'compulsory' or
+    'at_least_1'.
+
+    Rules without options, which are most of the fields, don't match the
+    optional rule_options expression, and Pyparsing leaves an empty string
+    on that results name instead of a list.
+
+    :param rule: terminal rule parsed from a configuration file
+    :return: a list with the rule options
+    """
+    options = rule.rule_options
+
+    if isinstance(options, str):
+        return []
+
+    return options.asList()
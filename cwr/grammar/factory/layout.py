@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+
+from cwr.grammar.factory.config import rule_options_list
+from cwr.grammar.factory.rule import RuleFactory
+
+"""
+Fixed-width layouts for the CWR records.
+
+All the CWR records are fixed-width lines, where each field takes a set number
+of columns. The layouts store, for each record, the position and size of its
+fields, which allows handling a line just by slicing it.
+
+These layouts are built from the same configuration files used by the grammar
+rules factories. As some records include optional or alternative sections,
+each layout may contain several variants, one for each combination of the
+sections, in the same order the grammar rules would try them.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class FieldLayout(object):
+    """
+    Position and format of a field inside a record.
+    """
+
+    def __init__(self, field_id, field_type, position, columns,
+                 results_name=None, name=None, values=None, compulsory=False):
+        """
+        Constructs a FieldLayout.
+
+        :param field_id: id of the field in the configuration
+        :param field_type: type of the field
+        :param position: column where the field begins
+        :param columns: number of columns taken by the field
+        :param results_name: name of the field's value on the results
+        :param name: human readable name of the field
+        :param values: values allowed for the field
+        :param compulsory: indicates if the field can be empty
+        """
+        self._field_id = field_id
+        self._field_type = field_type
+        self._position = position
+        self._columns = columns
+        if results_name:
+            self._results_name = results_name
+        else:
+            self._results_name = field_id
+        if name:
+            self._name = name
+        else:
+            self._name = field_id
+        self._values = values
+        self._compulsory = compulsory
+
+    def __repr__(self):
+        return '<class %s>(field_id=%r, field_type=%r, position=%r, ' \
+               'columns=%r)' % (
+                   self.__class__.__name__, self._field_id,
+                   self._field_type, self._position, self._columns)
+
+    @property
+    def columns(self):
+        """
+        Number of columns taken by the field.
+
+        :return: the field size
+        """
+        return self._columns
+
+    @property
+    def compulsory(self):
+        """
+        Indicates if the field is compulsory, and so it can't be empty.
+
+        :return: True if the field is compulsory, False otherwise
+        """
+        return self._compulsory
+
+    @property
+    def end(self):
+        """
+        Column after the last one of the field.
+
+        :return: the field end
+        """
+        return self._position + self._columns
+
+    @property
+    def field_id(self):
+        """
+        Id of the field in the configuration files.
+
+        :return: the field id
+        """
+        return self._field_id
+
+    @property
+    def field_type(self):
+        """
+        Type of the field, which is the id of its adapter.
+
+        :return: the field type
+        """
+        return self._field_type
+
+    @property
+    def name(self):
+        """
+        Human readable name of the field.
+
+        :return: the field name
+        """
+        return self._name
+
+    @property
+    def position(self):
+        """
+        Column where the field begins, counting from zero.
+
+        :return: the field position
+        """
+        return self._position
+
+    @property
+    def results_name(self):
+        """
+        Name for the field's value when decoded.
+
+        :return: the field results name
+        """
+        return self._results_name
+
+    @property
+    def values(self):
+        """
+        Values allowed for the field, or its parameters for those fields which
+        are not lookups.
+
+        :return: the field values
+        """
+        return self._values
+
+
+class RecordLayout(object):
+    """
+    Fixed-width layout of a record.
+
+    Each variant of the layout is a list with the fields of the record, prefix
+    included, in the order they appear.
+    """
+
+    def __init__(self, rule_id, rule_type, heads, variants):
+        """
+        Constructs a RecordLayout.
+
+        :param rule_id: id of the record rule
+        :param rule_type: type of the rule, record or transaction_record
+        :param heads: record types accepted by the record
+        :param variants: lists of fields for each variant of the record
+        """
+        self._rule_id = rule_id
+        self._rule_type = rule_type
+        self._heads = heads
+        self._variants = variants
+
+    def __repr__(self):
+        return '<class %s>(rule_id=%r, heads=%r, lengths=%r)' % (
+            self.__class__.__name__, self._rule_id, self._heads,
+            self.lengths())
+
+    @property
+    def heads(self):
+        """
+        Record type codes accepted by the record.
+
+        :return: the record types
+        """
+        return self._heads
+
+    @property
+    def rule_id(self):
+        """
+        Id of the record rule.
+
+        :return: the rule id
+        """
+        return self._rule_id
+
+    @property
+    def rule_type(self):
+        """
+        Type of the record rule.
+
+        :return: the rule type
+        """
+        return self._rule_type
+
+    @property
+    def variants(self):
+        """
+        Fields lists for each variant of the record.
+
+        :return: the record variants
+        """
+        return self._variants
+
+    def lengths(self):
+        """
+        Line lengths for each variant.
+
+        :return: list with the length of each variant
+        """
+        return [_variant_length(variant) for variant in self._variants]
+
+    def field(self, position, variant=0):
+        """
+        Returns the field containing the column.
+
+        :param position: column to search
+        :param variant: index of the variant
+        :return: the field on that column, or None if there is none
+        """
+        for field in self._variants[variant]:
+            if field.position <= position < field.end:
+                return field
+
+        return None
+
+
+def _variant_length(variant):
+    if variant:
+        return variant[-1].end
+    else:
+        return 0
+
+
+class RecordLayoutFactory(RuleFactory):
+    """
+    Factory for acquiring record layouts.
+
+    It receives the same record and field configurations used for the
+    grammar rules.
+    """
+
+    def __init__(self, record_configs, field_configs):
+        super(RecordLayoutFactory, self).__init__()
+        # Layouts already created
+        self._layouts = {}
+
+        # Configuration for creating the layouts
+        self._record_configs = record_configs
+        self._field_configs = field_configs
+
+    def get_rule(self, rule_id):
+        """
+        Returns the layout for the record identified by the id.
+
+        :param rule_id: id of the record rule
+        :return: the layout for the record
+        """
+        if rule_id in self._layouts:
+            layout = self._layouts[rule_id]
+        else:
+            layout = self._build_layout(rule_id)
+            self._layouts[rule_id] = layout
+
+        return layout
+
+    def get_layouts(self):
+        """
+        Returns the layouts for all the records.
+
+        :return: a list with all the record layouts
+        """
+        return [self.get_rule(rule_id) for rule_id in self._record_configs]
+
+    def _build_layout(self, rule_id):
+        rule_config = self._record_configs[rule_id]
+
+        heads = list(rule_config['head'])
+
+        prefix = [('record_type', {'type': 'lookup', 'size': 3,
+                                   'name': 'Record Type', 'values': heads},
+                   True)]
+        if rule_config.rule_type == 'transaction_record':
+            for field_id in ('transaction_sequence_n', 'record_sequence_n'):
+                prefix.append((field_id, self._field_configs[field_id], True))
+
+        variants = []
+        for sequence in self._process_rules(rule_config.rules):
+            variants.append(self._build_variant(prefix + sequence))
+
+        return RecordLayout(rule_id, rule_config.rule_type, heads, variants)
+
+    def _build_variant(self, sequence):
+        variant = []
+        position = 0
+        for field_id, config, compulsory in sequence:
+            field_type = config['type']
+
+            if 'values' in config:
+                values = config['values']
+            else:
+                values = None
+
+            columns = config['size']
+
+            variant.append(FieldLayout(field_id, field_type, position, columns,
+                                       results_name=config.get(
+                                           'results_name'),
+                                       name=config.get('name'),
+                                       values=values,
+                                       compulsory=compulsory))
+            position += columns
+
+        return variant
+
+    def _process_rules(self, rules_data):
+        """
+        Expands a list of rules into all the sequences of fields it accepts.
+
+        :param rules_data: rules to expand
+        :return: a list of fields sequences
+        """
+        sequences = [[]]
+
+        for rule in rules_data:
+            if rule.rules:
+                options = self._process_rules_group(rule)
+            else:
+                options = [[self._build_terminal(rule)]]
+
+            sequences = [sequence + option for sequence in sequences
+                         for option in options]
+
+        return sequences
+
+    def _process_rules_group(self, rules):
+        group_type = rules.list_type
+        data = rules.rules
+
+        if group_type == 'option':
+            options = []
+            for rule in data:
+                if rule.rules:
+                    options.extend(self._process_rules_group(rule))
+                else:
+                    options.append([self._build_terminal(rule)])
+        elif group_type == 'optional':
+            options = self._process_rules(data) + [[]]
+        else:
+            options = self._process_rules(data)
+
+        return options
+
+    def _build_terminal(self, rule):
+        field_id = rule.rule_name
+        modifiers = rule_options_list(rule)
+
+        return field_id, self._field_configs[field_id], \
+            'compulsory' in modifiers
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+"""
+Profiling of the grammar rules.
+
+The rule factories can receive a RuleProfiler, which is then attached to each
+record, transaction, group and field rule they create. While parsing, the
+profiler counts how many times each rule is tried, how many of these it
+succeeds or fails, the time taken and the number of characters consumed.
+
+This is done through the Pyparsing debug actions, which are called when an
+element begins parsing, and when it succeeds or fails, so the rules are not
+modified in any other way.
+
+The results are grouped by rule id, by the record type of the line being
+parsed, and by field id for each record type, so it can be seen which
+records and fields take most of the decoding time.
+
+Times are cumulative, so the time of a record includes that of its fields,
+and that of a transaction includes its records.
+
+The profiler keeps the state of the rules being parsed, so it should not be
+shared between threads.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Rule types which parse a single record
+_record_types = ('record', 'transaction_record')
+
+
+class RuleStats(object):
+    """
+    Statistics for a rule, or for a group of rules.
+    """
+
+    __slots__ = ('calls', 'successes', 'failures', 'time', 'chars')
+
+    def __init__(self):
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.time = 0.0
+        self.chars = 0
+
+    def __repr__(self):
+        return '<class %s>(calls=%r, successes=%r, failures=%r, time=%r, ' \
+               'chars=%r)' % (self.__class__.__name__, self.calls,
+                              self.successes, self.failures, self.time,
+                              self.chars)
+
+    def as_dict(self):
+        """
+        Returns the statistics as a dictionary.
+
+        :return: a dictionary with the statistics
+        """
+        return {'calls': self.calls,
+                'successes': self.successes,
+                'failures': self.failures,
+                'time': self.time,
+                'chars': self.chars}
+
+
+def _record_type(text, loc):
+    start = text.rfind('\n', 0, loc) + 1
+    return text[start:start + 3]
+
+
+class RuleProfiler(object):
+    """
+    Gathers statistics for the grammar rules while they are parsing.
+    """
+
+    def __init__(self):
+        # Statistics by rule id
+        self._rules = {}
+        # Statistics by record type
+        self._records = {}
+        # Statistics by record type and field id
+        self._fields = {}
+
+        # Functions returning the statistics for each rule
+        self._getters = {}
+
+        # Rules being parsed, along the time they began
+        self._stack = []
+
+    def profile_rule(self, rule, rule_id, rule_type=None):
+        """
+        Attaches the profiler to a rule.
+
+        Records, meaning rules with the 'record' or 'transaction_record'
+        type, are also counted for the record type they parse.
+
+        :param rule: the rule to profile
+        :param rule_id: id of the rule
+        :param rule_type: type of the rule
+        :return: the rule received
+        """
+        if rule_type in _record_types:
+            return self._attach(rule, ('record', rule_id),
+                                lambda: self._record_stats(rule_id))
+        else:
+            return self._attach(rule, ('rule', rule_id),
+                                lambda: self._rule_stats(rule_id))
+
+    def profile_field(self, rule, field_id):
+        """
+        Attaches the profiler to a field rule.
+
+        :param rule: the field rule to profile
+        :param field_id: id of the field
+        :return: the rule received
+        """
+        return self._attach(rule, ('field', field_id),
+                            lambda: self._field_stats(field_id))
+
+    def report(self):
+        """
+        Returns the statistics gathered.
+
+        These are returned as a dictionary containing:
+        - rules, with the statistics of the rules indexed by their id
+        - records, with the statistics of the record rules indexed by the
+        record type
+        - fields, with the statistics of the fields, indexed by the record
+        type and then by the field id
+
+        Each statistic is a dictionary with the number of calls, successes and
+        failures, the time in seconds and the number of characters consumed.
+
+        :return: a dictionary with the statistics
+        """
+        fields = {}
+        for (record_type, field_id), stats in self._fields.items():
+            fields.setdefault(record_type, {})[field_id] = stats.as_dict()
+
+        return {'rules': _as_dicts(self._rules),
+                'records': _as_dicts(self._records),
+                'fields': fields}
+
+    def top(self, count=10):
+        """
+        Returns the fields which took the most time, along their record type.
+
+        :param count: number of fields to return
+        :return: a list of (record type, field id, statistics) tuples
+        """
+        fields = sorted(self._fields.items(), key=lambda f: f[1].time,
+                        reverse=True)
+
+        return [(record_type, field_id, stats.as_dict())
+                for (record_type, field_id), stats in fields[:count]]
+
+    def reset(self):
+        """
+        Removes all the statistics gathered.
+        """
+        self._rules.clear()
+        self._records.clear()
+        self._fields.clear()
+        del self._stack[:]
+
+    def _rule_stats(self, rule_id):
+        rules = self._rules
+
+        def get(text, loc):
+            if rule_id not in rules:
+                rules[rule_id] = RuleStats()
+            return (rules[rule_id],)
+
+        return get
+
+    def _record_stats(self, rule_id):
+        rules = self._rules
+        records = self._records
+
+        def get(text, loc):
+            record_type = _record_type(text, loc)
+            if rule_id not in rules:
+                rules[rule_id] = RuleStats()
+            if record_type not in records:
+                records[record_type] = RuleStats()
+            return rules[rule_id], records[record_type]
+
+        return get
+
+    def _field_stats(self, field_id):
+        fields = self._fields
+
+        def get(text, loc):
+            key = (_record_type(text, loc), field_id)
+            if key not in fields:
+                fields[key] = RuleStats()
+            return (fields[key],)
+
+        return get
+
+    def _attach(self, rule, key, create_stats):
+        if key not in self._getters:
+            self._getters[key] = create_stats()
+        get_stats = self._getters[key]
+
+        stack = self._stack
+
+        def start(text, loc, element):
+            # Wrapped copies of a rule, such as the optional fields, are
+            # counted only once
+            nested = bool(stack) and stack[-1][2] is get_stats
+            stack.append((element, time.perf_counter(), get_stats, nested))
+
+        def end(element):
+            # Elements interrupted by an error which is not a ParseException
+            # are discarded
+            while stack:
+                started, begin, _, nested = stack.pop()
+                if started is element:
+                    return time.perf_counter() - begin, nested
+
+            return 0.0, False
+
+        def success(text, start_loc, end_loc, element, tokens):
+            elapsed, nested = end(element)
+            if not nested:
+                for stats in get_stats(text, start_loc):
+                    stats.calls += 1
+                    stats.successes += 1
+                    stats.time += elapsed
+                    stats.chars += end_loc - start_loc
+
+        def failure(text, loc, element, error):
+            elapsed, nested = end(element)
+            if not nested:
+                for stats in get_stats(text, loc):
+                    stats.calls += 1
+                    stats.failures += 1
+                    stats.time += elapsed
+
+        return rule.setDebugActions(start, success, failure)
+
+
+def _as_dicts(stats):
+    return dict((key, value.as_dict()) for key, value in stats.items())
@@ -4,7 +4,7 @@ from abc import ABCMeta, abstractmethod
 
 import pyparsing as pp
 
-from cwr.grammar.factory.config import rule_at_least
+from cwr.grammar.factory.config import rule_at_least, rule_options_list
 
 """
 Rules factories.
@@ -29,7 +29,7 @@ class FieldRuleFactory(RuleFactory):
     Factory for acquiring field rules.
     """
 
-    def __init__(self, field_configs, adapters):
+    def __init__(self, field_configs, adapters, profiler=None):
         super(FieldRuleFactory, self).__init__()
         # Fields already created
         self._fields = {}
@@ -37,6 +37,8 @@ class FieldRuleFactory(RuleFactory):
         self._adapters = adapters
         # Configuration for creating the fields
         self._field_configs = field_configs
+        # Profiler attached to the fields
+        self._profiler = profiler
 
     def get_rule(self, field_id):
         """
@@ -96,14 +98,26 @@ class FieldRuleFactory(RuleFactory):
         else:
             field = field.setResultsName(field_id)
 
+        if self._profiler:
+            self._profiler.profile_field(field, field_id)
+
         return field
 
 
 class DefaultRuleFactory(RuleFactory):
+    """
+    Factory for acquiring the records, transactions and groups rules.
+
+    If it receives a profiler, this is attached to all the rules and fields it
+    creates, to gather statistics while parsing (see the profile module).
+    """
+
     def __init__(self, record_configs, field_rule_factory,
-                 optional_terminal_rule_decorator, decorators=None):
+                 optional_terminal_rule_decorator, decorators=None,
+                 profiler=None):
         super(DefaultRuleFactory, self).__init__()
         self._debug = False
+        self._profiler = profiler
 
         # Rules already created
         self._rules = {}
@@ -150,6 +164,9 @@ class DefaultRuleFactory(RuleFactory):
         if self._debug:
             rule.setDebug()
 
+        if self._profiler:
+            self._profiler.profile_rule(rule, rule_id, rule_type)
+
         return rule
 
     def _process_rules(self, rules_data, strategy):
@@ -185,15 +202,9 @@ class DefaultRuleFactory(RuleFactory):
 
     def _build_terminal_rule(self, rule):
         rule_id = rule.rule_name
-        modifiers = rule.rule_options
+        modifiers = rule_options_list(rule)
         rule_type = rule.rule_type
 
-        # TODO: This is a patch for an error which should not be happening
-        try:
-            modifiers = modifiers.asList()
-        except AttributeError:
-            modifiers = []
-
         if rule_type == 'field':
             rule = self._field_rule_factory.get_rule(rule_id)
 
@@ -202,6 +213,9 @@ class DefaultRuleFactory(RuleFactory):
                                                                     rule_id)
 
             rule.setName(rule_id)
+
+            if self._profiler:
+                self._profiler.profile_field(rule, rule_id)
         else:
             rule = self.get_rule(rule_id)
 
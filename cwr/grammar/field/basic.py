@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 
-import datetime
-
 import pyparsing as pp
 from pyparsing import ParseResults
 
+from cwr.grammar.field import convert
+from cwr.grammar.field.lookup import LookupToken
+
 """
 CWR fields grammar.
 
@@ -228,7 +229,7 @@ def numeric_float(columns, nums_int, name=None):
     field = pp.Word(pp.nums, exact=columns)
 
     # Parse action
-    field.setParseAction(lambda n: _to_numeric_float(n[0], nums_int))
+    field.setParseAction(lambda n: convert.to_numeric_float(n[0], nums_int))
 
     # Compulsory field validation action
     field.addParseAction(lambda s: _check_above_value_float(s[0], 0))
@@ -239,22 +240,6 @@ def numeric_float(columns, nums_int, name=None):
     return field
 
 
-def _to_numeric_float(number, nums_int):
-    """
-    Transforms a string into a float.
-
-    The nums_int parameter indicates the number of characters, starting from
-    the left, to be used for the integer value. All the remaining ones will be
-    used for the decimal value.
-
-    :param number: string with the number
-    :param nums_int: characters, counting from the left, for the integer value
-    :return: a float created from the string
-    """
-    index_end = len(number) - nums_int
-    return float(number[:nums_int] + '.' + number[-index_end:])
-
-
 def _check_above_value_float(string, minimum):
     """
     Checks that the number parsed from the string is above a minimum.
@@ -386,8 +371,7 @@ def date(name=None):
                      '(0[1-9]|[1-2][0-9]|3[0-1])')
 
     # Parse action
-    field.setParseAction(lambda d: datetime.datetime.strptime(d[0], '%Y%m%d')
-                         .date())
+    field.setParseAction(lambda d: convert.to_date(d[0]))
 
     # Name
     field.setName(name)
@@ -427,8 +411,7 @@ def time(name=None):
     field = pp.Regex('(0[0-9]|1[0-9]|2[0-3])[0-5][0-9][0-5][0-9]')
 
     # Parse action
-    field.setParseAction(lambda t: datetime.datetime.strptime(t[0], '%H%M%S')
-                         .time())
+    field.setParseAction(lambda t: convert.to_time(t[0]))
 
     # White spaces are not removed
     field.leaveWhitespace()
@@ -472,7 +455,7 @@ def lookup(values, name=None):
         values = values
 
     # Only the specified values are allowed
-    lookup_field = pp.oneOf(values)
+    lookup_field = LookupToken(values)
 
     lookup_field.setName(name)
 
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+"""
+Converters for the values of the Date, Time, Date and Time, and float Numeric
+fields.
+
+These transform the strings read from a field into the value stored on the
+model. Instead of parsing the string with a format, such as with strptime, the
+numbers are taken from fixed positions of the string, which is much faster.
+
+Most of the dates and times on a file are repeated, as the same dates appear
+on each transaction. So the values created are stored on a bounded cache, and
+when the same string is received again the same instance is returned.
+
+Besides the CWR format, the Date, Time and Date and Time converters accept the
+ISO format, which is used by the JSON encoder.
+
+There are converters for single values, shared by the grammar, the
+fixed-width decoder and the dictionary decoders, and for lists of values, used
+by the columnar decoder to convert whole columns at once.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class InternCache(object):
+    """
+    Bounded cache for the values created by the converters.
+
+    Once it is full, it is emptied before storing a new value. This keeps the
+    lookups as fast as a dictionary, and on CWR files it still keeps the
+    values which are being repeated.
+    """
+
+    def __init__(self, max_size=4096):
+        """
+        Constructs an InternCache.
+
+        :param max_size: maximum number of values stored
+        """
+        self._max_size = max_size
+        self._values = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def max_size(self):
+        """
+        Maximum number of values stored.
+
+        :return: the maximum size of the cache
+        """
+        return self._max_size
+
+    def clear(self):
+        """
+        Removes all the values stored.
+        """
+        self._values.clear()
+
+    def get(self, key):
+        """
+        Returns the value stored for a key, or None if there is none.
+
+        :param key: key for the value
+        :return: the value for the key
+        """
+        return self._values.get(key)
+
+    def put(self, key, value):
+        """
+        Stores a value, emptying the cache first if it is full.
+
+        :param key: key for the value
+        :param value: the value to store
+        """
+        if len(self._values) >= self._max_size:
+            self._values.clear()
+
+        self._values[key] = value
+
+
+# Values already created for each type
+dates = InternCache()
+times = InternCache()
+date_times = InternCache()
+# Dates and times created by combining a date and a time
+combined_date_times = InternCache()
+
+# Divisors for each number of decimals
+_powers = [10 ** i for i in range(20)]
+
+
+def _date(raw):
+    if len(raw) == 10 and raw[4] == '-' and raw[7] == '-':
+        digits = raw[:4] + raw[5:7] + raw[8:]
+    else:
+        digits = raw
+
+    if len(digits) != 8 or not digits.isdigit():
+        raise ValueError('Invalid date: %s' % raw)
+
+    return datetime.date(int(digits[:4]), int(digits[4:6]), int(digits[6:]))
+
+
+def _time(raw):
+    if len(raw) == 8 and raw[2] == ':' and raw[5] == ':':
+        digits = raw[:2] + raw[3:5] + raw[6:]
+    else:
+        digits = raw
+
+    if len(digits) != 6 or not digits.isdigit():
+        raise ValueError('Invalid time: %s' % raw)
+
+    return datetime.time(int(digits[:2]), int(digits[2:4]), int(digits[4:]))
+
+
+def to_date(raw):
+    """
+    Transforms a string into a date.
+
+    The string can follow the CWR pattern, YYYYMMDD, or the ISO one,
+    YYYY-MM-DD.
+
+    :param raw: the string to transform
+    :return: a datetime.date created from the string
+    :raises ValueError: if the string is not a valid date
+    """
+    value = dates.get(raw)
+
+    if value is None:
+        value = _date(raw)
+        dates.put(raw, value)
+
+    return value
+
+
+def to_time(raw):
+    """
+    Transforms a string into a time.
+
+    The string can follow the CWR pattern, HHMMSS, or the ISO one, HH:MM:SS.
+
+    :param raw: the string to transform
+    :return: a datetime.time created from the string
+    :raises ValueError: if the string is not a valid time
+    """
+    value = times.get(raw)
+
+    if value is None:
+        value = _time(raw)
+        times.put(raw, value)
+
+    return value
+
+
+def to_date_time(raw):
+    """
+    Transforms a string into a date and time.
+
+    The string can follow the CWR pattern, YYYYMMDDHHMMSS, or the ISO one,
+    YYYY-MM-DDTHH:MM:SS. For the ISO format, the time can be missing, in which
+    case it is set to midnight.
+
+    :param raw: the string to transform
+    :return: a datetime.datetime created from the string
+    :raises ValueError: if the string is not a valid date and time
+    """
+    value = date_times.get(raw)
+
+    if value is None:
+        if len(raw) == 14:
+            value = combine_date_time(to_date(raw[:8]), to_time(raw[8:]))
+        elif len(raw) == 19 and raw[10] == 'T':
+            value = combine_date_time(to_date(raw[:10]), to_time(raw[11:]))
+        elif len(raw) == 10:
+            value = combine_date_time(to_date(raw), datetime.time())
+        else:
+            raise ValueError('Invalid date and time: %s' % raw)
+
+        date_times.put(raw, value)
+
+    return value
+
+
+def combine_date_time(date, time):
+    """
+    Combines a date and a time.
+
+    :param date: the date to combine
+    :param time: the time to combine
+    :return: a datetime.datetime created from both
+    """
+    key = (date, time)
+    value = combined_date_times.get(key)
+
+    if value is None:
+        value = datetime.datetime.combine(date, time)
+        combined_date_times.put(key, value)
+
+    return value
+
+
+def to_numeric_float(raw, nums_int):
+    """
+    Transforms a string of digits into a float, where only the first digits
+    are the integer part.
+
+    :param raw: the string to transform
+    :param nums_int: number of digits for the integer part
+    :return: a float created from the string
+    :raises ValueError: if the string is not a number
+    """
+    decimals = len(raw) - nums_int
+
+    if decimals > 0:
+        return int(raw) / _powers[decimals]
+    else:
+        return float(int(raw))
+
+
+def _batch(converter, values):
+    # Values are kept for the whole list, so all the repeated strings get the
+    # same instance, even after the bounded caches are emptied
+    converted = {}
+
+    result = []
+    for raw in values:
+        if raw is None:
+            value = None
+        else:
+            value = converted.get(raw)
+            if value is None:
+                value = converter(raw)
+                converted[raw] = value
+        result.append(value)
+
+    return result
+
+
+def to_dates(values):
+    """
+    Transforms a list of strings into dates.
+
+    Missing values, which are None, are kept.
+
+    :param values: the strings to transform
+    :return: a list with the datetime.date created from each string
+    :raises ValueError: if any string is not a valid date
+    """
+    return _batch(to_date, values)
+
+
+def to_times(values):
+    """
+    Transforms a list of strings into times.
+
+    Missing values, which are None, are kept.
+
+    :param values: the strings to transform
+    :return: a list with the datetime.time created from each string
+    :raises ValueError: if any string is not a valid time
+    """
+    return _batch(to_time, values)
+
+
+def to_date_times(values):
+    """
+    Transforms a list of strings into dates and times.
+
+    Missing values, which are None, are kept.
+
+    :param values: the strings to transform
+    :return: a list with the datetime.datetime created from each string
+    :raises ValueError: if any string is not a valid date and time
+    """
+    return _batch(to_date_time, values)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import pyparsing as pp
+
+"""
+Lookup values validation.
+
+Lookup fields accept only the values from a table, some of them, such as the
+society or the TIS codes, with hundreds of values. Matching these with a
+Pyparsing alternation means trying the values one by one on each field.
+
+Instead, the LookupValues keep the values on sets, one for each value length,
+so checking a field just requires taking the slice of the line for each
+length and looking for it on the set. These are created only once for each
+list of values, and shared by all the fields using the same table.
+
+The LookupToken is the Pyparsing element which uses them. Just like the
+alternation, it accepts the longest value found at the parsing position.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# LookupValues already created, indexed by the values
+_lookup_values = {}
+
+
+def lookup_values(values):
+    """
+    Returns the LookupValues for a list of values.
+
+    These are created only the first time, and then returned on each call for
+    the same values.
+
+    As with the Pyparsing oneOf method, the values can be received in a
+    single string, separated by whitespaces.
+
+    :param values: values allowed
+    :return: the LookupValues for the values
+    """
+    if isinstance(values, str):
+        values = values.split()
+
+    key = tuple(values)
+
+    if key not in _lookup_values:
+        _lookup_values[key] = LookupValues(key)
+
+    return _lookup_values[key]
+
+
+class LookupValues(object):
+    """
+    Set of allowed values, grouped by their length.
+    """
+
+    def __init__(self, values):
+        """
+        Constructs a LookupValues.
+
+        :param values: values allowed
+        """
+        grouped = {}
+        for value in values:
+            if value:
+                grouped.setdefault(len(value), set()).add(value)
+
+        self._sets = {}
+        for width, width_values in grouped.items():
+            self._sets[width] = frozenset(width_values)
+
+        # Longest values are checked first
+        self._widths = tuple(sorted(self._sets, reverse=True))
+
+    def __contains__(self, value):
+        width_values = self._sets.get(len(value))
+        return width_values is not None and value in width_values
+
+    @property
+    def widths(self):
+        """
+        Lengths of the values, from the longest to the shortest.
+
+        :return: the lengths of the values
+        """
+        return self._widths
+
+    def match(self, text, loc=0):
+        """
+        Returns the longest value found on the text at the received position.
+
+        :param text: text to check
+        :param loc: position where the value begins
+        :return: the value found, or None if there is none
+        """
+        for width in self._widths:
+            value = text[loc:loc + width]
+            if value in self._sets[width]:
+                return value
+
+        return None
+
+
+class LookupToken(pp.Token):
+    """
+    Pyparsing element accepting only the values from a LookupValues.
+    """
+
+    def __init__(self, values):
+        """
+        Constructs a LookupToken.
+
+        :param values: values allowed
+        """
+        super(LookupToken, self).__init__()
+
+        self._values = lookup_values(values)
+
+        self.name = 'Lookup'
+        self.errmsg = 'Expected ' + self.name
+        self.mayReturnEmpty = False
+        self.mayIndexError = False
+
+    def parseImpl(self, instring, loc, doActions=True):
+        value = self._values.match(instring, loc)
+
+        if value is None:
+            raise pp.ParseException(instring, loc, self.errmsg, self)
+
+        return loc + len(value), value
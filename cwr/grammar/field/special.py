@@ -1,11 +1,9 @@
 # -*- coding: utf-8 -*-
 
-import datetime
-
 import pyparsing as pp
 
 from cwr.other import VISAN, AVIKey
-from cwr.grammar.field import basic
+from cwr.grammar.field import basic, convert
 from config_cwr.accessor import CWRConfiguration
 from data_cwr.accessor import CWRTables
 
@@ -413,7 +411,7 @@ def _combine_date_time(data):
     :param data: date and time to combine
     :return: the date and time combined
     """
-    return datetime.datetime.combine(data.date, data.time)
+    return convert.combine_date_time(data.date, data.time)
 
 
 def lookup_int(values, name=None):
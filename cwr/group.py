@@ -40,6 +40,9 @@ class GroupHeader(Record):
     the Transaction Type field.
     """
 
+    __slots__ = ('_group_id', '_transaction_type', '_version_number',
+                 '_batch_request_id')
+
     def __init__(self,
                  record_type='',
                  group_id=0,
@@ -144,6 +147,8 @@ class GroupTrailer(Record):
     transaction and record counts for the group.
     """
 
+    __slots__ = ('_group_id', '_transaction_count', '_record_count')
+
     def __init__(self,
                  record_type='',
                  group_id=0,
@@ -238,6 +243,8 @@ class Group(object):
     The type of the group is indicated by the header.
     """
 
+    __slots__ = ('_group_header', '_group_trailer', '_transactions')
+
     def __init__(self,
                  group_header,
                  group_trailer,
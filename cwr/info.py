@@ -30,6 +30,9 @@ class AdditionalRelatedInfoRecord(TransactionRecord):
     The note field should be used sparingly.
     """
 
+    __slots__ = ('_society_n', '_type_of_right', '_work_n', '_subject_code',
+                 '_note')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
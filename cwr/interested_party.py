@@ -17,6 +17,8 @@ class InterestedParty(object, metaclass=ABCMeta):
     Represents a CWR interested party.
     """
 
+    __slots__ = ('_ip_n', '_ipi_name', '_ipi_base_n', '_tax_id')
+
     def __init__(self,
                  ip_n='',
                  ipi_base_n=None,
@@ -111,6 +113,10 @@ class InterestedPartyRecord(TransactionRecord, metaclass=ABCMeta):
     This is meant to be used for Publisher and Writer records.
     """
 
+    __slots__ = ('_first_recording_refusal', '_usa_license', '_pr_society',
+                 '_mr_society', '_sr_society', '_pr_ownership_share',
+                 '_mr_ownership_share', '_sr_ownership_share')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -307,6 +313,11 @@ class IPTerritoryOfControlRecord(TransactionRecord):
     another Territory which is already included in the Agreement.
     """
 
+    __slots__ = ('_tis_numeric_code', '_ip_n',
+                 '_inclusion_exclusion_indicator', '_sequence_n',
+                 '_pr_collection_share', '_mr_collection_share',
+                 '_sr_collection_share', '_shares_change')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -487,6 +498,8 @@ class Publisher(InterestedParty):
     sub-publisher, original publisher, acquirer or administrator.
     """
 
+    __slots__ = ('_publisher_name',)
+
     def __init__(self,
                  ip_n='',
                  publisher_name='',
@@ -532,6 +545,11 @@ class PublisherRecord(InterestedPartyRecord):
     not.
     """
 
+    __slots__ = ('_publisher', '_publisher_type', '_publisher_unknown',
+                 '_submitter_agreement_n', '_society_assigned_agreement_n',
+                 '_agreement_type', '_international_standard_code',
+                 '_special_agreements', '_publisher_sequence_n')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -779,6 +797,8 @@ class PublisherChain(object):
     The role of each Publisher is indicated by the Publisher type field.
     """
 
+    __slots__ = ('_original_publisher',)
+
     def __init__(self,
                  original_publisher
                  ):
@@ -811,6 +831,9 @@ class PublisherChainNode(object):
     where it collects shares.
     """
 
+    __slots__ = ('_publisher', '_administrator', '_subpublishers',
+                 '_territories')
+
     def __init__(self,
                  publisher,
                  administrator=None,
@@ -898,6 +921,8 @@ class Writer(InterestedParty):
     This can be a Writer Controlled by Submitter (SWR) or Other Writer (OWR).
     """
 
+    __slots__ = ('_writer_first_name', '_writer_last_name', '_personal_number')
+
     def __init__(self,
                  ip_n='',
                  personal_number=0,
@@ -987,6 +1012,9 @@ class PublisherForWriterRecord(TransactionRecord):
     society-assigned agreement number to the writer to publisher agreement.
     """
 
+    __slots__ = ('_publisher_ip_n', '_writer_ip_n', '_submitter_agreement_n',
+                 '_society_assigned_agreement_n')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -1083,6 +1111,9 @@ class WriterRecord(InterestedPartyRecord):
     These contain all the information available to the submitter for a Writer.
     """
 
+    __slots__ = ('_writer', '_writer_designation', '_writer_unknown',
+                 '_work_for_hire', '_reversionary')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -16,6 +16,8 @@ class _ThreePartsCode(object):
     These codes are used by CISAC for identification purposes.
     """
 
+    __slots__ = ('_header', '_id_code', '_check_digit')
+
     _code_size = 9
 
     def __init__(self,
@@ -107,6 +109,8 @@ class ISWCCode(_ThreePartsCode):
     Currently the only prefix allowed is T, used to refer to musical works.
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  id_code,
                  check_digit
@@ -153,6 +157,8 @@ class IPIBaseNumber(_ThreePartsCode):
     digit.
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  header,
                  id_code,
@@ -181,6 +187,8 @@ class VISAN(object):
     Number)
     """
 
+    __slots__ = ('_version', '_isan', '_episode', '_check_digit')
+
     def __init__(self,
                  version,
                  isan,
@@ -251,6 +259,8 @@ class AVIKey(object):
     Represents an AVI key.
     """
 
+    __slots__ = ('_society_code', '_av_number')
+
     def __init__(self,
                  society_code,
                  av_number
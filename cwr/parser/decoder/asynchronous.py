@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import codecs
+import collections
+import functools
+
+from cwr.file import CWRFile
+from cwr.parser.decoder.stream import TRANSACTION, LineReader, \
+    RecordSplitter, assemble
+
+"""
+Asynchronous decoding of CWR files.
+
+Decoding a big file takes several seconds, which would block an asyncio event
+loop. The AsyncFileDecoder reads the file from an asynchronous source, such
+as an asyncio.StreamReader, splitting the lines into the pieces of the
+transmission as they arrive (see the stream module). Each piece is then
+decoded on an executor, so the event loop is never blocked.
+
+By default the executor is the event loop's default one, which runs the
+decoder on threads. For CPU-bound decoding a pool of processes can be used
+instead, through the process_pool method and the WorkerDecoder of the
+parallel module.
+
+Only a limited number of pieces are decoded at the same time. The pieces are
+returned in the file's order, and the source is read only while the consumer
+keeps asking for them, so a slow consumer stops the reading instead of
+making the memory grow.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+async def read_lines(source, encoding='latin-1'):
+    """
+    Reads the lines from an asynchronous source, as done by the read_lines
+    method of the stream module.
+
+    The source can be an asyncio.StreamReader, or any asynchronous iterable
+    of strings or bytes. These do not need to be lines, the text is split
+    into lines as it is received. Bytes are decoded with the received
+    encoding.
+
+    :param source: asynchronous iterable of strings or bytes
+    :param encoding: encoding for the bytes received
+    :return: an asynchronous generator of (line number, line) tuples
+    """
+    reader = LineReader()
+    decoder = codecs.getincrementaldecoder(encoding)()
+
+    pending = ''
+    async for chunk in source:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+
+        for line in lines:
+            line = reader.read(line)
+            if line:
+                yield line
+
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        line = reader.read(pending)
+        if line:
+            yield line
+
+
+class AsyncFileDecoder(object):
+    """
+    Parses a CWR file from an asynchronous source, decoding the pieces of the
+    transmission on an executor.
+
+    The pieces are decoded with a stream decoder, such as the
+    FileStreamDecoder or the AutomatonFileDecoder, or anything else with the
+    same decode_piece method.
+    """
+
+    def __init__(self, piece_decoder, filename_decoder, executor=None,
+                 max_pending=16, encoding='latin-1', splitter=None):
+        """
+        Constructs an AsyncFileDecoder.
+
+        :param piece_decoder: decoder for the transmission pieces
+        :param filename_decoder: decoder for the filename
+        :param executor: executor for decoding the pieces, by default the
+        event loop's default executor
+        :param max_pending: maximum number of pieces being decoded at the
+        same time
+        :param encoding: encoding for the bytes read
+        :param splitter: splitter for the lines of the file
+        """
+        self._piece_decoder = piece_decoder
+        self._filename_decoder = filename_decoder
+        self._executor = executor
+        self._max_pending = max_pending
+        self._encoding = encoding
+
+        if splitter:
+            self._splitter = splitter
+        else:
+            self._splitter = RecordSplitter()
+
+    async def events(self, source):
+        """
+        Parses the file, returning each piece of the transmission in the
+        file's order.
+
+        These are returned as tuples composed of the piece id, and the model
+        instances created from it, as done by the FileStreamDecoder.
+
+        :param source: asynchronous iterable of strings or bytes
+        :return: an asynchronous generator of (piece id, value) tuples
+        """
+        loop = asyncio.get_running_loop()
+        split = self._splitter.incremental()
+
+        pending = collections.deque()
+
+        def submit(piece, line_n, lines):
+            pending.append((piece, loop.run_in_executor(
+                self._executor, functools.partial(
+                    self._piece_decoder.decode_piece, piece, lines,
+                    line_n))))
+
+        try:
+            async for line_n, line in read_lines(source, self._encoding):
+                for piece in split.push(line_n, line):
+                    submit(*piece)
+
+                # Pieces already decoded are returned as soon as possible
+                while pending and (len(pending) >= self._max_pending or
+                                   pending[0][1].done()):
+                    piece, future = pending.popleft()
+                    yield piece, await future
+
+            for piece in split.close():
+                submit(*piece)
+
+            while pending:
+                piece, future = pending.popleft()
+                yield piece, await future
+        finally:
+            # Pieces not returned are discarded
+            for _, future in pending:
+                future.cancel()
+
+    async def transactions(self, source):
+        """
+        Parses the file, returning each transaction in the file's order.
+
+        Transactions are returned as lists of records. The other pieces of
+        the transmission are parsed, but not returned.
+
+        :param source: asynchronous iterable of strings or bytes
+        :return: an asynchronous generator of transactions
+        """
+        async for piece, value in self.events(source):
+            if piece == TRANSACTION:
+                yield value
+
+    async def decode(self, data):
+        """
+        Parses the file, creating a CWRFile from it.
+
+        It requires a dictionary with two values:
+        - filename, containing the filename
+        - contents, containing the asynchronous source for the file contents
+
+        :param data: dictionary with the data to parse
+        :return: a CWRFile instance
+        """
+        file_name = self._filename_decoder.decode(data['filename'])
+
+        events = []
+        async for event in self.events(data['contents']):
+            events.append(event)
+
+        return CWRFile(file_name, assemble(events))
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+import pyparsing as pp
+
+from cwr.file import CWRFile
+from cwr.parser.decoder import mapped
+from cwr.parser.decoder.common import Decoder
+from cwr.parser.decoder.fixed import RecordParseException
+from cwr.parser.decoder.mapped import MappedFile
+from cwr.parser.decoder.stream import RecordSplitter, TRANSACTION, assemble, \
+    read_lines
+
+"""
+CWR file decoder using automatons for the structure of the transactions.
+
+This works in two levels. First the lines are split into tokens, composed of
+the record type and the line. Then the record types are read by an automaton,
+created from the transactions configuration (see the automaton module), which
+validates the structure and tells the rule for each record, which is then
+parsed by the fixed-width record decoder.
+
+This way no record is parsed more than once, and the Pyparsing grammar is not
+used at all.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def tokenize(lines):
+    """
+    Splits each line into a token, composed of its record type and the line
+    itself.
+
+    :param lines: the lines to split
+    :return: a generator of (record type, line) tuples
+    """
+    for line in lines:
+        yield line[:3], line
+
+
+class AutomatonFileDecoder(Decoder):
+    """
+    Parses a CWR file line by line, validating its structure with automatons.
+
+    It works like the FileStreamDecoder, splitting the file into the pieces of
+    the transmission. But instead of grammar rules, each piece is read with an
+    automaton, which selects the rule used to parse each record with the
+    fixed-width decoder.
+    """
+
+    def __init__(self, automatons, record_decoder, filename_decoder,
+                 splitter=None, validator=None):
+        """
+        Constructs an AutomatonFileDecoder.
+
+        :param automatons: automatons for each piece of the transmission
+        :param record_decoder: fixed-width record decoder
+        :param filename_decoder: decoder for the filename
+        :param splitter: splitter for the lines of the file
+        :param validator: validator for the contents of the decoded files
+        """
+        super(AutomatonFileDecoder, self).__init__()
+
+        # Logger
+        self._logger = logging.getLogger(__name__)
+
+        self._automatons = automatons
+        self._record_decoder = record_decoder
+        self._filename_decoder = filename_decoder
+
+        if splitter:
+            self._splitter = splitter
+        else:
+            self._splitter = RecordSplitter()
+
+        self._validator = validator
+
+    @property
+    def validator(self):
+        """
+        Validator checking the contents of the decoded files, if any.
+
+        After decoding a file it contains the violations found on it.
+
+        :return: the StreamValidator, or None
+        """
+        return self._validator
+
+    def decode_piece(self, piece, lines, line_n=1):
+        """
+        Parses a single piece of the transmission.
+
+        Transactions are returned as a list of records, while the other pieces
+        are returned as a single record.
+
+        :param piece: id of the transmission piece
+        :param lines: lines composing the piece
+        :param line_n: number of the first line, used on error messages
+        :return: the model instances created from the lines
+        """
+        automaton = self._automatons[piece]
+
+        state = automaton.start
+        records = []
+        for i, (record_type, line) in enumerate(tokenize(lines)):
+            options = automaton.step(state, record_type)
+            if not options:
+                raise RecordParseException(line, 0,
+                                           'Invalid %s on line %s: '
+                                           'unexpected record type %s' %
+                                           (piece, line_n + i, record_type),
+                                           record_type=record_type,
+                                           line_n=line_n + i)
+
+            error = None
+            for rule_id, next_state in options:
+                try:
+                    record = self._record_decoder.decode(line, rule_id)
+                except pp.ParseException as e:
+                    if error is None:
+                        error = e
+                    continue
+
+                state = next_state
+                records.append(record)
+                break
+            else:
+                raise RecordParseException(line, error.loc,
+                                           'Invalid %s on line %s: %s' %
+                                           (piece, line_n + i, error.msg),
+                                           record_type=record_type,
+                                           field_id=getattr(error, 'field_id',
+                                                            None),
+                                           line_n=line_n + i)
+
+        if not automaton.accepts(state):
+            raise RecordParseException('\n'.join(lines), 0,
+                                       'Incomplete %s on line %s' %
+                                       (piece, line_n),
+                                       record_type=lines[0][:3],
+                                       line_n=line_n)
+
+        if piece == TRANSACTION:
+            return records
+        else:
+            return records[0]
+
+    def events(self, stream):
+        """
+        Parses the file line by line, returning each piece of the transmission
+        as soon as it has been decoded.
+
+        These are returned as tuples composed of the piece id, and the model
+        instances created from it.
+
+        :param stream: file-like object or iterable of lines
+        :return: a generator of (piece id, value) tuples
+        """
+        for piece, line_n, lines in self._splitter.split(read_lines(stream)):
+            yield piece, self.decode_piece(piece, lines, line_n)
+
+    def decode(self, data):
+        """
+        Parses the file, creating a CWRFile from it.
+
+        It requires a dictionary with two values:
+        - filename, containing the filename
+        - contents, containing the file contents, either as a string or as a
+        file-like object
+
+        Instead of the contents, the dictionary can contain the path to the
+        file, which will be read line by line through a memory map. In this
+        case the filename is optional, as it can be taken from the path.
+
+        :param data: dictionary with the data to parse
+        :return: a CWRFile instance
+        """
+        file_name = self._filename_decoder.decode(mapped.file_name(data))
+
+        if 'contents' not in data:
+            with MappedFile(data['path']) as mapped_file:
+                transmission = assemble(self._validated(
+                    self.events(mapped_file)))
+        else:
+            contents = data['contents']
+            if isinstance(contents, str):
+                contents = contents.splitlines()
+
+            transmission = assemble(self._validated(self.events(contents)))
+
+        return CWRFile(file_name, transmission)
+
+    def _validated(self, events):
+        if self._validator is None:
+            return events
+        else:
+            return self._validator.check(events)
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+
+import array
+import math
+import sys
+
+import pyparsing as pp
+
+from cwr.grammar.field import convert
+from cwr.parser.decoder.common import Decoder
+from cwr.parser.decoder.fixed import RecordParseException
+from cwr.parser.decoder.stream import read_lines
+
+"""
+Columnar decoding of CWR files.
+
+Reports over big files, such as computing the shares of all the writers or
+publishers, only need a few values from each record. Keeping a model instance
+for each record in these cases takes lots of memory, and iterating over them
+is slow.
+
+Instead, the ColumnarDecoder stores the values of all the records of the same
+type together in a ColumnTable. Each field is kept on its own column, so
+numeric fields can be stored on compact Python arrays, while the other
+values are kept in lists, with the strings interned, as most of them are
+repeated codes.
+
+Dates and times are kept as strings while the file is read, and each of their
+columns is converted at once when the file ends, with the list converters of
+the convert module.
+
+The model instances can still be created for any row of a table when they are
+needed.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Field types stored as integers
+_int_types = ('numeric', 'lookup_int', 'ipi_name_n', 'ean13')
+# Field types stored as floats
+_float_types = ('numeric_float', 'percentage')
+# Converters for the field types read as strings, for each whole column
+_batch_converters = {'date': convert.to_dates,
+                     'time': convert.to_times,
+                     'date_time': convert.to_date_times}
+
+
+class _FloatColumn(array.array):
+    """
+    Float column, where missing values are stored as NaN.
+    """
+
+    def __new__(cls):
+        return super(_FloatColumn, cls).__new__(cls, 'd')
+
+    def append(self, value):
+        if value is None:
+            value = float('nan')
+        super(_FloatColumn, self).append(value)
+
+    def value(self, index):
+        value = self[index]
+        if math.isnan(value):
+            return None
+        return value
+
+
+class _IntColumn(array.array):
+    """
+    Integer column, for fields which always have a value.
+    """
+
+    def __new__(cls):
+        return super(_IntColumn, cls).__new__(cls, 'q')
+
+    def value(self, index):
+        return self[index]
+
+
+class _ObjectColumn(list):
+    """
+    Column for any other value, where strings are interned.
+    """
+
+    def append(self, value):
+        if isinstance(value, str):
+            value = sys.intern(value)
+        super(_ObjectColumn, self).append(value)
+
+    def value(self, index):
+        return self[index]
+
+
+class ColumnTable(object):
+    """
+    Values of all the records of the same type, stored by columns.
+
+    There is a column for each field of the record, keyed by the results name
+    of the field, which is its id in the fields configuration, except for
+    those fields which are alternatives for the same value.
+
+    Values missing on a record are None on the object columns, and NaN on the
+    float columns. Integer fields which always have a value are stored on
+    integer arrays, while the optional ones are kept as objects.
+
+    As some record types, such as the group trailer, can be read with several
+    rules, and optional fields may be missing from the shorter records, the
+    rule and the fields read for each row are also stored.
+
+    The Date, Time and Date and Time columns receive the values as strings,
+    and are converted once all the rows have been added.
+    """
+
+    def __init__(self, record_type, record_decoder, rule_ids):
+        """
+        Constructs a ColumnTable.
+
+        :param record_type: the record type code
+        :param record_decoder: fixed-width record decoder
+        :param rule_ids: ids of the rules accepting the record type
+        """
+        self._record_type = record_type
+        self._record_decoder = record_decoder
+
+        self._rule_ids = list(rule_ids)
+
+        # Rule id and names of the fields read, for each kind of row
+        self._shapes = []
+        # Position of each shape on the shapes list
+        self._shape_index = {}
+
+        # Shape of each row
+        self._rows = array.array('H')
+        # Line of each row on the file
+        self._lines = array.array('I')
+
+        # Column fields, merged from all the rules
+        fields = []
+        compulsory_rules = {}
+        for rule_id in self._rule_ids:
+            for field in record_decoder.fields(rule_id):
+                if field.name not in compulsory_rules:
+                    compulsory_rules[field.name] = []
+                    fields.append(field)
+                if field.compulsory:
+                    compulsory_rules[field.name].append(rule_id)
+
+        self._columns = {}
+        self._names = []
+        # Fields waiting to be converted, along their converters
+        self._raw_fields = []
+        for field in fields:
+            self._names.append(field.name)
+            if field.field_type in _float_types:
+                column = _FloatColumn()
+            elif field.field_type in _int_types and \
+                    len(compulsory_rules[field.name]) == len(self._rule_ids):
+                column = _IntColumn()
+            else:
+                column = _ObjectColumn()
+                if field.field_type in _batch_converters:
+                    self._raw_fields.append(
+                        (field, _batch_converters[field.field_type]))
+            self._columns[field.name] = column
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def names(self):
+        """
+        Names of the columns, in the same order as the fields of the record.
+
+        :return: list with the column names
+        """
+        return self._names
+
+    @property
+    def record_type(self):
+        """
+        Record type code for the records on the table.
+
+        :return: the record type code
+        """
+        return self._record_type
+
+    def append(self, rule_id, values, line_n=0):
+        """
+        Adds a row to the table.
+
+        :param rule_id: id of the rule used to decode the record
+        :param values: dictionary with the record values
+        :param line_n: number of the line on the file, used on error messages
+        """
+        shape = (rule_id, tuple(name for name in self._names
+                                if name in values))
+        index = self._shape_index.get(shape)
+        if index is None:
+            index = len(self._shapes)
+            self._shapes.append(shape)
+            self._shape_index[shape] = index
+        self._rows.append(index)
+        self._lines.append(line_n)
+
+        for name in self._names:
+            self._columns[name].append(values.get(name))
+
+    def convert(self):
+        """
+        Converts the Date, Time and Date and Time columns, which are received
+        as strings, into their values.
+
+        Each column is converted at once. This should be done after adding
+        all the rows.
+
+        :raises RecordParseException: if any value is not valid
+        """
+        for field, converter in self._raw_fields:
+            column = self._columns[field.name]
+            try:
+                column[:] = converter(column)
+            except ValueError as e:
+                index = self._invalid_row(column, converter)
+                line_n = self._lines[index]
+                raise RecordParseException(column[index], 0,
+                                           'Invalid record on line %s: %s '
+                                           '(%s)' % (line_n, e,
+                                                     field.field_id),
+                                           record_type=self._record_type,
+                                           field_id=field.field_id,
+                                           line_n=line_n)
+
+        self._raw_fields = []
+
+    @staticmethod
+    def _invalid_row(column, converter):
+        for index, value in enumerate(column):
+            try:
+                converter([value])
+            except ValueError:
+                return index
+
+    def column(self, name):
+        """
+        Returns a column of the table.
+
+        This will be an array for numeric fields, and a list for any other.
+
+        :param name: name of the column
+        :return: the values of the column
+        """
+        return self._columns[name]
+
+    def numpy_column(self, name):
+        """
+        Returns a column of the table as a NumPy array.
+
+        This requires NumPy to be installed. Columns which are not numeric are
+        returned as arrays of objects.
+
+        :param name: name of the column
+        :return: a NumPy array with the values of the column
+        """
+        import numpy
+
+        column = self._columns[name]
+        if isinstance(column, array.array):
+            return numpy.array(column)
+        else:
+            return numpy.array(column, dtype=object)
+
+    def rule_id(self, index):
+        """
+        Returns the id of the rule used to decode a row.
+
+        :param index: index of the row
+        :return: the rule id for the row
+        """
+        return self._shapes[self._rows[index]][0]
+
+    def row(self, index):
+        """
+        Returns the values of a row as a dictionary, just like the one created
+        when decoding the record.
+
+        :param index: index of the row
+        :return: dictionary with the row values
+        """
+        values = {}
+        for name in self._shapes[self._rows[index]][1]:
+            values[name] = self._columns[name].value(index)
+
+        return values
+
+    def record(self, index):
+        """
+        Creates the model instance for a row.
+
+        :param index: index of the row
+        :return: the model instance for the row
+        """
+        return self._record_decoder.create(self.rule_id(index),
+                                           self.row(index))
+
+    def records(self):
+        """
+        Creates the model instances for all the rows of the table.
+
+        :return: a generator of model instances
+        """
+        for index in range(len(self)):
+            yield self.record(index)
+
+
+class ColumnarDecoder(Decoder):
+    """
+    Parses the contents of a CWR file into a ColumnTable for each record type.
+
+    Records are decoded with the fixed-width record decoder, keeping the
+    dates and times as strings, which are converted by columns once all the
+    lines have been read. The record types to decode can be limited, in which
+    case any other line is skipped without parsing it.
+    """
+
+    def __init__(self, record_decoder, record_types=None):
+        """
+        Constructs a ColumnarDecoder.
+
+        :param record_decoder: fixed-width record decoder
+        :param record_types: record types to decode, by default all of them
+        """
+        super(ColumnarDecoder, self).__init__()
+
+        self._record_decoder = record_decoder
+
+        if record_types is None:
+            self._record_types = None
+        else:
+            self._record_types = frozenset(record_types)
+
+    def decode(self, data):
+        """
+        Parses the file contents into tables of columns.
+
+        :param data: file contents, either as a string, a file-like object or
+        an iterable of lines
+        :return: a dictionary with a ColumnTable for each record type
+        """
+        if isinstance(data, str):
+            data = data.splitlines()
+
+        tables = {}
+        for line_n, line in read_lines(data):
+            record_type = line[:3]
+
+            if self._record_types is not None and \
+                    record_type not in self._record_types:
+                continue
+
+            try:
+                rule_id, values = self._record_decoder.decode_values(
+                    line, raw=True)
+            except pp.ParseException as e:
+                raise pp.ParseException(e.pstr, e.loc, 'Invalid record on '
+                                                       'line %s: %s' %
+                                        (line_n, e.msg))
+
+            if record_type not in tables:
+                tables[record_type] = ColumnTable(
+                    record_type, self._record_decoder,
+                    self._record_decoder.rule_ids(record_type))
+            tables[record_type].append(rule_id, values, line_n)
+
+        for table in tables.values():
+            table.convert()
+
+        return tables
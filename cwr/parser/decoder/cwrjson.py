@@ -2,11 +2,21 @@
 
 import json
 
+from cwr.file import CWRFile
 from cwr.parser.decoder.common import Decoder
-from cwr.parser.decoder.dictionary import FileDictionaryDecoder
+from cwr.parser.decoder.dictionary import FileDictionaryDecoder, \
+    FileTagDictionaryDecoder, GroupHeaderDictionaryDecoder, \
+    GroupTrailerDictionaryDecoder, TransactionRecordDictionaryDecoder, \
+    TransmissionHeaderDictionaryDecoder, TransmissionTrailerDictionaryDecoder
+from cwr.parser.decoder.stream import HEADER, GROUP_HEADER, TRANSACTION, \
+    GROUP_TRAILER, TRAILER, assemble
 
 """
 Classes for decoding CWR classes from JSON dictionaries.
+
+Besides the JSONDecoder, which reads a full JSON document, there is the
+JSONLinesDecoder, which reads the JSON Lines created by the JSONLinesEncoder,
+decoding each line only when it is requested.
 """
 
 __author__ = 'Bernardo Martínez Garrido'
@@ -23,3 +33,104 @@ class JSONDecoder(Decoder):
         decoded = json.loads(data)
 
         return self._dict_decoder.decode(decoded)
+
+
+class JSONLinesDecoder(Decoder):
+    """
+    Decodes CWR JSON Lines, where each line contains a piece of the
+    transmission, as created by the JSONLinesEncoder.
+
+    Lines are read and decoded one by one, so the transactions can be used
+    before the whole input has been received.
+    """
+
+    # Piece for the file tag
+    _tag = 'tag'
+
+    def __init__(self):
+        super(JSONLinesDecoder, self).__init__()
+
+        self._tag_decoder = FileTagDictionaryDecoder()
+        self._transaction_decoder = TransactionRecordDictionaryDecoder()
+
+        self._decoders = {}
+        self._decoders[HEADER] = TransmissionHeaderDictionaryDecoder()
+        self._decoders[GROUP_HEADER] = GroupHeaderDictionaryDecoder()
+        self._decoders[GROUP_TRAILER] = GroupTrailerDictionaryDecoder()
+        self._decoders[TRAILER] = TransmissionTrailerDictionaryDecoder()
+
+    def decode(self, data):
+        """
+        Decodes the JSON Lines into a CWRFile.
+
+        :param data: string or file-like object with the JSON Lines
+        :return: a CWRFile instance
+        """
+        if isinstance(data, str):
+            data = data.splitlines()
+
+        tag = []
+
+        def pieces():
+            for piece, value in self.events(data):
+                if piece == self._tag:
+                    tag.append(value)
+                else:
+                    yield piece, value
+
+        transmission = assemble(pieces())
+
+        if tag:
+            tag = tag[0]
+        else:
+            tag = None
+
+        return CWRFile(tag, transmission)
+
+    def events(self, stream):
+        """
+        Decodes the JSON Lines, returning each piece of the transmission as
+        soon as its line has been read.
+
+        These are returned as tuples composed of the piece id, and the model
+        instances created from it.
+
+        :param stream: file-like object or iterable of lines
+        :return: a generator of (piece id, value) tuples
+        """
+        line_n = 0
+        for line in stream:
+            line_n += 1
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                data = json.loads(line)
+                piece, value = list(data.items())[0]
+            except (ValueError, AttributeError, IndexError):
+                raise ValueError('Invalid JSON on line %s' % line_n)
+
+            yield piece, self._decode_piece(piece, value, line_n)
+
+    def transactions(self, stream):
+        """
+        Decodes the JSON Lines, returning only the transactions.
+
+        :param stream: file-like object or iterable of lines
+        :return: a generator of transactions, each of them a list of records
+        """
+        for piece, value in self.events(stream):
+            if piece == TRANSACTION:
+                yield value
+
+    def _decode_piece(self, piece, value, line_n):
+        if piece == TRANSACTION:
+            decoder = self._transaction_decoder
+            return [decoder.decode(record) for record in value]
+        elif piece == self._tag:
+            return self._tag_decoder.decode(value)
+        elif piece in self._decoders:
+            return self._decoders[piece].decode(value)
+        else:
+            raise ValueError('Unknown piece %s on line %s' % (piece, line_n))
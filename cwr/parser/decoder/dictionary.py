@@ -5,6 +5,7 @@ from cwr.agreement import AgreementRecord, AgreementTerritoryRecord, \
     InterestedPartyForAgreementRecord
 from cwr.group import Group, GroupHeader, GroupTrailer
 from cwr.info import AdditionalRelatedInfoRecord
+from cwr.grammar.field import convert
 from cwr.parser.decoder.common import Decoder
 from cwr.interested_party import IPTerritoryOfControlRecord, Publisher, \
     PublisherRecord, Writer, PublisherForWriterRecord, WriterRecord
@@ -33,6 +34,10 @@ As said, the values on the dictionary should be valid values, for example if
 an integer is expected, then the dictionary contains an integer. The values
 contained in the dictionary entries should not need to be parsed.
 
+The only exception are dates and times, which can be received as strings, in
+either the CWR or the ISO format, as these are stored on JSON files. They are
+transformed with the same converters used by the grammar.
+
 These decoders are useful for handling JSON transmissions or Mongo databases.
 """
 
@@ -41,6 +46,24 @@ __license__ = 'MIT'
 __status__ = 'Development'
 
 
+def _to_date(value):
+    if isinstance(value, str):
+        return convert.to_date(value)
+    return value
+
+
+def _to_time(value):
+    if isinstance(value, str):
+        return convert.to_time(value)
+    return value
+
+
+def _to_date_time(value):
+    if isinstance(value, str):
+        return convert.to_date_time(value)
+    return value
+
+
 class TransactionRecordDictionaryDecoder(Decoder):
     def __init__(self):
         super(TransactionRecordDictionaryDecoder, self).__init__()
@@ -107,9 +130,10 @@ class AcknowledgementDictionaryDecoder(Decoder):
                                          'original_transaction_type'],
                                      transaction_status=data[
                                          'transaction_status'],
-                                     creation_date_time=data[
-                                         'creation_date_time'],
-                                     processing_date=data['processing_date'],
+                                     creation_date_time=_to_date_time(data[
+                                         'creation_date_time']),
+                                     processing_date=_to_date(
+                                         data['processing_date']),
                                      creation_title=data['creation_title'],
                                      submitter_creation_n=data[
                                          'submitter_creation_n'],
@@ -129,8 +153,8 @@ class AgreementDictionaryDecoder(Decoder):
                                submitter_agreement_n=data[
                                    'submitter_agreement_n'],
                                agreement_type=data['agreement_type'],
-                               agreement_start_date=data[
-                                   'agreement_start_date'],
+                               agreement_start_date=_to_date(data[
+                                   'agreement_start_date']),
                                prior_royalty_status=data[
                                    'prior_royalty_status'],
                                post_term_collection_status=data[
@@ -142,13 +166,16 @@ class AgreementDictionaryDecoder(Decoder):
                                    'international_standard_code'],
                                sales_manufacture_clause=data[
                                    'sales_manufacture_clause'],
-                               agreement_end_date=data['agreement_end_date'],
-                               date_of_signature=data['date_of_signature'],
-                               retention_end_date=data['retention_end_date'],
-                               prior_royalty_start_date=data[
-                                   'prior_royalty_start_date'],
-                               post_term_collection_end_date=data[
-                                   'post_term_collection_end_date'],
+                               agreement_end_date=_to_date(
+                                   data['agreement_end_date']),
+                               date_of_signature=_to_date(
+                                   data['date_of_signature']),
+                               retention_end_date=_to_date(
+                                   data['retention_end_date']),
+                               prior_royalty_start_date=_to_date(data[
+                                   'prior_royalty_start_date']),
+                               post_term_collection_end_date=_to_date(data[
+                                   'post_term_collection_end_date']),
                                shares_change=data['shares_change'],
                                advance_given=data['advance_given'])
 
@@ -266,7 +293,7 @@ class ComponentDictionaryDecoder(Decoder):
                                writer_2_ipi_base_n=ipi_base_2,
                                writer_2_ipi_name_n=data['writer_2_ipi_name_n'],
                                iswc=data['iswc'],
-                               duration=data['duration'])
+                               duration=_to_time(data['duration']))
 
 
 class GroupHeaderDictionaryDecoder(Decoder):
@@ -449,10 +476,10 @@ class RecordingDetailDictionaryDecoder(Decoder):
                                          'transaction_sequence_n'],
                                      record_sequence_n=data[
                                          'record_sequence_n'],
-                                     first_release_date=data[
-                                         'first_release_date'],
-                                     first_release_duration=data[
-                                         'first_release_duration'],
+                                     first_release_date=_to_date(data[
+                                         'first_release_date']),
+                                     first_release_duration=_to_time(data[
+                                         'first_release_duration']),
                                      first_album_title=data[
                                          'first_album_title'],
                                      first_album_label=data[
@@ -555,9 +582,10 @@ class TransmissionHeaderDictionaryDecoder(Decoder):
                                     sender_id=data['sender_id'],
                                     sender_name=data['sender_name'],
                                     sender_type=data['sender_type'],
-                                    creation_date_time=data[
-                                        'creation_date_time'],
-                                    transmission_date=data['transmission_date'],
+                                    creation_date_time=_to_date_time(data[
+                                        'creation_date_time']),
+                                    transmission_date=_to_date(
+                                        data['transmission_date']),
                                     edi_standard=data['edi_standard'])
         if 'character_set' in data:
             header.character_set = data['character_set']
@@ -589,13 +617,13 @@ class WorkDictionaryDecoder(Decoder):
                           version_type=data['version_type'],
                           musical_work_distribution_category=data[
                               'musical_work_distribution_category'],
-                          date_publication_printed_edition=data[
-                              'date_publication_printed_edition'],
+                          date_publication_printed_edition=_to_date(data[
+                              'date_publication_printed_edition']),
                           text_music_relationship=data[
                               'text_music_relationship'],
                           language_code=data['language_code'],
                           copyright_number=data['copyright_number'],
-                          copyright_date=data['copyright_date'],
+                          copyright_date=_to_date(data['copyright_date']),
                           music_arrangement=data['music_arrangement'],
                           lyric_adaptation=data['lyric_adaptation'],
                           excerpt_type=data['excerpt_type'],
@@ -604,7 +632,7 @@ class WorkDictionaryDecoder(Decoder):
                               'composite_component_count'],
                           iswc=data['iswc'],
                           work_type=data['work_type'],
-                          duration=data['duration'],
+                          duration=_to_time(data['duration']),
                           catalogue_number=data['catalogue_number'],
                           opus_number=data['opus_number'],
                           contact_id=data['contact_id'],
@@ -1,11 +1,28 @@
 # -*- coding: utf-8 -*-
 import logging
 
+import pyparsing as pp
+
+from cwr.parser.decoder.asynchronous import AsyncFileDecoder
+from cwr.parser.decoder.columnar import ColumnarDecoder
 from cwr.parser.decoder.common import GrammarDecoder
+from cwr.parser.decoder import mapped
+from cwr.parser.decoder.automaton import AutomatonFileDecoder
+from cwr.parser.decoder.fixed import FixedWidthRecordDecoder
+from cwr.parser.decoder.incremental import IncrementalFileDecoder, \
+    TransactionCache
+from cwr.parser.decoder.lenient import decode_lenient
+from cwr.parser.decoder.mapped import MappedFile
+from cwr.parser.decoder.parallel import ParallelFileDecoder
+from cwr.parser.decoder.stream import RecordSplitter, assemble, read_lines, \
+    HEADER, GROUP_HEADER, GROUP_TRAILER, TRANSACTION, TRAILER
 from config_cwr.accessor import CWRConfiguration
 from cwr.grammar.factory.rule import FieldRuleFactory
 from data_cwr.accessor import CWRTables
 from cwr.grammar.factory.rule import DefaultRuleFactory
+from cwr.grammar.factory.layout import RecordLayoutFactory
+from cwr.grammar.factory.automaton import AutomatonFactory
+from cwr.grammar.factory.cache import CachedLayoutFactory
 from cwr.file import CWRFile, FileTag
 from cwr.grammar.factory.decorator import GroupRuleDecorator, \
     OptionalFieldRuleDecorator, RecordRuleDecorator, \
@@ -63,6 +80,24 @@ file naming convention.
 The file decoder will also parse the filename, using the second parser for it,
 and return a CWRFile instance. The filename decoder will return a FileTag.
 
+For big files the default_file_stream_decoder() method returns a decoder which
+reads the file line by line, parsing each transaction on its own, so only a
+single transaction is kept in memory at each moment. The
+default_file_parallel_decoder() method returns a decoder which parses these
+transactions on a pool of processes, while the
+default_file_incremental_decoder() method returns one which reuses the
+transactions already decoded on previous files. The
+default_file_async_decoder() method returns a decoder for asyncio
+applications, reading the file from an asynchronous source.
+
+The stream and automaton decoders can receive a StreamValidator, from the
+validator module, which checks the trailer counts, sequence numbers and
+shares of each file while it is decoded.
+
+Single records can be decoded with the default_record_decoder() method, which
+returns a decoder slicing the fixed-width fields of each line, instead of
+using the Pyparsing grammar, for a faster result.
+
 The base classes used on these parsers are FileDecoder and FileNameDecoder,
 both of them requiring information about the grammar to be used when parsing.
 """
@@ -92,6 +127,8 @@ def _default_record_decoders():
         AdditionalRelatedInformationDictionaryDecoder()
     decoders['group_header'] = GroupHeaderDictionaryDecoder()
     decoders['group_trailer'] = GroupTrailerDictionaryDecoder()
+    decoders['group_trailer_base'] = GroupTrailerDictionaryDecoder()
+    decoders['group_trailer_short'] = GroupTrailerDictionaryDecoder()
     decoders['interested_party_agreement'] = \
         InterestedPartyForAgreementDictionaryDecoder()
     decoders['nra_agreement_party'] = \
@@ -162,7 +199,7 @@ def default_adapters():
     return adapters
 
 
-def default_grammar_factory():
+def _default_field_configs():
     config = CWRConfiguration()
 
     data = config.load_field_config('table')
@@ -175,7 +212,23 @@ def default_grammar_factory():
             values_id = entry['source']
             entry['values'] = field_values.get_data(values_id)
 
-    factory_field = FieldRuleFactory(data, default_adapters())
+    return data
+
+
+def default_grammar_factory(profiler=None):
+    """
+    Creates the factory for the rules of the CWR grammar.
+
+    If a profiler is received, it is attached to all the rules created.
+
+    :param profiler: profiler for the rules
+    :return: the rules factory for the default standard
+    """
+    config = CWRConfiguration()
+
+    data = _default_field_configs()
+
+    factory_field = FieldRuleFactory(data, default_adapters(), profiler)
 
     optional_decorator = OptionalFieldRuleDecorator(data, default_adapters())
 
@@ -196,7 +249,8 @@ def default_grammar_factory():
         rules,
         factory_field,
         optional_decorator,
-        decorators
+        decorators,
+        profiler
     )
 
 
@@ -222,6 +276,20 @@ def default_filename_grammar_factory():
     )
 
 
+def default_layout_factory():
+    """
+    Creates a factory for the fixed-width layouts of the CWR records.
+
+    :return: a record layouts factory for the default standard
+    """
+    config = CWRConfiguration()
+
+    return RecordLayoutFactory(
+        _process_rules(config.load_record_config('common')),
+        _default_field_configs()
+    )
+
+
 def _process_rules(rules):
     processed = {}
     for rule in rules:
@@ -231,14 +299,19 @@ def _process_rules(rules):
     return processed
 
 
-def default_file_decoder():
+def default_file_decoder(profiler=None):
     """
     Creates a decoder which parses a CWR file, creating a CWRFile class
     instance from it.
 
+    If a profiler is received, it will gather statistics for all the rules
+    while decoding.
+
+    :param profiler: profiler for the grammar rules
     :return: a CWR file decoder for the default standard
     """
-    transmission_rule = default_grammar_factory().get_rule('transmission')
+    factory = default_grammar_factory(profiler)
+    transmission_rule = factory.get_rule('transmission')
 
     return FileDecoder(
         transmission_rule,
@@ -246,6 +319,170 @@ def default_file_decoder():
     )
 
 
+def default_file_stream_decoder(validator=None):
+    """
+    Creates a decoder which parses a CWR file line by line, creating the CWR
+    model instances for each transaction as soon as it has been read.
+
+    If a validator is received, the contents of each decoded file are
+    checked with it.
+
+    :param validator: StreamValidator for the decoded files
+    :return: a CWR file stream decoder for the default standard
+    """
+    factory = default_grammar_factory()
+
+    rules = {
+        HEADER: factory.get_rule('transmission_header'),
+        GROUP_HEADER: factory.get_rule('group_header'),
+        TRANSACTION: (
+            factory.get_rule('agreement_transaction') |
+            factory.get_rule('work_transaction') |
+            factory.get_rule('acknowledgement_transaction')),
+        GROUP_TRAILER: (
+            factory.get_rule('group_trailer_base') |
+            factory.get_rule('group_trailer_short')),
+        TRAILER: factory.get_rule('transmission_trailer')
+    }
+
+    return FileStreamDecoder(rules, default_filename_decoder(),
+                             validator=validator)
+
+
+def default_file_parallel_decoder(max_workers=None):
+    """
+    Creates a decoder which parses a CWR file using a pool of processes,
+    creating a CWRFile class instance from it.
+
+    Each process builds its own stream decoder when it starts. The pool is
+    kept for all the files parsed, until the decoder is closed.
+
+    :param max_workers: number of processes, by default the number of CPUs
+    :return: a parallel CWR file decoder for the default standard
+    """
+    return ParallelFileDecoder(default_file_stream_decoder,
+                               default_filename_decoder(),
+                               max_workers=max_workers)
+
+
+def default_file_incremental_decoder(cache_dir, max_size=50000):
+    """
+    Creates a decoder which parses a CWR file line by line, taking from a
+    cache the transactions already decoded on previous files, and parsing
+    only the new or changed ones.
+
+    The cache is stored on the received folder.
+
+    :param cache_dir: folder for the transactions cache
+    :param max_size: maximum number of transactions on the cache
+    :return: an incremental CWR file decoder for the default standard
+    """
+    return IncrementalFileDecoder(default_file_stream_decoder(),
+                                  default_filename_decoder(),
+                                  TransactionCache(cache_dir, max_size))
+
+
+def default_file_async_decoder(executor=None, max_pending=16):
+    """
+    Creates a decoder which parses a CWR file read from an asynchronous
+    source, such as an asyncio.StreamReader, decoding the transactions on an
+    executor.
+
+    By default the transactions are decoded on the event loop's default
+    executor. To decode them on a pool of processes, an AsyncFileDecoder
+    should be created with a WorkerDecoder and a pool created with
+    process_pool(default_file_automaton_decoder).
+
+    :param executor: executor for decoding the transactions
+    :param max_pending: maximum number of transactions being decoded at the
+    same time
+    :return: an asynchronous CWR file decoder for the default standard
+    """
+    return AsyncFileDecoder(default_file_automaton_decoder(),
+                            default_filename_decoder(), executor=executor,
+                            max_pending=max_pending)
+
+
+def default_record_decoder(cache_dir=None):
+    """
+    Creates a decoder which parses single CWR records by slicing their
+    fixed-width fields, without using the Pyparsing grammar.
+
+    If a cache folder is received, the record layouts will be stored there,
+    and read from it the next time, instead of building them again.
+
+    :param cache_dir: folder for caching the record layouts
+    :return: a fixed-width record decoder for the default standard
+    """
+    if cache_dir:
+        layout_factory = CachedLayoutFactory(cache_dir, default_layout_factory)
+    else:
+        layout_factory = default_layout_factory()
+
+    return FixedWidthRecordDecoder(layout_factory, _default_record_decoders())
+
+
+def default_columnar_decoder(record_types=None):
+    """
+    Creates a decoder which parses the contents of CWR files into tables of
+    columns, one for each record type.
+
+    :param record_types: record types to decode, by default all of them
+    :return: a columnar decoder for the default standard
+    """
+    return ColumnarDecoder(default_record_decoder(), record_types)
+
+
+def default_automaton_factory():
+    """
+    Creates a factory for the automatons which validate the structure of the
+    CWR transactions and groups.
+
+    :return: an automatons factory for the default standard
+    """
+    config = CWRConfiguration()
+
+    rules = _process_rules(config.load_record_config('common'))
+    rules.update(_process_rules(config.load_transaction_config('common')))
+    rules.update(_process_rules(config.load_group_config('common')))
+
+    return AutomatonFactory(rules)
+
+
+def default_file_automaton_decoder(cache_dir=None, validator=None):
+    """
+    Creates a decoder which parses a CWR file line by line, validating the
+    structure of the transactions with automatons, and parsing each record
+    with the fixed-width record decoder.
+
+    If a validator is received, the contents of each decoded file are
+    checked with it.
+
+    :param cache_dir: folder for caching the record layouts
+    :param validator: StreamValidator for the decoded files
+    :return: a CWR file automaton decoder for the default standard
+    """
+    factory = default_automaton_factory()
+
+    automatons = {
+        HEADER: factory.get_rule('transmission_header'),
+        GROUP_HEADER: factory.get_rule('group_header'),
+        TRANSACTION: (
+            factory.get_rule('agreement_transaction') |
+            factory.get_rule('work_transaction') |
+            factory.get_rule('acknowledgement_transaction')),
+        GROUP_TRAILER: (
+            factory.get_rule('group_trailer_base') |
+            factory.get_rule('group_trailer_short')),
+        TRAILER: factory.get_rule('transmission_trailer')
+    }
+
+    return AutomatonFileDecoder(automatons,
+                                default_record_decoder(cache_dir),
+                                default_filename_decoder(),
+                                validator=validator)
+
+
 def default_filename_decoder():
     """
     Creates a decoder which parses CWR filenames following the old or the new
@@ -270,9 +507,20 @@ class FileDecoder(Decoder):
     file's name.
 
     For this it will use a second decoder, which will take care of the filename.
+
+    Additionally, files can be decoded in a lenient mode, where invalid
+    transactions are ignored and reported, instead of making the whole file
+    fail. This mode does not use the grammar, but a decoder for the pieces of
+    the transmission, by default the automaton decoder.
+
+    The results of the grammar rules can be memoized on a ParseCache, which
+    will be used only by this decoder. This does not make decoding faster, as
+    the CWR grammar rarely tries the same rule twice at the same position,
+    but the cache statistics show how much the rules are reused.
     """
 
-    def __init__(self, grammar, filename_decoder):
+    def __init__(self, grammar, filename_decoder, piece_decoder=None,
+                 parse_cache=None):
         super(FileDecoder, self).__init__()
 
         # Logger
@@ -281,6 +529,21 @@ class FileDecoder(Decoder):
         self._filename_decoder = filename_decoder
         self._file_decoder = GrammarDecoder(grammar)
 
+        # Created when first needed
+        self._piece_decoder = piece_decoder
+
+        self._parse_cache = parse_cache
+
+    @property
+    def parse_cache(self):
+        """
+        Cache for the results of the grammar rules, or None if they are not
+        memoized.
+
+        :return: the parse cache used by the decoder
+        """
+        return self._parse_cache
+
     def decode(self, data):
         """
         Parses the file, creating a CWRFile from it.
@@ -289,23 +552,203 @@ class FileDecoder(Decoder):
         - filename, containing the filename
         - contents, containing the file contents
 
+        Instead of the contents, the dictionary can contain the path to the
+        file, which will be read through a memory map. In this case the
+        filename is optional, as it can be taken from the path.
+
         :param data: dictionary with the data to parse
         :return: a CWRFile instance
         """
-        file_name = self._filename_decoder.decode(data['filename'])
+        file_name = self._filename_decoder.decode(mapped.file_name(data))
+
+        if 'contents' in data:
+            file_data = data['contents']
+        else:
+            with MappedFile(data['path']) as mapped_file:
+                file_data = '\n'.join(mapped_file)
 
-        file_data = data['contents']
         i = 0
         max_size = len(file_data)
         while file_data[i:i + 1] != 'H' and i < max_size:
             i += 1
         if i > 0:
-            data['contents'] = file_data[i:]
+            file_data = file_data[i:]
 
-        transmission = self._file_decoder.decode(data['contents'])[0]
+        if self._parse_cache is None:
+            transmission = self._file_decoder.decode(file_data)[0]
+        else:
+            with self._parse_cache.activate():
+                transmission = self._file_decoder.decode(file_data)[0]
 
         return CWRFile(file_name, transmission)
 
+    def decode_lenient(self, data):
+        """
+        Parses the file, creating a CWRFile from its valid transactions.
+
+        It receives the same data as the decode method. But instead of
+        failing when an invalid record is found, the transaction or control
+        record containing it is ignored, and the error is stored.
+
+        The errors are returned along the file, as a list of DecodeError
+        instances, indicating the line, record type and field of each error.
+
+        :param data: dictionary with the data to parse
+        :return: a tuple with the CWRFile instance and the list of errors
+        """
+        file_name = self._filename_decoder.decode(mapped.file_name(data))
+
+        if self._piece_decoder is None:
+            self._piece_decoder = default_file_automaton_decoder()
+
+        if 'contents' not in data:
+            with MappedFile(data['path']) as mapped_file:
+                transmission, errors = decode_lenient(self._piece_decoder,
+                                                      mapped_file)
+        else:
+            contents = data['contents']
+            if isinstance(contents, str):
+                contents = contents.splitlines()
+
+            transmission, errors = decode_lenient(self._piece_decoder,
+                                                  contents)
+
+        return CWRFile(file_name, transmission), errors
+
+
+class FileStreamDecoder(Decoder):
+    """
+    Parses a CWR file line by line, creating the model instances for each
+    transaction as soon as it has been read.
+
+    Instead of applying a single grammar rule to the full file, the lines are
+    split into the pieces of the transmission (see the stream module), and
+    each of them is parsed with its own rule. This way memory usage depends on
+    the size of the biggest transaction, and not on the size of the file.
+
+    The events method returns these pieces as they are decoded, while the
+    decode method joins them into a CWRFile, just like the FileDecoder.
+    """
+
+    def __init__(self, rules, filename_decoder, splitter=None,
+                 validator=None):
+        super(FileStreamDecoder, self).__init__()
+
+        # Logger
+        self._logger = logging.getLogger(__name__)
+
+        self._filename_decoder = filename_decoder
+
+        self._decoders = {}
+        for piece, rule in rules.items():
+            self._decoders[piece] = GrammarDecoder(rule)
+
+        if splitter:
+            self._splitter = splitter
+        else:
+            self._splitter = RecordSplitter()
+
+        self._validator = validator
+
+    @property
+    def validator(self):
+        """
+        Validator checking the contents of the decoded files, if any.
+
+        After decoding a file it contains the violations found on it.
+
+        :return: the StreamValidator, or None
+        """
+        return self._validator
+
+    def decode_piece(self, piece, lines, line_n=1):
+        """
+        Parses a single piece of the transmission.
+
+        Transactions are returned as a list of records, while the other pieces
+        are returned as a single record.
+
+        :param piece: id of the transmission piece
+        :param lines: lines composing the piece
+        :param line_n: number of the first line, used on error messages
+        :return: the model instances created from the lines
+        """
+        try:
+            result = self._decoders[piece].decode('\n'.join(lines))
+        except pp.ParseBaseException as e:
+            message = 'Invalid %s on line %s: %s' % (
+                piece, line_n + e.lineno - 1, e.msg)
+            raise pp.ParseException(e.pstr, e.loc, message, e.parserElement)
+
+        if piece == TRANSACTION:
+            result = list(result)
+        else:
+            result = result[0]
+
+        return result
+
+    def events(self, stream):
+        """
+        Parses the file line by line, returning each piece of the transmission
+        as soon as it has been decoded.
+
+        These are returned as tuples composed of the piece id, and the model
+        instances created from it.
+
+        :param stream: file-like object or iterable of lines
+        :return: a generator of (piece id, value) tuples
+        """
+        for piece, line_n, lines in self._splitter.split(read_lines(stream)):
+            yield piece, self.decode_piece(piece, lines, line_n)
+
+    def decode(self, data):
+        """
+        Parses the file, creating a CWRFile from it.
+
+        It requires a dictionary with two values:
+        - filename, containing the filename
+        - contents, containing the file contents, either as a string or as a
+        file-like object
+
+        Instead of the contents, the dictionary can contain the path to the
+        file, which will be read line by line through a memory map. In this
+        case the filename is optional, as it can be taken from the path.
+
+        :param data: dictionary with the data to parse
+        :return: a CWRFile instance
+        """
+        file_name = self._filename_decoder.decode(mapped.file_name(data))
+
+        if 'contents' not in data:
+            with MappedFile(data['path']) as mapped_file:
+                transmission = self.assemble(
+                    self._validated(self.events(mapped_file)))
+        else:
+            contents = data['contents']
+            if isinstance(contents, str):
+                contents = contents.splitlines()
+
+            transmission = self.assemble(
+                self._validated(self.events(contents)))
+
+        return CWRFile(file_name, transmission)
+
+    @staticmethod
+    def assemble(events):
+        """
+        Joins the pieces of a transmission into a Transmission instance.
+
+        :param events: iterable of (piece id, value) tuples
+        :return: a Transmission instance
+        """
+        return assemble(events)
+
+    def _validated(self, events):
+        if self._validator is None:
+            return events
+        else:
+            return self._validator.check(events)
+
 
 class FileNameDecoder(Decoder):
     """
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+import pyparsing as pp
+
+from cwr.grammar.field import convert
+from cwr.grammar.field.lookup import lookup_values
+from cwr.other import AVIKey
+from cwr.parser.decoder.common import Decoder
+from data_cwr.accessor import CWRTables
+
+"""
+Fixed-width decoder for CWR records.
+
+This is a fast path for decoding single records, which does not use the
+Pyparsing grammar. Instead, the layout of each record, built from the same
+configuration files as the grammar, indicates the columns taken by each field,
+so a line can be decoded just by slicing it and converting each slice with a
+function for the field type.
+
+The result is the same dictionary which would be created by the grammar rules,
+which is then handed to the same dictionary decoders the grammar uses to
+create the model instances.
+
+When a field contains an invalid value a ParseException is raised, as the
+grammar would do, pointing to the column where the field begins.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Characters not allowed on Alphanumeric fields
+_alphanum_invalid = re.compile('[a-z]|[^\x00-\x7F]')
+_alphanum_ext_invalid = re.compile('[a-z]')
+
+# Patterns for special fields
+_date_pattern = re.compile('[0-9]{4}(0[1-9]|1[0-2])(0[1-9]|[1-2][0-9]|3[0-1])$')
+_time_pattern = re.compile('(0[0-9]|1[0-9]|2[0-3])[0-5][0-9][0-5][0-9]$')
+_iswc_pattern = re.compile('T[0-9]{10}$')
+_ipi_base_pattern = re.compile('I-[0-9]{9}-[0-9]$')
+_isrc_pattern = re.compile('..-.{3}-[0-9]{2}-[0-9]{2}$|.{5}[0-9]{7}$')
+_charset_pattern = re.compile('U\\+0[0-8,A-F]{3,4}$')
+
+
+class RecordParseException(pp.ParseException):
+    """
+    Raised when a record can't be parsed.
+
+    Along the usual ParseException values, it indicates the record type, the
+    id of the invalid field, if the error was caused by a field, and the
+    number of the line on the file, if it is known.
+    """
+
+    def __init__(self, pstr, loc=0, msg=None, elem=None, record_type=None,
+                 field_id=None, line_n=None):
+        super(RecordParseException, self).__init__(pstr, loc, msg, elem)
+        self.record_type = record_type
+        self.field_id = field_id
+        self.line_n = line_n
+
+
+class _InvalidValue(Exception):
+    """
+    Raised by the converters when a value is not valid for the field.
+    """
+    pass
+
+
+def _to_alphanum(raw, field):
+    if _alphanum_invalid.search(raw):
+        raise _InvalidValue('Invalid characters')
+    return _check_not_empty(raw.strip())
+
+
+def _to_alphanum_ext(raw, field):
+    if _alphanum_ext_invalid.search(raw):
+        raise _InvalidValue('Invalid characters')
+    return _check_not_empty(raw.strip())
+
+
+def _check_not_empty(value):
+    if not value:
+        raise _InvalidValue('The string should not be empty')
+    return value
+
+
+def _to_numeric(raw, field):
+    if not raw.isdigit():
+        raise _InvalidValue('Not a number')
+    return int(raw)
+
+
+def _to_percentage(raw, field):
+    if not raw.isdigit():
+        raise _InvalidValue('Not a number')
+
+    value = convert.to_numeric_float(raw, 3)
+
+    if field.values:
+        maximum = int(field.values[0])
+    else:
+        maximum = 100
+
+    if value > maximum:
+        raise _InvalidValue('The percentage should be between 0 and %s' %
+                            maximum)
+
+    return value
+
+
+def _to_numeric_float(raw, field):
+    if not raw.isdigit():
+        raise _InvalidValue('Not a number')
+
+    if field.values:
+        nums_int = int(field.values[0])
+    else:
+        nums_int = field.columns
+
+    return convert.to_numeric_float(raw, nums_int)
+
+
+def _to_boolean(raw, field):
+    if raw == 'Y':
+        return True
+    elif raw == 'N':
+        return False
+    raise _InvalidValue('Is not a valid boolean value')
+
+
+def _to_flag(raw, field):
+    if raw not in ('Y', 'N', 'U'):
+        raise _InvalidValue('Is not a valid flag value')
+    return raw
+
+
+def _to_date(raw, field):
+    value = convert.dates.get(raw)
+    if value is None:
+        if not _date_pattern.match(raw):
+            raise _InvalidValue('Is not a valid date')
+        value = convert.to_date(raw)
+    return value
+
+
+def _to_time(raw, field):
+    value = convert.times.get(raw)
+    if value is None:
+        if not _time_pattern.match(raw):
+            raise _InvalidValue('Is not a valid time')
+        value = convert.to_time(raw)
+    return value
+
+
+def _to_date_time(raw, field):
+    value = convert.date_times.get(raw)
+    if value is None:
+        if not _date_pattern.match(raw[:8]) or not _time_pattern.match(
+                raw[8:]):
+            raise _InvalidValue('Is not a valid date and time')
+        value = convert.to_date_time(raw)
+    return value
+
+
+def _check_date(raw, field):
+    if not _date_pattern.match(raw):
+        raise _InvalidValue('Is not a valid date')
+    return raw
+
+
+def _check_time(raw, field):
+    if not _time_pattern.match(raw):
+        raise _InvalidValue('Is not a valid time')
+    return raw
+
+
+def _check_date_time(raw, field):
+    if not _date_pattern.match(raw[:8]) or not _time_pattern.match(raw[8:]):
+        raise _InvalidValue('Is not a valid date and time')
+    return raw
+
+
+def _to_blank(raw, field):
+    if raw.strip():
+        raise _InvalidValue('The field should be blank')
+    return raw
+
+
+def _to_lookup(raw, field):
+    # Some values, such as 'E ', include whitespaces
+    if raw not in field.values and raw.rstrip() not in field.values:
+        raise _InvalidValue('Is not one of the allowed values')
+    return raw.strip()
+
+
+def _to_lookup_int(raw, field):
+    return int(_to_lookup(raw, field))
+
+
+def _to_iswc(raw, field):
+    if not _iswc_pattern.match(raw):
+        raise _InvalidValue('Is not a valid ISWC')
+    return raw
+
+
+def _to_ipi_base_n(raw, field):
+    if _ipi_base_pattern.match(raw):
+        return raw
+    return _to_numeric(raw, field)
+
+
+def _to_isrc(raw, field):
+    if not _isrc_pattern.match(raw):
+        raise _InvalidValue('Is not a valid ISRC')
+    return raw
+
+
+def _to_visan(raw, field):
+    if not raw.isdigit():
+        raise _InvalidValue('Is not a valid V-ISAN')
+    return raw
+
+
+def _to_avi(raw, field):
+    society_code = _to_numeric(raw[:3], field)
+    if raw[3:].strip():
+        av_number = _to_alphanum(raw[3:], field)
+    else:
+        av_number = ''
+    return AVIKey(society_code, av_number)
+
+
+def _to_charset(raw, field):
+    value = raw.strip()
+    if value not in field.values and not _charset_pattern.match(value):
+        raise _InvalidValue('Is not a valid character set')
+    return value
+
+
+_converters = {'alphanum': _to_alphanum,
+               'alphanum_ext': _to_alphanum_ext,
+               'numeric': _to_numeric,
+               'numeric_float': _to_numeric_float,
+               'percentage': _to_percentage,
+               'boolean': _to_boolean,
+               'flag': _to_flag,
+               'date': _to_date,
+               'time': _to_time,
+               'date_time': _to_date_time,
+               'blank': _to_blank,
+               'lookup': _to_lookup,
+               'lookup_int': _to_lookup_int,
+               'iswc': _to_iswc,
+               'ipi_name_n': _to_numeric,
+               'ipi_base_n': _to_ipi_base_n,
+               'ean13': _to_numeric,
+               'isrc': _to_isrc,
+               'visan': _to_visan,
+               'avi': _to_avi,
+               'charset': _to_charset}
+
+# Checks for the fields which can be kept as strings
+_raw_checkers = {'date': _check_date,
+                 'time': _check_time,
+                 'date_time': _check_date_time}
+
+
+class _CompiledField(object):
+    """
+    A field layout along the converter for its values.
+
+    Lookup values are stored in sets for fast validation.
+    """
+
+    def __init__(self, field):
+        self.field_id = field.field_id
+        self.field_type = field.field_type
+        self.start = field.position
+        self.end = field.end
+        self.columns = field.columns
+        self.name = field.results_name
+        self.compulsory = field.compulsory
+        self.converter = _converters[field.field_type]
+        self.raw_converter = _raw_checkers.get(field.field_type,
+                                               self.converter)
+
+        # Blank fields never become None
+        self.nullable = not field.compulsory and field.field_type != 'blank'
+
+        if field.field_type in ('lookup', 'lookup_int'):
+            self.values = lookup_values(field.values)
+        elif field.field_type == 'charset':
+            self.values = frozenset(CWRTables().get_data('character_set'))
+        else:
+            self.values = field.values
+
+
+class FixedWidthRecordDecoder(Decoder):
+    """
+    Decodes CWR records by slicing the line according to the record layout.
+
+    This requires a layouts factory, which will give the layout for each
+    record, and the dictionary decoders to be used for each record, indexed
+    by the record rule id.
+
+    Lines are matched to a layout by their record type. If several layouts
+    accept the same record type, they will be tried in order, unless the rule
+    id is indicated when decoding.
+    """
+
+    # Records keeping the interested party data on a nested dictionary
+    _nested_records = ('publisher', 'writer')
+
+    def __init__(self, layout_factory, decoders):
+        super(FixedWidthRecordDecoder, self).__init__()
+
+        self._decoders = decoders
+
+        # Compiled variants for each rule id
+        self._variants = {}
+        # Rule ids for each record type
+        self._rule_ids = {}
+
+        for layout in layout_factory.get_layouts():
+            variants = []
+            for variant in layout.variants:
+                fields = [_CompiledField(field) for field in variant]
+                length = fields[-1].end
+                variants.append((length, fields))
+            self._variants[layout.rule_id] = variants
+
+            for head in layout.heads:
+                if head not in self._rule_ids:
+                    self._rule_ids[head] = []
+                self._rule_ids[head].append(layout.rule_id)
+
+    def decode(self, line, rule_id=None):
+        """
+        Decodes the line, creating the model instance for its record.
+
+        :param line: the line to decode
+        :param rule_id: id of the rule for the record
+        :return: a model instance created from the line
+        """
+        rule_id, values = self._decode_line(line, rule_id)
+
+        return self._decoders[rule_id].decode(values)
+
+    def decode_dictionary(self, line, rule_id=None):
+        """
+        Decodes the line into a dictionary, with the same values the grammar
+        rules would return.
+
+        :param line: the line to decode
+        :param rule_id: id of the rule for the record
+        :return: a dictionary created from the line
+        """
+        return self._decode_line(line, rule_id)[1]
+
+    def decode_values(self, line, rule_id=None, raw=False):
+        """
+        Decodes the line into a dictionary, as the decode_dictionary method,
+        returning also the id of the rule which accepted the line.
+
+        The Date, Time and Date and Time fields can be kept as strings, only
+        checking their pattern, so they can be converted later with the list
+        converters of the convert module. Values such as the 30th of
+        February pass this check, and fail only when converted.
+
+        :param line: the line to decode
+        :param rule_id: id of the rule for the record
+        :param raw: indicates if the dates and times are kept as strings
+        :return: a tuple with the rule id and the dictionary for the line
+        """
+        return self._decode_line(line, rule_id, raw)
+
+    def create(self, rule_id, values):
+        """
+        Creates the model instance for a dictionary of record values, such as
+        the ones returned by the decode_dictionary method.
+
+        :param rule_id: id of the rule for the record
+        :param values: the record values
+        :return: a model instance created from the values
+        """
+        if rule_id in self._nested_records and rule_id not in values:
+            values = dict(values)
+            values[rule_id] = dict(values)
+
+        return self._decoders[rule_id].decode(values)
+
+    def fields(self, rule_id):
+        """
+        Returns the fields for the record identified by the rule id.
+
+        These are the fields of all the layout variants. Fields which are
+        alternatives for the same value, and so share the results name, are
+        returned only once.
+
+        :param rule_id: id of the rule for the record
+        :return: list with the record fields
+        """
+        fields = []
+        names = set()
+        for _, variant in self._variants[rule_id]:
+            for field in variant:
+                if field.name not in names:
+                    names.add(field.name)
+                    fields.append(field)
+
+        return fields
+
+    def rule_ids(self, record_type):
+        """
+        Returns the ids of the record rules accepting a record type.
+
+        :param record_type: the record type code
+        :return: list with the rules ids
+        """
+        return self._rule_ids.get(record_type, [])
+
+    def _decode_line(self, line, rule_id=None, raw_values=False):
+        if rule_id is None:
+            rule_ids = self._rule_ids.get(line[:3])
+            if not rule_ids:
+                raise RecordParseException(line, 0, 'Unknown record type',
+                                           record_type=line[:3])
+        else:
+            rule_ids = [rule_id]
+
+        length = len(line)
+        error = None
+        for rule_id in rule_ids:
+            for variant_length, fields in self._variants[rule_id]:
+                if variant_length < length:
+                    # Trailing whitespaces are ignored
+                    if line[variant_length:].strip():
+                        continue
+                elif variant_length > length:
+                    continue
+
+                try:
+                    values = self._decode_fields(
+                        line.ljust(variant_length), fields, raw_values)
+                except pp.ParseException as e:
+                    if error is None:
+                        error = e
+                    continue
+
+                if rule_id in self._nested_records:
+                    values[rule_id] = dict(values)
+
+                return rule_id, values
+
+        if error is None:
+            error = RecordParseException(line, 0,
+                                         'Invalid record length %s' % length,
+                                         record_type=line[:3])
+
+        raise error
+
+    @staticmethod
+    def _decode_fields(line, fields, raw_values=False):
+        values = {}
+
+        for field in fields:
+            raw = line[field.start:field.end]
+
+            if field.nullable and (not raw.strip() or (
+                    field.field_type == 'date' and raw == '00000000')):
+                values[field.name] = None
+                continue
+
+            try:
+                if raw_values:
+                    values[field.name] = field.raw_converter(raw, field)
+                else:
+                    values[field.name] = field.converter(raw, field)
+            except (_InvalidValue, ValueError) as e:
+                raise RecordParseException(line, field.start,
+                                           '%s (%s)' % (e, field.field_id),
+                                           record_type=line[:3],
+                                           field_id=field.field_id)
+
+        return values
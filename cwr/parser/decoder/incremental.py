@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import hashlib
+import logging
+import os
+import pickle
+
+from cwr.file import CWRFile
+from cwr.grammar.factory.cache import config_hash, load_pickle, model_hash, \
+    save_pickle
+from cwr.parser.decoder import mapped
+from cwr.parser.decoder.common import Decoder
+from cwr.parser.decoder.mapped import MappedFile
+from cwr.parser.decoder.stream import TRANSACTION, RecordSplitter, \
+    assemble, read_lines
+
+"""
+Incremental decoding of CWR files.
+
+Publishers usually send again the same file with only a few works changed.
+Instead of parsing all of it each time, the IncrementalFileDecoder splits the
+file into its transactions (see the stream module), and looks for each of
+them on a TransactionCache, which keeps the transactions already decoded
+indexed by a hash of their lines. Only the transactions missing from the
+cache are parsed, and then stored on it.
+
+The transaction sequence numbers are not part of the hash, as they change
+each time a transaction is added or removed before. Instead, they are set
+again on the records taken from the cache, so the result is the same as
+parsing the full file.
+
+The cache is stored on disk, identified by a hash of the configuration files
+like the cached record layouts, and a hash of the model classes, so it can be
+used by any following run of the same code.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Changes when the cached transactions structure changes
+_CACHE_VERSION = '1'
+
+
+def transaction_hash(lines):
+    """
+    Creates a hash for the lines of a transaction.
+
+    The transaction sequence number of each line is ignored.
+
+    :param lines: lines of the transaction
+    :return: the digest of the lines
+    """
+    digest = hashlib.sha1()
+
+    for line in lines:
+        digest.update(line[:3].encode('utf-8'))
+        digest.update(line[11:].encode('utf-8'))
+        digest.update(b'\n')
+
+    return digest.digest()
+
+
+class TransactionCache(object):
+    """
+    Persistent cache for decoded transactions.
+
+    Transactions are stored serialized, indexed by the hash of their lines,
+    so each time one is read from the cache a new copy is created. When the
+    cache is full, the least recently used transaction is discarded.
+
+    The transactions are read from the cache folder the first time the cache
+    is used, and written back to it with the save method.
+    """
+
+    def __init__(self, directory, max_size=50000, key=None):
+        """
+        Constructs a TransactionCache.
+
+        :param directory: folder for the cached file
+        :param max_size: maximum number of transactions stored
+        :param key: key identifying the cached transactions, by default the
+        hashes of the configuration files and the model classes
+        """
+        self._directory = directory
+        self._max_size = max_size
+
+        if key is None:
+            key = '%s-%s' % (config_hash(), model_hash())
+        self._key = key
+
+        # Serialized transactions, indexed by hash
+        self._values = None
+        # Indicates if there are changes not saved
+        self._modified = False
+
+    def __len__(self):
+        return len(self._get_values())
+
+    def __contains__(self, digest):
+        return digest in self._get_values()
+
+    @property
+    def max_size(self):
+        """
+        Maximum number of transactions stored.
+
+        :return: the maximum size of the cache
+        """
+        return self._max_size
+
+    @property
+    def modified(self):
+        """
+        Indicates if the cache contains changes which have not been saved.
+
+        :return: True if the cache has been modified, False otherwise
+        """
+        return self._modified
+
+    @property
+    def path(self):
+        """
+        Path to the cached transactions file.
+
+        :return: the cache file path
+        """
+        return os.path.join(self._directory, 'transactions-%s-%s.pickle' %
+                            (_CACHE_VERSION, self._key))
+
+    def clear(self):
+        """
+        Removes all the transactions stored.
+        """
+        self._get_values().clear()
+        self._modified = True
+
+    def get(self, digest):
+        """
+        Returns a copy of the transaction stored for a hash, or None if there
+        is none.
+
+        :param digest: hash of the transaction lines
+        :return: the transaction records
+        """
+        values = self._get_values()
+
+        value = values.get(digest)
+        if value is None:
+            return None
+
+        values.move_to_end(digest)
+
+        try:
+            return pickle.loads(value)
+        except Exception:
+            # Can't be read, so it is handled as a missing transaction
+            del values[digest]
+            self._modified = True
+            return None
+
+    def put(self, digest, transaction):
+        """
+        Stores a transaction, discarding the least recently used if the cache
+        is full.
+
+        :param digest: hash of the transaction lines
+        :param transaction: the transaction records
+        """
+        values = self._get_values()
+
+        values[digest] = pickle.dumps(transaction, pickle.HIGHEST_PROTOCOL)
+        values.move_to_end(digest)
+
+        while len(values) > self._max_size:
+            values.popitem(last=False)
+
+        self._modified = True
+
+    def save(self):
+        """
+        Writes the transactions to the cache folder, if there are changes.
+        """
+        if not self._modified:
+            return
+
+        save_pickle(self._values, self.path)
+
+        self._modified = False
+
+    def _get_values(self):
+        if self._values is None:
+            self._values = self._load()
+
+        return self._values
+
+    def _load(self):
+        values = load_pickle(self.path)
+
+        if not isinstance(values, collections.OrderedDict):
+            values = collections.OrderedDict()
+
+        return values
+
+
+class DecodeStats(object):
+    """
+    Statistics for an incremental decoding.
+    """
+
+    __slots__ = ('transactions', 'reused', 'decoded')
+
+    def __init__(self):
+        self.transactions = 0
+        self.reused = 0
+        self.decoded = 0
+
+    def __repr__(self):
+        return '<class %s>(transactions=%r, reused=%r, decoded=%r)' % (
+            self.__class__.__name__, self.transactions, self.reused,
+            self.decoded)
+
+    def as_dict(self):
+        """
+        Returns the statistics as a dictionary.
+
+        :return: a dictionary with the statistics
+        """
+        return {'transactions': self.transactions,
+                'reused': self.reused,
+                'decoded': self.decoded}
+
+
+class IncrementalFileDecoder(Decoder):
+    """
+    Parses a CWR file, reusing the transactions already decoded on previous
+    files.
+
+    The pieces of the transmission are parsed with a stream decoder, such as
+    the FileStreamDecoder, except for the transactions found on the cache.
+
+    The statistics for the last file decoded, which indicate how many
+    transactions were taken from the cache, are kept on the stats property.
+    """
+
+    def __init__(self, piece_decoder, filename_decoder, cache,
+                 splitter=None):
+        """
+        Constructs an IncrementalFileDecoder.
+
+        :param piece_decoder: decoder for the transmission pieces
+        :param filename_decoder: decoder for the filename
+        :param cache: cache for the decoded transactions
+        :param splitter: splitter for the lines of the file
+        """
+        super(IncrementalFileDecoder, self).__init__()
+
+        # Logger
+        self._logger = logging.getLogger(__name__)
+
+        self._piece_decoder = piece_decoder
+        self._filename_decoder = filename_decoder
+        self._cache = cache
+
+        if splitter:
+            self._splitter = splitter
+        else:
+            self._splitter = RecordSplitter()
+
+        self._stats = DecodeStats()
+
+    @property
+    def cache(self):
+        """
+        Cache for the decoded transactions.
+
+        :return: the transactions cache
+        """
+        return self._cache
+
+    @property
+    def stats(self):
+        """
+        Statistics for the last file decoded.
+
+        :return: the decoding statistics
+        """
+        return self._stats
+
+    def events(self, stream):
+        """
+        Parses the file line by line, returning each piece of the transmission
+        as soon as it has been decoded or taken from the cache.
+
+        These are returned as tuples composed of the piece id, and the model
+        instances created from it, as done by the FileStreamDecoder.
+
+        The statistics are updated while the pieces are returned.
+
+        :param stream: file-like object or iterable of lines
+        :return: a generator of (piece id, value) tuples
+        """
+        self._stats = stats = DecodeStats()
+
+        for piece, line_n, lines in self._splitter.split(read_lines(stream)):
+            if piece == TRANSACTION:
+                stats.transactions += 1
+                value = self._decode_transaction(lines, line_n, stats)
+            else:
+                value = self._piece_decoder.decode_piece(piece, lines, line_n)
+
+            yield piece, value
+
+    def decode(self, data):
+        """
+        Parses the file, creating a CWRFile from it.
+
+        It requires a dictionary with two values:
+        - filename, containing the filename
+        - contents, containing the file contents, either as a string or as a
+        file-like object
+
+        Instead of the contents, the dictionary can contain the path to the
+        file, which will be read line by line through a memory map. In this
+        case the filename is optional, as it can be taken from the path.
+
+        The cache is saved once the file has been decoded.
+
+        :param data: dictionary with the data to parse
+        :return: a CWRFile instance
+        """
+        file_name = self._filename_decoder.decode(mapped.file_name(data))
+
+        if 'contents' not in data:
+            with MappedFile(data['path']) as mapped_file:
+                transmission = assemble(self.events(mapped_file))
+        else:
+            contents = data['contents']
+            if isinstance(contents, str):
+                contents = contents.splitlines()
+
+            transmission = assemble(self.events(contents))
+
+        self._cache.save()
+
+        self._logger.debug('Reused %s of %s transactions',
+                           self._stats.reused, self._stats.transactions)
+
+        return CWRFile(file_name, transmission)
+
+    def _decode_transaction(self, lines, line_n, stats):
+        digest = transaction_hash(lines)
+
+        records = self._cache.get(digest)
+        if records is not None and len(records) == len(lines):
+            for record, line in zip(records, lines):
+                record.transaction_sequence_n = int(line[3:11])
+            stats.reused += 1
+            return records
+
+        records = self._piece_decoder.decode_piece(TRANSACTION, lines, line_n)
+        stats.decoded += 1
+
+        # Only transactions with a record for each line can be reused
+        if len(records) == len(lines):
+            self._cache.put(digest, records)
+
+        return records
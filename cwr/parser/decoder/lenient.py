@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+
+import pyparsing as pp
+
+from cwr.group import Group
+from cwr.parser.decoder.stream import GROUP_HEADER, GROUP_TRAILER, HEADER, \
+    TRAILER, TRANSACTION, RecordSplitter, read_lines
+from cwr.transmission import Transmission
+
+"""
+Lenient decoding of CWR files.
+
+When a single record is invalid the grammar for the full file fails, so
+nothing can be read from the file. For ingesting files it is better to keep
+all the valid data, and report the errors found.
+
+This is done by splitting the file into the pieces of the transmission (see
+the stream module), and decoding each of them on its own. When a piece is
+invalid, the error is stored and the piece ignored, and decoding continues
+on the next piece. As pieces begin on each transaction header and control
+record, and on any record with an unknown record type, an error never affects
+more than a transaction.
+
+The only exception are the group headers. When one is invalid, or missing,
+the transactions of its group can't be stored on the Transmission, so each of
+them is reported as an error too.
+
+The valid pieces are then joined into a Transmission, which is built even
+if some of the control records are missing.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class DecodeError(object):
+    """
+    Error found while decoding a piece of the transmission.
+
+    It indicates the line where the error was found, the record type of that
+    line, and the id of the invalid field, if the error was caused by a
+    field. This id is the one used on the fields configuration.
+    """
+
+    __slots__ = ('_piece', '_line_n', '_record_type', '_field_id',
+                 '_message')
+
+    def __init__(self, piece, line_n, record_type, field_id, message):
+        """
+        Constructs a DecodeError.
+
+        :param piece: id of the transmission piece containing the error
+        :param line_n: number of the line with the error
+        :param record_type: record type of the line with the error
+        :param field_id: id of the invalid field, if known
+        :param message: description of the error
+        """
+        self._piece = piece
+        self._line_n = line_n
+        self._record_type = record_type
+        self._field_id = field_id
+        self._message = message
+
+    def __str__(self):
+        return 'Line %s (%s): %s' % (self._line_n, self._record_type,
+                                     self._message)
+
+    def __repr__(self):
+        return '<class %s>(piece=%r, line_n=%r, record_type=%r, ' \
+               'field_id=%r, message=%r)' % (
+                   self.__class__.__name__, self._piece, self._line_n,
+                   self._record_type, self._field_id, self._message)
+
+    @property
+    def field_id(self):
+        """
+        Id of the invalid field, or None if the error was not caused by a
+        field.
+
+        :return: the id of the invalid field
+        """
+        return self._field_id
+
+    @property
+    def line_n(self):
+        """
+        Number of the line with the error, starting with 1.
+
+        :return: the line number
+        """
+        return self._line_n
+
+    @property
+    def message(self):
+        """
+        Description of the error.
+
+        :return: the error message
+        """
+        return self._message
+
+    @property
+    def piece(self):
+        """
+        Id of the transmission piece containing the error.
+
+        :return: the piece id
+        """
+        return self._piece
+
+    @property
+    def record_type(self):
+        """
+        Record type of the line with the error.
+
+        :return: the record type
+        """
+        return self._record_type
+
+
+def decode_error(piece, line_n, error):
+    """
+    Creates a DecodeError from the exception raised when decoding a piece.
+
+    The exceptions raised by the fixed-width and automaton decoders indicate
+    the line, record type and field of the error. For any other exception
+    these are taken from the position of the error on the piece.
+
+    :param piece: id of the transmission piece
+    :param line_n: number of the first line of the piece
+    :param error: the ParseException raised
+    :return: a DecodeError for the exception
+    """
+    error_line_n = getattr(error, 'line_n', None)
+    if error_line_n is None:
+        error_line_n = line_n + error.lineno - 1
+
+    record_type = getattr(error, 'record_type', None)
+    if record_type is None:
+        record_type = error.line[:3]
+
+    return DecodeError(piece, error_line_n, record_type,
+                       getattr(error, 'field_id', None), error.msg)
+
+
+def lenient_events(piece_decoder, stream, errors, splitter=None):
+    """
+    Decodes the pieces of the transmission, storing the errors found instead
+    of raising them.
+
+    Invalid pieces are returned with None as their value. This includes the
+    transactions on a group with an invalid or missing header, even if they
+    are valid themselves.
+
+    :param piece_decoder: decoder with a decode_piece method, such as the
+    stream or the automaton decoders
+    :param stream: file-like object or iterable of lines
+    :param errors: list where the errors will be stored
+    :param splitter: splitter for the lines of the file, by default a lenient
+    one
+    :return: a generator of (piece id, value) tuples
+    """
+    if splitter is None:
+        splitter = RecordSplitter(lenient=True)
+
+    # Indicates if the current group has a valid header, None if there is no
+    # current group
+    valid_group = None
+
+    for piece, line_n, lines in splitter.split(read_lines(stream)):
+        try:
+            value = piece_decoder.decode_piece(piece, lines, line_n)
+        except pp.ParseBaseException as e:
+            errors.append(decode_error(piece, line_n, e))
+            value = None
+
+        if piece == GROUP_HEADER:
+            valid_group = value is not None
+        elif piece == GROUP_TRAILER:
+            valid_group = None
+        elif piece == TRANSACTION and value is not None and not valid_group:
+            if valid_group is None:
+                message = 'Transaction outside a group'
+            else:
+                message = 'Transaction on a group with an invalid header'
+            errors.append(DecodeError(piece, line_n, lines[0][:3], None,
+                                      message))
+            value = None
+
+        yield piece, value
+
+
+def assemble_lenient(events):
+    """
+    Joins the pieces of a transmission into a Transmission instance, ignoring
+    invalid pieces.
+
+    Missing control records are left as None, but groups without a valid
+    header are ignored, along with their transactions.
+
+    :param events: iterable of (piece id, value) tuples
+    :return: a Transmission instance
+    """
+    header = None
+    trailer = None
+    groups = []
+
+    group_header = None
+    transactions = None
+
+    for piece, value in events:
+        if piece == HEADER:
+            header = value
+        elif piece == GROUP_HEADER:
+            if transactions is not None:
+                groups.append(Group(group_header, None, transactions))
+            if value is None:
+                group_header = None
+                transactions = None
+            else:
+                group_header = value
+                transactions = []
+        elif piece == TRANSACTION:
+            if transactions is not None and value is not None:
+                transactions.append(value)
+        elif piece == GROUP_TRAILER:
+            if transactions is not None:
+                groups.append(Group(group_header, value, transactions))
+            group_header = None
+            transactions = None
+        elif piece == TRAILER:
+            trailer = value
+
+    if transactions is not None:
+        groups.append(Group(group_header, None, transactions))
+
+    return Transmission(header, trailer, groups)
+
+
+def decode_lenient(piece_decoder, stream, splitter=None):
+    """
+    Decodes the contents of a CWR file, ignoring the invalid pieces.
+
+    :param piece_decoder: decoder with a decode_piece method
+    :param stream: file-like object or iterable of lines
+    :param splitter: splitter for the lines of the file
+    :return: a tuple with the Transmission and the list of errors
+    """
+    errors = []
+
+    transmission = assemble_lenient(
+        lenient_events(piece_decoder, stream, errors, splitter))
+
+    return transmission, errors
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+import codecs
+import mmap
+import os
+
+"""
+Memory-mapped access to CWR files.
+
+Reading a CWR file into a string before parsing it requires decoding the full
+file, and keeping both the bytes and the text in memory. For big files it is
+better to map the file into memory and read each line only when it is needed.
+
+The MappedFile takes care of this. It locates the lines by looking for the
+line separators on the raw bytes, and decodes each line when it is iterated.
+
+Lines are decoded as Latin-1 by default. But if the transmission header
+indicates a character set, then this will be used instead.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Default encoding for CWR files
+DEFAULT_ENCODING = 'latin-1'
+
+# Columns of the character set field on the transmission header
+_charset_start = 86
+_charset_end = 101
+
+# Codecs for character sets which are not known by Python with the same name
+_charset_codecs = {'GB': 'gb2312'}
+
+
+def charset_encoding(character_set, default=DEFAULT_ENCODING):
+    """
+    Returns the Python codec for a CWR character set.
+
+    Unicode character sets, which are indicated with their code, are read as
+    UTF-8. If the character set is unknown, then the default encoding is
+    returned.
+
+    :param character_set: character set from the transmission header
+    :param default: encoding used when the character set is not known
+    :return: the name of the codec to use
+    """
+    if not character_set:
+        return default
+
+    if character_set.startswith('U+'):
+        return 'utf-8'
+
+    character_set = _charset_codecs.get(character_set, character_set)
+    try:
+        return codecs.lookup(character_set).name
+    except LookupError:
+        return default
+
+
+def file_name(data):
+    """
+    Returns the name of the file to decode.
+
+    This is the 'filename' value from the data received by the file decoders,
+    or the name of the file on its path if there is no such value.
+
+    :param data: dictionary with the data to parse
+    :return: the name of the file
+    """
+    if data.get('filename'):
+        return data['filename']
+    else:
+        return os.path.basename(data['path'])
+
+
+class MappedFile(object):
+    """
+    Memory-mapped CWR file, which can be iterated to read its lines.
+
+    Lines are returned without the line separators. If no encoding is
+    received, then the character set in the transmission header will be
+    used, or Latin-1 if the header does not indicate one.
+
+    The file should be closed once it is not needed, which can be done by
+    using it as a context manager.
+    """
+
+    def __init__(self, path, encoding=None):
+        """
+        Constructs a MappedFile.
+
+        :param path: path to the CWR file
+        :param encoding: encoding for the file, by default it is read from
+        the header
+        """
+        self._path = path
+        self._file = open(path, 'rb')
+
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        else:
+            # Empty files can't be mapped
+            self._map = b''
+
+        if encoding is None:
+            encoding = charset_encoding(self._header_charset())
+        self._encoding = encoding
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        for start, end in self.bounds():
+            yield self._map[start:end].decode(self._encoding)
+
+    @property
+    def encoding(self):
+        """
+        Encoding used to decode the lines.
+
+        :return: the name of the encoding
+        """
+        return self._encoding
+
+    @property
+    def path(self):
+        """
+        Path to the mapped file.
+
+        :return: the file path
+        """
+        return self._path
+
+    def bounds(self):
+        """
+        Locates the lines on the file.
+
+        The line separators are not included in the lines.
+
+        :return: a generator of (start, end) tuples with the position of each
+        line
+        """
+        size = len(self._map)
+        start = 0
+        while start < size:
+            end = self._map.find(b'\n', start)
+            if end < 0:
+                end = size
+                following = size
+            else:
+                following = end + 1
+
+            if end > start and self._map[end - 1:end] == b'\r':
+                end -= 1
+
+            yield start, end
+            start = following
+
+    def close(self):
+        """
+        Closes the mapped file.
+        """
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def _header_charset(self):
+        for start, end in self.bounds():
+            line = self._map[start:end]
+            if not line.strip():
+                continue
+
+            # Some files include a heading byte order mark
+            i = line.find(b'HDR')
+            if i < 0 or line[:i].strip(b'\xef\xbb\xbf\xff\xfe '):
+                return None
+
+            line = line[i:]
+            return line[_charset_start:_charset_end].decode(
+                DEFAULT_ENCODING).strip()
+
+        return None
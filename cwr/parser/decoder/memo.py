@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import threading
+
+import pyparsing as pp
+
+"""
+Memoization of the grammar rules results.
+
+The grammar for the CWR files contains lots of optional rules and
+alternatives, which makes Pyparsing try the same rule at the same position of
+the text several times.
+
+Pyparsing includes a memoization mechanism, but it is global to all the
+grammars, and it does not limit its size. The ParseCache offers the same,
+but it is used only while a decoder using it is parsing, and it keeps only a
+limited number of results, discarding the least recently used ones.
+
+Pyparsing is patched only while a cache is active, and restored once the last
+active cache is deactivated, so once decoding ends the rest of the parsing
+done on the process is not affected.
+
+It also counts the hits, misses and evictions. On the CWR grammar there are
+few hits, as the records are recognized by their prefix, so the cache costs
+more than it saves. Its statistics are still useful for finding which rules
+are parsed several times.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Cache used on each thread
+_active = threading.local()
+
+# Parsing method replaced by the cached one
+_original_parse = None
+
+# Number of caches active on all the threads, and lock for changing it
+_active_count = 0
+_install_lock = threading.Lock()
+
+
+def _parse_cached(self, instring, loc, doActions=True, callPreParse=True):
+    cache = getattr(_active, 'cache', None)
+
+    if cache is None:
+        return _original_parse(self, instring, loc, doActions, callPreParse)
+
+    if cache.rules is not None and id(self) not in cache.rules:
+        return self._parseNoCache(instring, loc, doActions, callPreParse)
+
+    # The cache is cleared for each text, so it is not part of the key
+    lookup = (self, loc, callPreParse, doActions)
+    value = cache.get(lookup)
+    if value is not None:
+        if isinstance(value, Exception):
+            raise value
+        return value[0], value[1].copy()
+
+    try:
+        value = self._parseNoCache(instring, loc, doActions, callPreParse)
+    except pp.ParseBaseException as e:
+        e.__traceback__ = None
+        cache.put(lookup, e)
+        raise
+
+    cache.put(lookup, (value[0], value[1].copy()))
+
+    return value
+
+
+def _install():
+    global _active_count, _original_parse
+
+    with _install_lock:
+        if _active_count == 0:
+            _original_parse = pp.ParserElement._parse
+            pp.ParserElement._parse = _parse_cached
+        _active_count += 1
+
+
+def _uninstall():
+    global _active_count
+
+    with _install_lock:
+        _active_count -= 1
+        if _active_count == 0:
+            pp.ParserElement._parse = _original_parse
+
+
+class ParseCache(object):
+    """
+    Bounded cache for the results of the grammar rules.
+
+    Results are stored by rule and position on the text. When the cache is
+    full, the least recently used result is discarded.
+
+    The cache is used only while it is active, which is done with the
+    activate method, and it is cleared each time it is activated.
+
+    Memoizing the smallest rules, such as single fields, usually costs more
+    than parsing them again. So the rules to memoize can be indicated, and
+    any other rule will be always parsed.
+    """
+
+    def __init__(self, max_size=10000, rules=None):
+        """
+        Constructs a ParseCache.
+
+        :param max_size: maximum number of results stored
+        :param rules: rules to memoize, by default all of them
+        """
+        self._max_size = max_size
+
+        if rules is None:
+            self._rules = None
+        else:
+            self._rules = frozenset(id(rule) for rule in rules)
+
+        self._values = collections.OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def evictions(self):
+        """
+        Number of results discarded to make room for new ones.
+
+        :return: the number of evictions
+        """
+        return self._evictions
+
+    @property
+    def hits(self):
+        """
+        Number of times a result was found on the cache.
+
+        :return: the number of hits
+        """
+        return self._hits
+
+    @property
+    def max_size(self):
+        """
+        Maximum number of results stored.
+
+        :return: the maximum size of the cache
+        """
+        return self._max_size
+
+    @property
+    def misses(self):
+        """
+        Number of times a result was not found on the cache.
+
+        :return: the number of misses
+        """
+        return self._misses
+
+    @property
+    def rules(self):
+        """
+        Ids of the rules to memoize, or None if all the rules are memoized.
+
+        :return: the ids of the rules to memoize
+        """
+        return self._rules
+
+    def activate(self):
+        """
+        Returns a context manager which activates the cache on the current
+        thread.
+
+        While it is active, the grammar rules parsed on the thread will use
+        the cache. It is cleared when activated, but the statistics are kept.
+
+        :return: a context manager activating the cache
+        """
+        return _ActiveCache(self)
+
+    def clear(self):
+        """
+        Removes all the results stored.
+        """
+        self._values.clear()
+
+    def get(self, key):
+        """
+        Returns the result stored for a key, or None if there is none.
+
+        :param key: key for the result
+        :return: the result for the key
+        """
+        value = self._values.get(key)
+
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+            self._values.move_to_end(key)
+
+        return value
+
+    def put(self, key, value):
+        """
+        Stores a result, discarding the least recently used if the cache is
+        full.
+
+        :param key: key for the result
+        :param value: the result to store
+        """
+        self._values[key] = value
+        self._values.move_to_end(key)
+
+        if len(self._values) > self._max_size:
+            self._values.popitem(last=False)
+            self._evictions += 1
+
+    def reset_stats(self):
+        """
+        Sets all the statistics back to zero.
+        """
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+
+class _ActiveCache(object):
+    """
+    Context manager for activating a cache on the current thread.
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_active, 'cache', None)
+        self._cache.clear()
+        _active.cache = self._cache
+        _install()
+        return self._cache
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _uninstall()
+        _active.cache = self._previous
+        # The results are not kept after parsing
+        self._cache.clear()
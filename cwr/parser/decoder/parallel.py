@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pyparsing as pp
+
+from cwr.file import CWRFile
+from cwr.parser.decoder import mapped
+from cwr.parser.decoder.common import Decoder
+from cwr.parser.decoder.mapped import MappedFile
+from cwr.parser.decoder.stream import RecordSplitter, assemble, read_lines
+
+"""
+Parallel decoding of CWR files.
+
+The transactions of a CWR file are independent of each other, so once the
+file has been split into the pieces of the transmission (see the stream
+module) these can be parsed at the same time.
+
+The ParallelFileDecoder takes care of this, sending chunks of pieces to a
+pool of processes, each of them keeping its own decoder, and joining the
+results back in the same order they appear on the file.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Decoder used by each worker process
+_worker_decoder = None
+
+
+def _init_worker(decoder_factory):
+    """
+    Creates the decoder for a worker process.
+
+    This is done only once for each process, so the grammar is not built
+    again for each chunk.
+
+    :param decoder_factory: function returning a stream decoder
+    """
+    global _worker_decoder
+    _worker_decoder = decoder_factory()
+
+
+def worker_decoder():
+    """
+    Returns the decoder of the current worker process.
+
+    This is only set on the processes of a pool created with the process_pool
+    method.
+
+    :return: the decoder created for the worker process
+    """
+    return _worker_decoder
+
+
+def _decode_on_worker(piece, lines, line_n):
+    try:
+        return _worker_decoder.decode_piece(piece, lines, line_n)
+    except pp.ParseBaseException as e:
+        # The parser element can't be sent back to the main process, but the
+        # exception is kept, along any record, field and line it points to
+        e.parserElement = None
+        e.args = (e.pstr, e.loc, e.msg)
+        raise
+
+
+def _decode_chunk(chunk):
+    """
+    Decodes a chunk of transmission pieces on a worker process.
+
+    :param chunk: list of (piece id, line number, lines) tuples
+    :return: list of (piece id, value) tuples
+    """
+    return [(piece, _decode_on_worker(piece, lines, line_n))
+            for piece, line_n, lines in chunk]
+
+
+def process_pool(decoder_factory, max_workers=None):
+    """
+    Creates a pool of processes, each of them keeping its own decoder.
+
+    The pieces can be decoded on these processes through a WorkerDecoder.
+
+    :param decoder_factory: function returning a stream decoder
+    :param max_workers: number of processes, by default the number of CPUs
+    :return: a ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(max_workers=max_workers,
+                               initializer=_init_worker,
+                               initargs=(decoder_factory,))
+
+
+class WorkerDecoder(object):
+    """
+    Decodes the pieces of a transmission with the decoder of the process
+    running it.
+
+    It keeps no state, so it can be sent to the processes of a pool created
+    with the process_pool method.
+    """
+
+    def decode_piece(self, piece, lines, line_n=1):
+        """
+        Parses a single piece of the transmission on the worker process.
+
+        :param piece: id of the transmission piece
+        :param lines: lines composing the piece
+        :param line_n: number of the first line, used on error messages
+        :return: the model instances created from the lines
+        """
+        return _decode_on_worker(piece, lines, line_n)
+
+
+class ParallelFileDecoder(Decoder):
+    """
+    Parses a CWR file using several processes.
+
+    The lines are split into the pieces of the transmission, which are grouped
+    into chunks and sent to a pool of processes. Each process creates its own
+    stream decoder with the received factory when it starts.
+
+    Only a limited number of chunks is sent to the pool at the same time, so
+    the file does not need to be kept fully in memory.
+
+    The pool is created the first time it is needed, and kept for the
+    following files until the decoder is closed. A pool created with the
+    process_pool method can be received instead, in which case it is left for
+    the caller to shut down.
+    """
+
+    def __init__(self, decoder_factory, filename_decoder, max_workers=None,
+                 chunk_size=100, splitter=None, pool=None):
+        """
+        Constructs a ParallelFileDecoder.
+
+        The decoder factory should be a module level function, as it is sent
+        to the worker processes.
+
+        :param decoder_factory: function returning a stream decoder
+        :param filename_decoder: decoder for the filename
+        :param max_workers: number of processes, by default the number of CPUs
+        :param chunk_size: number of transmission pieces on each chunk
+        :param splitter: splitter for the lines of the file
+        :param pool: pool created with process_pool for the same factory
+        """
+        super(ParallelFileDecoder, self).__init__()
+
+        # Logger
+        self._logger = logging.getLogger(__name__)
+
+        self._decoder_factory = decoder_factory
+        self._filename_decoder = filename_decoder
+        self._max_workers = max_workers
+        self._chunk_size = chunk_size
+
+        self._pool = pool
+        # Only the pools created by the decoder are shut down by it
+        self._owns_pool = pool is None
+
+        if splitter:
+            self._splitter = splitter
+        else:
+            self._splitter = RecordSplitter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def pool(self):
+        """
+        Pool of processes decoding the pieces, created the first time it is
+        needed.
+
+        :return: the pool of processes
+        """
+        if self._pool is None:
+            self._pool = process_pool(self._decoder_factory,
+                                      self._workers())
+
+        return self._pool
+
+    def close(self):
+        """
+        Shuts down the pool of processes, if it was created by the decoder.
+
+        A new one will be created if the decoder is used again.
+        """
+        if self._owns_pool and self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _workers(self):
+        return self._max_workers or os.cpu_count() or 1
+
+    def chunks(self, stream):
+        """
+        Splits the file into chunks of transmission pieces.
+
+        :param stream: file-like object or iterable of lines
+        :return: a generator of lists of (piece id, line number, lines) tuples
+        """
+        chunk = []
+        for piece in self._splitter.split(read_lines(stream)):
+            chunk.append(piece)
+            if len(chunk) >= self._chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    def events(self, stream):
+        """
+        Parses the file on the pool of processes, returning each piece of the
+        transmission in the file's order.
+
+        These are returned as tuples composed of the piece id, and the model
+        instances created from it, as done by the FileStreamDecoder.
+
+        :param stream: file-like object or iterable of lines
+        :return: a generator of (piece id, value) tuples
+        """
+        # Limits the chunks waiting to be processed
+        max_pending = 2 * self._workers()
+
+        pool = self.pool
+
+        pending = collections.deque()
+        try:
+            for chunk in self.chunks(stream):
+                pending.append(pool.submit(_decode_chunk, chunk))
+
+                if len(pending) >= max_pending:
+                    for event in pending.popleft().result():
+                        yield event
+
+            while pending:
+                for event in pending.popleft().result():
+                    yield event
+        finally:
+            # The pool is kept, so what is left of a failed file is dropped
+            for future in pending:
+                future.cancel()
+
+    def decode(self, data):
+        """
+        Parses the file, creating a CWRFile from it.
+
+        It requires a dictionary with two values:
+        - filename, containing the filename
+        - contents, containing the file contents, either as a string or as a
+        file-like object
+
+        Instead of the contents, the dictionary can contain the path to the
+        file, which will be read line by line through a memory map. In this
+        case the filename is optional, as it can be taken from the path.
+
+        :param data: dictionary with the data to parse
+        :return: a CWRFile instance
+        """
+        file_name = self._filename_decoder.decode(mapped.file_name(data))
+
+        if 'contents' not in data:
+            with MappedFile(data['path']) as mapped_file:
+                transmission = assemble(self.events(mapped_file))
+        else:
+            contents = data['contents']
+            if isinstance(contents, str):
+                contents = contents.splitlines()
+
+            transmission = assemble(self.events(contents))
+
+        return CWRFile(file_name, transmission)
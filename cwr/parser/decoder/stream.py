@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+
+import pyparsing as pp
+
+from cwr.group import Group
+from config_cwr.accessor import CWRConfiguration
+from cwr.transmission import Transmission
+from data_cwr.accessor import CWRTables
+
+"""
+Utilities for reading a CWR file as a stream of records.
+
+A CWR file is a sequence of fixed-width lines, one record per line, where the
+first three characters of each line indicate the record type. This allows
+reading the file line by line, grouping the lines into the structural pieces
+of the transmission without needing to parse them:
+
+- header, the transmission header (HDR).
+- group_header, a group header (GRH).
+- transaction, all the records of a single transaction.
+- group_trailer, a group trailer (GRT).
+- trailer, the transmission trailer (TRL).
+
+These pieces are identified by the same names used on the Transmission and
+Group classes of the model.
+
+The RecordSplitter takes care of this, and only keeps in memory the lines of
+the transaction being read at each moment. When the lines are not read from
+an iterable, but received one by one, such as from an asynchronous stream,
+the LineReader and the IncrementalSplit do the same work.
+
+Once decoded, the pieces can be joined back into a Transmission with the
+assemble method.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Transmission pieces
+HEADER = 'header'
+GROUP_HEADER = 'group_header'
+TRANSACTION = 'transaction'
+GROUP_TRAILER = 'group_trailer'
+TRAILER = 'trailer'
+
+
+def read_lines(stream):
+    """
+    Reads the lines from a CWR file, removing the line separators.
+
+    Empty lines are ignored, and any character before the 'H' of the
+    transmission header is removed, as some files include a heading byte
+    order mark.
+
+    Each line is returned along its number on the file, starting with 1.
+
+    :param stream: file-like object or iterable of lines
+    :return: a generator of (line number, line) tuples
+    """
+    reader = LineReader()
+    for line in stream:
+        line = reader.read(line)
+        if line:
+            yield line
+
+
+class LineReader(object):
+    """
+    Reads the lines of a CWR file one by one, as done by the read_lines
+    method.
+
+    This allows reading the lines as they are received, such as from an
+    asynchronous stream.
+    """
+
+    def __init__(self):
+        self._first = True
+        self._line_n = 0
+
+    def read(self, line):
+        """
+        Reads the next line of the file.
+
+        :param line: the line to read
+        :return: a (line number, line) tuple, or None if the line is ignored
+        """
+        self._line_n += 1
+        line = line.rstrip('\r\n')
+
+        if self._first:
+            i = line.find('H')
+            if i > 0:
+                line = line[i:]
+
+        if len(line.strip()) == 0:
+            return None
+
+        self._first = False
+
+        return self._line_n, line
+
+
+class RecordSplitter(object):
+    """
+    Splits the lines of a CWR file into the pieces of the transmission.
+
+    Transactions begin on the records with a transaction type code, which are
+    read from the transaction types table. The only exception are the
+    acknowledgement groups, where the transactions begin on the ACK records,
+    as these are followed by a copy of the acknowledged transaction header.
+
+    In lenient mode, records with an unknown record type also begin a new
+    transaction. So when the record type of a transaction header is damaged,
+    its lines are kept apart from the previous transaction, and only the
+    damaged transaction fails to decode.
+    """
+
+    # Record types for the control records
+    _control_records = {'HDR': HEADER,
+                        'GRH': GROUP_HEADER,
+                        'GRT': GROUP_TRAILER,
+                        'TRL': TRAILER}
+
+    def __init__(self, transaction_types=None, lenient=False,
+                 record_types=None):
+        super(RecordSplitter, self).__init__()
+
+        if transaction_types is None:
+            transaction_types = CWRTables().get_data('transaction_type')
+
+        self._transaction_types = frozenset(transaction_types)
+
+        if not lenient:
+            self._record_types = None
+        elif record_types is None:
+            # The record types table lacks some of the types on the grammar
+            self._record_types = frozenset(
+                record_type
+                for rule in CWRConfiguration().load_record_config('common')
+                for record_type in rule['head'])
+        else:
+            self._record_types = frozenset(record_types)
+
+    def is_transaction_header(self, record_type, group_type=None):
+        """
+        Indicates if a record begins a transaction.
+
+        In lenient mode this is also the case for unknown record types.
+
+        :param record_type: the record type of the record
+        :param group_type: the transaction type of the group containing it
+        :return: True if the record is a transaction header, False otherwise
+        """
+        if self._record_types is not None and \
+                record_type not in self._record_types:
+            return True
+        elif group_type == 'ACK':
+            return record_type == 'ACK'
+        else:
+            return record_type in self._transaction_types
+
+    def split(self, lines):
+        """
+        Splits the lines into the pieces of the transmission.
+
+        These are returned as a tuple composed of the piece id, the number of
+        its first line and a list with the lines of that piece. Only the
+        transactions will contain more than a single line.
+
+        The received lines should come from the read_lines method.
+
+        :param lines: iterable of (line number, line) tuples
+        :return: a generator of (piece id, line number, lines) tuples
+        """
+        split = self.incremental()
+
+        for line_n, line in lines:
+            for piece in split.push(line_n, line):
+                yield piece
+
+        for piece in split.close():
+            yield piece
+
+    def incremental(self):
+        """
+        Returns an object which splits the lines of a file as they are
+        received, instead of reading them from an iterable.
+
+        :return: an IncrementalSplit for a single file
+        """
+        return IncrementalSplit(self)
+
+
+class IncrementalSplit(object):
+    """
+    Splits the lines of a single file into the pieces of the transmission,
+    receiving the lines one by one.
+
+    Each time a line is received, the pieces completed are returned. As a
+    transaction only ends when the next piece begins, the last one is
+    returned when the split is closed.
+    """
+
+    def __init__(self, splitter):
+        self._splitter = splitter
+
+        self._group_type = None
+        self._transaction = None
+        self._transaction_n = 0
+
+    def push(self, line_n, line):
+        """
+        Receives the next line of the file.
+
+        :param line_n: number of the line
+        :param line: the line
+        :return: a list of (piece id, line number, lines) tuples
+        """
+        pieces = []
+
+        record_type = line[:3]
+
+        piece = self._splitter._control_records.get(record_type)
+        if piece:
+            if self._transaction:
+                pieces.append((TRANSACTION, self._transaction_n,
+                               self._transaction))
+                self._transaction = None
+
+            if piece == GROUP_HEADER:
+                self._group_type = line[3:6]
+            elif piece == GROUP_TRAILER:
+                self._group_type = None
+
+            pieces.append((piece, line_n, [line]))
+        elif self._transaction is None or \
+                self._splitter.is_transaction_header(record_type,
+                                                     self._group_type):
+            if self._transaction:
+                pieces.append((TRANSACTION, self._transaction_n,
+                               self._transaction))
+
+            self._transaction = [line]
+            self._transaction_n = line_n
+        else:
+            self._transaction.append(line)
+
+        return pieces
+
+    def close(self):
+        """
+        Ends the file, returning the last transaction if there is one.
+
+        :return: a list of (piece id, line number, lines) tuples
+        """
+        pieces = []
+
+        if self._transaction:
+            pieces.append((TRANSACTION, self._transaction_n,
+                           self._transaction))
+            self._transaction = None
+
+        return pieces
+
+
+def assemble(events):
+    """
+    Joins the pieces of a transmission into a Transmission instance.
+
+    :param events: iterable of (piece id, value) tuples
+    :return: a Transmission instance
+    """
+    header = None
+    trailer = None
+    groups = []
+
+    group_header = None
+    transactions = None
+
+    for piece, value in events:
+        if trailer is not None or \
+                (header is None and piece != HEADER):
+            _raise_misplaced(piece)
+
+        if piece == HEADER:
+            if header is not None:
+                _raise_misplaced(piece)
+            header = value
+        elif piece == GROUP_HEADER:
+            if group_header is not None:
+                _raise_misplaced(piece)
+            group_header = value
+            transactions = []
+        elif piece == TRANSACTION:
+            if group_header is None:
+                _raise_misplaced(piece)
+            transactions.append(value)
+        elif piece == GROUP_TRAILER:
+            if group_header is None:
+                _raise_misplaced(piece)
+            groups.append(Group(group_header, value, transactions))
+            group_header = None
+            transactions = None
+        elif piece == TRAILER:
+            if group_header is not None:
+                _raise_misplaced(piece)
+            trailer = value
+
+    if header is None or trailer is None or len(groups) == 0:
+        raise pp.ParseException('', 0, 'Incomplete transmission')
+
+    return Transmission(header, trailer, groups)
+
+
+def _raise_misplaced(piece):
+    raise pp.ParseException('', 0, 'Misplaced %s' % piece)
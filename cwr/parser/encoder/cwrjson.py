@@ -3,14 +3,25 @@
 import json
 import sys
 
-from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from cwr.file import CWRFile
+from cwr.parser.decoder.stream import HEADER, GROUP_HEADER, TRANSACTION, \
+    GROUP_TRAILER, TRAILER
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder, \
+    FileTagDictionaryEncoder, GroupHeaderDictionaryEncoder, \
+    GroupTrailerDictionaryEncoder, TransactionRecordDictionaryEncoder, \
+    TransmissionHeaderDictionaryEncoder, TransmissionTrailerDictionaryEncoder
 from cwr.parser.encoder.common import Encoder
 
 """
 Classes for encoding CWR classes into JSON dictionaries.
 
-It just consists of a single parser, the JSONEncoder, which delegates most of
-the work to an instance of the CWRDictionaryEncoder.
+The main parser is the JSONEncoder, which delegates most of the work to an
+instance of the CWRDictionaryEncoder.
+
+For big files, the JSONEncoder can also write the JSON to a stream, piece by
+piece, while the JSONLinesEncoder creates JSON Lines, with a line for each
+piece of the transmission, including one for each transaction. In both cases
+only a single transaction is transformed into a dictionary at each moment.
 """
 
 __author__ = 'Bernardo Martínez Garrido'
@@ -32,6 +43,7 @@ class JSONEncoder(Encoder):
     def __init__(self):
         super(JSONEncoder, self).__init__()
         self._dict_encoder = FileDictionaryEncoder()
+        self._pieces_encoder = _PiecesDictionaryEncoder()
 
     def encode(self, entity):
         """
@@ -43,15 +55,211 @@ class JSONEncoder(Encoder):
         """
         encoded = self._dict_encoder.encode(entity)
 
-        if sys.version_info[0] == 2:
-            result = json.dumps(encoded, ensure_ascii=False,
-                                default=_iso_handler, encoding='latin1')
+        return _dumps(encoded)
+
+    def encode_to(self, entity, stream):
+        """
+        Encodes a CWRFile, writing the JSON to the stream piece by piece.
+
+        The result is the same JSON the encode method would return, but the
+        file is never transformed into a single dictionary.
+
+        :param entity: the CWRFile to encode
+        :param stream: file-like object where the JSON will be written
+        """
+        pieces = self._pieces_encoder
+        transmission = entity.transmission
+
+        if entity.tag:
+            tag = _dumps(pieces.encode_tag(entity.tag))
+        else:
+            tag = _dumps(None)
+
+        stream.write('{"tag": %s, "transmission": {"header": %s, '
+                     '"trailer": %s, "groups": [' % (
+                         tag,
+                         _dumps(pieces.encode(HEADER, transmission.header)),
+                         _dumps(pieces.encode(TRAILER, transmission.trailer))))
+
+        for i, group in enumerate(transmission.groups):
+            if i > 0:
+                stream.write(', ')
+
+            stream.write('{"group_header": %s, "group_trailer": %s, '
+                         '"transactions": [' % (
+                             _dumps(pieces.encode(GROUP_HEADER,
+                                                  group.group_header)),
+                             _dumps(pieces.encode(GROUP_TRAILER,
+                                                  group.group_trailer))))
+
+            for j, transaction in enumerate(group.transactions):
+                if j > 0:
+                    stream.write(', ')
+                stream.write(_dumps(pieces.encode(TRANSACTION, transaction)))
+
+            stream.write(']}')
+
+        stream.write(']}}')
+
+
+class JSONLinesEncoder(Encoder):
+    """
+    Encodes a CWR file into JSON Lines.
+
+    Each line is a JSON object with a single key, the id of the transmission
+    piece it contains (see the stream module), or 'tag' for the file tag. For
+    example:
+
+    {"tag": {...}}
+    {"header": {...}}
+    {"group_header": {...}}
+    {"transaction": [{...}, {...}]}
+    {"group_trailer": {...}}
+    {"trailer": {...}}
+
+    The lines follow the same order as the records on a CWR file, and each of
+    them is written as soon as it is created.
+    """
+
+    def __init__(self):
+        super(JSONLinesEncoder, self).__init__()
+        self._pieces_encoder = _PiecesDictionaryEncoder()
+
+    def encode(self, entity):
+        """
+        Encodes a CWRFile into a string with JSON Lines.
+
+        :param entity: the CWRFile to encode
+        :return: the JSON Lines created from the received data
+        """
+        return ''.join(line + '\n' for line in self.lines(entity))
+
+    def encode_to(self, entity, stream):
+        """
+        Encodes a CWRFile, writing each line to the stream as soon as it is
+        created.
+
+        :param entity: the CWRFile to encode
+        :param stream: file-like object where the lines will be written
+        """
+        for line in self.lines(entity):
+            stream.write(line)
+            stream.write('\n')
+
+    def encode_events(self, events, stream, tag=None):
+        """
+        Writes the pieces of a transmission as JSON Lines.
+
+        These are received as (piece id, value) tuples, such as the ones
+        returned by the events method of the stream decoder, so a CWR file can
+        be transformed into JSON Lines without reading it fully.
+
+        :param events: iterable of (piece id, value) tuples
+        :param stream: file-like object where the lines will be written
+        :param tag: the FileTag for the file
+        """
+        if tag:
+            events = self._tag_events(tag, events)
+
+        for line in self._event_lines(events):
+            stream.write(line)
+            stream.write('\n')
+
+    def lines(self, entity):
+        """
+        Encodes a CWRFile, returning each line as soon as it is created.
+
+        :param entity: the CWRFile to encode
+        :return: a generator of lines, without line separators
+        """
+        if isinstance(entity, CWRFile):
+            transmission = entity.transmission
+            tag = entity.tag
         else:
-            # For Python 3
-            result = json.dumps(encoded, ensure_ascii=False,
-                                default=_iso_handler)
+            transmission = entity
+            tag = None
+
+        events = self._transmission_events(transmission)
+        if tag:
+            events = self._tag_events(tag, events)
+
+        return self._event_lines(events)
 
-        return result
+    def _event_lines(self, events):
+        for piece, value in events:
+            if piece == 'tag':
+                encoded = self._pieces_encoder.encode_tag(value)
+            else:
+                encoded = self._pieces_encoder.encode(piece, value)
+
+            yield _dumps({piece: encoded})
+
+    @staticmethod
+    def _tag_events(tag, events):
+        yield 'tag', tag
+
+        for event in events:
+            yield event
+
+    @staticmethod
+    def _transmission_events(transmission):
+        yield HEADER, transmission.header
+
+        for group in transmission.groups:
+            yield GROUP_HEADER, group.group_header
+            for transaction in group.transactions:
+                yield TRANSACTION, transaction
+            yield GROUP_TRAILER, group.group_trailer
+
+        yield TRAILER, transmission.trailer
+
+
+class _PiecesDictionaryEncoder(object):
+    """
+    Encodes each piece of a transmission into a dictionary, or a list of
+    dictionaries for the transactions.
+    """
+
+    def __init__(self):
+        super(_PiecesDictionaryEncoder, self).__init__()
+
+        self._tag_encoder = FileTagDictionaryEncoder()
+
+        self._encoders = {}
+        self._encoders[HEADER] = TransmissionHeaderDictionaryEncoder()
+        self._encoders[GROUP_HEADER] = GroupHeaderDictionaryEncoder()
+        self._encoders[GROUP_TRAILER] = GroupTrailerDictionaryEncoder()
+        self._encoders[TRAILER] = TransmissionTrailerDictionaryEncoder()
+
+        self._transaction_encoder = TransactionRecordDictionaryEncoder()
+
+    def encode(self, piece, value):
+        if piece == TRANSACTION:
+            encoder = self._transaction_encoder
+            return [encoder.encode(record) for record in value]
+        else:
+            return self._encoders[piece].encode(value)
+
+    def encode_tag(self, tag):
+        return self._tag_encoder.encode(tag)
+
+
+def _dumps(encoded):
+    """
+    Dumps a dictionary into a JSON string.
+
+    :param encoded: the dictionary to dump
+    :return: a JSON string
+    """
+    if sys.version_info[0] == 2:
+        result = json.dumps(encoded, ensure_ascii=False,
+                            default=_iso_handler, encoding='latin1')
+    else:
+        # For Python 3
+        result = json.dumps(encoded, ensure_ascii=False,
+                            default=_iso_handler)
+
+    return result
 
 
 def _unicode_handler(obj):
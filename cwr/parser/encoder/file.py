@@ -1,6 +1,14 @@
 # -*- coding: utf-8 -*-
 
+from cwr.file import CWRFile
+from cwr.group import GroupHeader, GroupTrailer
+from cwr.parser.decoder.file import default_layout_factory
 from cwr.parser.encoder.common import Encoder
+from cwr.parser.encoder.dictionary import GroupHeaderDictionaryEncoder, \
+    GroupTrailerDictionaryEncoder, TransactionRecordDictionaryEncoder, \
+    TransmissionHeaderDictionaryEncoder, TransmissionTrailerDictionaryEncoder
+from cwr.parser.encoder.fixed import FixedWidthRecordEncoder
+from cwr.transmission import TransmissionHeader, TransmissionTrailer
 
 """
 Parsers for encoding CWR model classes, creating a text string for them which
@@ -21,6 +29,9 @@ transformed into the resulting string.
 
 These encoders are created from BaseCWRFileNameEncoder, just setting the
 correct sequence number length.
+
+The contents of the file are encoded by the encoder returned by the
+default_file_encoder() method, which writes each record as a fixed-width line.
 """
 
 __author__ = 'Bernardo Martínez Garrido'
@@ -63,6 +74,111 @@ def default_filename_encoder():
     return BaseCWRFileNameEncoder(4)
 
 
+def default_record_encoder():
+    """
+    Creates an encoder which transforms single CWR records into fixed-width
+    lines.
+
+    :return: a fixed-width record encoder for the default standard
+    """
+    encoders = {}
+
+    encoders[TransmissionHeader] = TransmissionHeaderDictionaryEncoder()
+    encoders[TransmissionTrailer] = TransmissionTrailerDictionaryEncoder()
+    encoders[GroupHeader] = GroupHeaderDictionaryEncoder()
+    encoders[GroupTrailer] = GroupTrailerDictionaryEncoder()
+
+    return FixedWidthRecordEncoder(default_layout_factory(), encoders,
+                                   TransactionRecordDictionaryEncoder())
+
+
+def default_file_encoder():
+    """
+    Creates an encoder which transforms a CWRFile, or a Transmission, into
+    the contents of a CWR file.
+
+    :return: a CWR file encoder for the default standard
+    """
+    return CWRFileEncoder(default_record_encoder())
+
+
+class CWRFileEncoder(Encoder):
+    """
+    Encodes the contents of a CWR file, writing each record as a fixed-width
+    line.
+
+    The lines can be written to a file-like object as soon as they are
+    created, so the full contents are never kept in memory.
+
+    It receives either a CWRFile or a Transmission. The filename is not
+    encoded, for that the filename encoders should be used.
+    """
+
+    def __init__(self, record_encoder, line_separator='\r\n'):
+        super(CWRFileEncoder, self).__init__()
+
+        self._record_encoder = record_encoder
+        self._line_separator = line_separator
+
+    def encode(self, entity):
+        """
+        Encodes the transmission into a string with the contents of a CWR
+        file.
+
+        :param entity: CWRFile or Transmission to encode
+        :return: a string with the file contents
+        """
+        return ''.join(line + self._line_separator
+                       for line in self.lines(entity))
+
+    def write(self, entity, stream):
+        """
+        Encodes the transmission, writing each line to the stream as soon as
+        it is created.
+
+        :param entity: CWRFile or Transmission to encode
+        :param stream: file-like object where the lines will be written
+        """
+        for line in self.lines(entity):
+            stream.write(line)
+            stream.write(self._line_separator)
+
+    def lines(self, entity):
+        """
+        Encodes the transmission, returning its lines in order.
+
+        :param entity: CWRFile or Transmission to encode
+        :return: a generator of lines, without line separators
+        """
+        return (self._record_encoder.encode(record)
+                for record in self.records(entity))
+
+    @staticmethod
+    def records(entity):
+        """
+        Returns the records of the transmission, in the order they are
+        written on the file.
+
+        :param entity: CWRFile or Transmission
+        :return: a generator of records
+        """
+        if isinstance(entity, CWRFile):
+            transmission = entity.transmission
+        else:
+            transmission = entity
+
+        yield transmission.header
+
+        for group in transmission.groups:
+            yield group.group_header
+            for transaction in group.transactions:
+                for record in transaction:
+                    yield record
+            yield group.group_trailer
+
+        yield transmission.trailer
+
+
 class BaseCWRFileNameEncoder(Encoder):
     """
     Parses a CWR file name from a FileTag class.
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+from cwr.parser.encoder.common import Encoder
+
+"""
+Fixed-width encoder for CWR records.
+
+This is the counterpart of the fixed-width decoder. The model instances are
+transformed into dictionaries by the dictionary encoders, and then each value
+is formatted and padded to the columns indicated by the record layout, which
+is built from the same configuration files as the grammar.
+
+Values are formatted so the grammar would read them back as the same value.
+Empty values are written as whitespaces, except dates, which are written as
+zeroes.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _from_alphanum(value, field):
+    return str(value).ljust(field.columns)
+
+
+def _from_numeric(value, field):
+    return str(value).zfill(field.columns)
+
+
+def _from_decimal(value, field, nums_int):
+    decimals = field.columns - nums_int
+    return str(int(round(value * (10 ** decimals)))).zfill(field.columns)
+
+
+def _from_percentage(value, field):
+    return _from_decimal(value, field, 3)
+
+
+def _from_numeric_float(value, field):
+    if field.values:
+        nums_int = int(field.values[0])
+    else:
+        nums_int = field.columns
+    return _from_decimal(value, field, nums_int)
+
+
+def _from_boolean(value, field):
+    if value:
+        return 'Y'
+    else:
+        return 'N'
+
+
+def _from_date(value, field):
+    return value.strftime('%Y%m%d')
+
+
+def _from_time(value, field):
+    return value.strftime('%H%M%S')
+
+
+def _from_date_time(value, field):
+    return value.strftime('%Y%m%d%H%M%S')
+
+
+def _from_blank(value, field):
+    return ' ' * field.columns
+
+
+def _from_ipi_base_n(value, field):
+    if isinstance(value, int):
+        return _from_numeric(value, field)
+    return _from_alphanum(value, field)
+
+
+def _from_avi(value, field):
+    if isinstance(value, dict):
+        society_code = value['society_code']
+        av_number = value['av_number']
+    else:
+        society_code = value.society_code
+        av_number = value.av_number
+
+    return str(society_code).zfill(3) + str(av_number).ljust(field.columns - 3)
+
+
+def _empty_value(field):
+    # Empty dates are filled with zeroes, as it is usual on CWR files
+    if field.field_type == 'date':
+        return '0' * field.columns
+    else:
+        return ' ' * field.columns
+
+
+_formatters = {'alphanum': _from_alphanum,
+               'alphanum_ext': _from_alphanum,
+               'numeric': _from_numeric,
+               'numeric_float': _from_numeric_float,
+               'percentage': _from_percentage,
+               'boolean': _from_boolean,
+               'flag': _from_alphanum,
+               'date': _from_date,
+               'time': _from_time,
+               'date_time': _from_date_time,
+               'blank': _from_blank,
+               'lookup': _from_alphanum,
+               'lookup_int': _from_numeric,
+               'iswc': _from_alphanum,
+               'ipi_name_n': _from_numeric,
+               'ipi_base_n': _from_ipi_base_n,
+               'ean13': _from_numeric,
+               'isrc': _from_alphanum,
+               'visan': _from_alphanum,
+               'avi': _from_avi,
+               'charset': _from_alphanum}
+
+
+class FixedWidthRecordEncoder(Encoder):
+    """
+    Encodes CWR records into fixed-width lines.
+
+    This requires a layouts factory, which will give the layout for each
+    record, and the dictionary encoders for the records. These are indexed by
+    the model class, and any class missing from them will be encoded with the
+    default encoder.
+
+    Records are matched to a layout by their record type. The first variant of
+    the layout, which contains all the optional fields, is used.
+    """
+
+    # Records keeping the interested party data on a nested dictionary
+    _nested_records = ('publisher', 'writer')
+
+    def __init__(self, layout_factory, encoders, default_encoder=None):
+        super(FixedWidthRecordEncoder, self).__init__()
+
+        self._encoders = encoders
+        self._default_encoder = default_encoder
+
+        # Fields for each record type
+        self._fields = {}
+
+        for layout in layout_factory.get_layouts():
+            fields = [(field.results_name, _formatters[field.field_type],
+                       _empty_value(field), field)
+                      for field in layout.variants[0]]
+            for head in layout.heads:
+                if head not in self._fields:
+                    self._fields[head] = fields
+
+    def encode(self, record):
+        """
+        Encodes the record, creating a fixed-width line for it.
+
+        The line separator is not included.
+
+        :param record: the record to encode
+        :return: a string with the record's line
+        """
+        return self.encode_dictionary(self._encode_dictionary(record))
+
+    def encode_dictionary(self, values):
+        """
+        Encodes a dictionary with the values of a record, as created by the
+        dictionary encoders, into a fixed-width line.
+
+        :param values: the record values
+        :return: a string with the record's line
+        """
+        for nested in self._nested_records:
+            if isinstance(values.get(nested), dict):
+                merged = dict(values[nested])
+                merged.update(values)
+                values = merged
+
+        record_type = values['record_type']
+        if record_type not in self._fields:
+            raise ValueError('Unknown record type %s' % record_type)
+
+        line = []
+        for name, formatter, empty, field in self._fields[record_type]:
+            value = values.get(name)
+            if value is None or value == '':
+                text = empty
+            else:
+                text = formatter(value, field)
+                if len(text) > field.columns:
+                    raise ValueError('The value %r is too long for the '
+                                     'field %s' % (value, field.field_id))
+            line.append(text)
+
+        return ''.join(line)
+
+    def _encode_dictionary(self, record):
+        encoder = self._encoders.get(type(record), self._default_encoder)
+
+        return encoder.encode(record)
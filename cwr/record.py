@@ -32,6 +32,8 @@ class Record(object):
     This is so because it is composed of three values: the record type,
     """
 
+    __slots__ = ('_record_type',)
+
     def __init__(self,
                  record_type=''
                  ):
@@ -90,6 +92,8 @@ class TransactionRecord(Record, metaclass=ABCMeta):
     1) detail on the file.
     """
 
+    __slots__ = ('_transaction_sequence_n', '_record_sequence_n')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
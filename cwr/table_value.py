@@ -16,6 +16,9 @@ class MediaTypeValue(object):
     Represents a BIEM/CISAC Media Type table value.
     """
 
+    __slots__ = ('_code', '_name', '_media_type', '_duration_max',
+                 '_works_max', '_fragments_max')
+
     def __init__(self,
                  code='',
                  name='',
@@ -141,6 +144,8 @@ class TableValue(object):
     Text (TXT): Self explanatory
     """
 
+    __slots__ = ('_code', '_name', '_description')
+
     def __init__(self,
                  code='',
                  name='',
@@ -195,6 +200,8 @@ class InstrumentValue(TableValue):
     Represents a Instrument table value.
     """
 
+    __slots__ = ('_family',)
+
     def __init__(self,
                  code='',
                  name='',
@@ -26,6 +26,10 @@ class TransmissionHeader(Record):
     information as well as the name of the sender.
     """
 
+    __slots__ = ('_sender_id', '_sender_name', '_sender_type',
+                 '_creation_date_time', '_transmission_date', '_edi_standard',
+                 '_character_set')
+
     def __init__(self,
                  record_type='',
                  sender_id=0,
@@ -214,6 +218,8 @@ class TransmissionTrailer(Record):
     within the file are included on this record.
     """
 
+    __slots__ = ('_group_count', '_transaction_count', '_record_count')
+
     def __init__(self,
                  record_type='',
                  group_count=0,
@@ -304,6 +310,8 @@ class Transmission(object):
     TRL].
     """
 
+    __slots__ = ('_header', '_trailer', '_groups')
+
     def __init__(self,
                  header,
                  trailer,
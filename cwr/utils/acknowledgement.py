@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import datetime
+
+from cwr.acknowledgement import AcknowledgementRecord
+from cwr.file import CWRFile
+from cwr.group import GroupHeader, GroupTrailer
+from cwr.parser.decoder.stream import HEADER, GROUP_HEADER, GROUP_TRAILER, \
+    TRANSACTION, TRAILER
+from cwr.parser.encoder.file import default_record_encoder
+from cwr.transmission import Transmission, TransmissionHeader, \
+    TransmissionTrailer
+
+"""
+Creation of acknowledgement files.
+
+The recipient of a CWR file answers it with an acknowledgement file,
+containing a single ACK group with one transaction for each transaction on
+the received file. Each of these has an ACK record with the status given to
+the original transaction, followed by the MSG records explaining any problem
+found on it, and by the original agreement or work record. Acknowledgement
+transactions on the received file are not answered.
+
+The AcknowledgementGenerator creates these files. It reads the received file,
+either decoded or as the pieces returned by the events method of the stream
+decoders, and asks a callback for the status of each transaction. Then it
+writes the acknowledgement transactions as soon as they are created, setting
+their sequence numbers, and finally the group and transmission trailers with
+the correct counts. Only a single transaction is kept in memory at each
+moment, so files of any size can be acknowledged.
+
+The generator for the default standard is returned by the
+default_acknowledgement_generator() method.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class Acknowledgement(object):
+    """
+    Answer for a single transaction, as returned by the status callback.
+
+    The messages are MessageRecord instances, while the records are the
+    agreement or work records returned along the acknowledgement, such as
+    the work with the numbers assigned by the recipient. If these are not
+    given, a copy of the agreement or work record of the original transaction
+    is returned. Their transaction and record sequence numbers are set by the
+    generator, and the record type of the messages too.
+    """
+
+    __slots__ = ('status', 'messages', 'recipient_creation_n', 'records')
+
+    def __init__(self, status, messages=None, recipient_creation_n='',
+                 records=None):
+        """
+        Constructs an Acknowledgement.
+
+        :param status: transaction status code, such as 'AS' or 'RJ'
+        :param messages: MessageRecord list for the transaction
+        :param recipient_creation_n: number given by the recipient to the
+        work or agreement
+        :param records: records returned after the messages, by default the
+        original agreement or work record
+        """
+        self.status = status
+        if messages is None:
+            self.messages = []
+        else:
+            self.messages = messages
+        self.recipient_creation_n = recipient_creation_n
+        self.records = records
+
+    def __repr__(self):
+        return '<class %s>(status=%r, messages=%r, ' \
+               'recipient_creation_n=%r, records=%r)' % (
+                   self.__class__.__name__, self.status, self.messages,
+                   self.recipient_creation_n, self.records)
+
+
+class AcknowledgementStats(object):
+    """
+    Statistics for the creation of an acknowledgement file.
+    """
+
+    __slots__ = ('transactions', 'records', 'messages', 'statuses')
+
+    def __init__(self):
+        self.transactions = 0
+        # Records on the file, including the headers and trailers
+        self.records = 0
+        self.messages = 0
+        # Transactions for each status
+        self.statuses = {}
+
+    def __repr__(self):
+        return '<class %s>(transactions=%r, records=%r, messages=%r)' % (
+            self.__class__.__name__, self.transactions, self.records,
+            self.messages)
+
+    def as_dict(self):
+        """
+        Returns the statistics as a dictionary.
+
+        :return: a dictionary with the statistics
+        """
+        return {'transactions': self.transactions,
+                'records': self.records,
+                'messages': self.messages,
+                'statuses': dict(self.statuses)}
+
+
+def transmission_events(submission):
+    """
+    Returns the pieces of a transmission, as done by the events method of the
+    stream decoders.
+
+    :param submission: CWRFile, Transmission or iterable of (piece id, value)
+    tuples
+    :return: an iterable of (piece id, value) tuples
+    """
+    if isinstance(submission, CWRFile):
+        submission = submission.transmission
+
+    if not isinstance(submission, Transmission):
+        return submission
+
+    return _events(submission)
+
+
+def _events(transmission):
+    yield HEADER, transmission.header
+
+    for group in transmission.groups:
+        yield GROUP_HEADER, group.group_header
+        for transaction in group.transactions:
+            yield TRANSACTION, transaction
+        yield GROUP_TRAILER, group.group_trailer
+
+    yield TRAILER, transmission.trailer
+
+
+# Original records which can be returned on an acknowledgement transaction
+_returned_records = frozenset(['AGR', 'NWR', 'REV', 'ISW'])
+
+
+def _creation_n(record):
+    for name in ('submitter_work_n', 'submitter_agreement_n'):
+        value = getattr(record, name, None)
+        if value is not None:
+            return value
+
+    return ''
+
+
+class AcknowledgementGenerator(object):
+    """
+    Creates the acknowledgement file for a received CWR file.
+
+    The callback receives the group header and the records of each
+    transaction on the received file, and returns an Acknowledgement, or just
+    the transaction status code.
+    """
+
+    def __init__(self, record_encoder, sender_id, sender_name,
+                 sender_type='SO', character_set=None):
+        """
+        Constructs an AcknowledgementGenerator.
+
+        The sender is the one creating the acknowledgement, usually a
+        society.
+
+        :param record_encoder: fixed-width record encoder
+        :param sender_id: id of the sender
+        :param sender_name: name of the sender
+        :param sender_type: sender type code
+        :param character_set: character set of the file
+        """
+        self._record_encoder = record_encoder
+        self._sender_id = sender_id
+        self._sender_name = sender_name
+        self._sender_type = sender_type
+        self._character_set = character_set
+
+        self._stats = None
+
+    @property
+    def stats(self):
+        """
+        Statistics for the last acknowledgement file created.
+
+        :return: the AcknowledgementStats for the last file
+        """
+        return self._stats
+
+    def write(self, submission, stream, callback, creation_date_time=None,
+              processing_date=None, line_separator='\r\n'):
+        """
+        Creates the acknowledgement file, writing each line to the stream as
+        soon as it is created.
+
+        :param submission: received file, as a CWRFile, Transmission or
+        iterable of (piece id, value) tuples
+        :param stream: file-like object where the lines will be written
+        :param callback: function returning the Acknowledgement for each
+        transaction
+        :param creation_date_time: creation date and time of the file, by
+        default the current one
+        :param processing_date: date the transactions were processed, by
+        default the current one
+        :param line_separator: separator added after each line
+        :return: the AcknowledgementStats for the file
+        """
+        for line in self.lines(submission, callback, creation_date_time,
+                               processing_date):
+            stream.write(line)
+            stream.write(line_separator)
+
+        return self._stats
+
+    def lines(self, submission, callback, creation_date_time=None,
+              processing_date=None):
+        """
+        Creates the acknowledgement file, returning its lines in order.
+
+        :param submission: received file, as a CWRFile, Transmission or
+        iterable of (piece id, value) tuples
+        :param callback: function returning the Acknowledgement for each
+        transaction
+        :param creation_date_time: creation date and time of the file, by
+        default the current one
+        :param processing_date: date the transactions were processed, by
+        default the current one
+        :return: a generator of lines, without line separators
+        """
+        encode = self._record_encoder.encode
+        for record in self.records(submission, callback, creation_date_time,
+                                   processing_date):
+            yield encode(record)
+
+    def records(self, submission, callback, creation_date_time=None,
+                processing_date=None):
+        """
+        Creates the acknowledgement file, returning its records in order.
+
+        :param submission: received file, as a CWRFile, Transmission or
+        iterable of (piece id, value) tuples
+        :param callback: function returning the Acknowledgement for each
+        transaction
+        :param creation_date_time: creation date and time of the file, by
+        default the current one
+        :param processing_date: date the transactions were processed, by
+        default the current one
+        :return: a generator of records
+        """
+        if creation_date_time is None:
+            creation_date_time = datetime.datetime.now().replace(
+                microsecond=0)
+        if processing_date is None:
+            processing_date = creation_date_time.date()
+
+        self._stats = stats = AcknowledgementStats()
+
+        yield TransmissionHeader(record_type='HDR',
+                                 sender_id=self._sender_id,
+                                 sender_name=self._sender_name,
+                                 sender_type=self._sender_type,
+                                 creation_date_time=creation_date_time,
+                                 transmission_date=creation_date_time.date(),
+                                 character_set=self._character_set)
+        yield GroupHeader(record_type='GRH', group_id=1,
+                          transaction_type='ACK')
+        stats.records = 2
+
+        # Values taken from the received file
+        original_date_time = None
+        group_header = None
+
+        for piece, value in transmission_events(submission):
+            if piece == TRANSACTION:
+                for record in self._transaction(
+                        value, callback, group_header, original_date_time,
+                        processing_date):
+                    yield record
+            elif piece == GROUP_HEADER:
+                group_header = value
+            elif piece == HEADER:
+                original_date_time = value.creation_date_time
+
+        yield GroupTrailer(record_type='GRT', group_id=1,
+                           transaction_count=stats.transactions,
+                           record_count=stats.records)
+        stats.records += 2
+
+        yield TransmissionTrailer(record_type='TRL', group_count=1,
+                                  transaction_count=stats.transactions,
+                                  record_count=stats.records)
+
+    def _transaction(self, transaction, callback, group_header,
+                     original_date_time, processing_date):
+        stats = self._stats
+
+        original = transaction[0]
+        if original.record_type == 'ACK':
+            return
+
+        result = callback(group_header, transaction)
+        if not isinstance(result, Acknowledgement):
+            result = Acknowledgement(result)
+
+        transaction_sequence_n = stats.transactions
+
+        yield AcknowledgementRecord(
+            record_type='ACK',
+            transaction_sequence_n=transaction_sequence_n,
+            record_sequence_n=0,
+            original_group_id=group_header.group_id,
+            original_transaction_sequence_n=original.transaction_sequence_n,
+            original_transaction_type=original.record_type,
+            transaction_status=result.status,
+            creation_date_time=original_date_time,
+            processing_date=processing_date,
+            creation_title=getattr(original, 'title', None) or '',
+            submitter_creation_n=_creation_n(original),
+            recipient_creation_n=result.recipient_creation_n)
+
+        record_sequence_n = 0
+        for message in result.messages:
+            record_sequence_n += 1
+            message.record_type = 'MSG'
+            message.transaction_sequence_n = transaction_sequence_n
+            message.record_sequence_n = record_sequence_n
+            yield message
+
+        records = result.records
+        if records is None:
+            if original.record_type in _returned_records:
+                records = [copy.copy(original)]
+            else:
+                records = []
+
+        for record in records:
+            record_sequence_n += 1
+            record.transaction_sequence_n = transaction_sequence_n
+            record.record_sequence_n = record_sequence_n
+            yield record
+
+        stats.transactions += 1
+        stats.records += record_sequence_n + 1
+        stats.messages += len(result.messages)
+        stats.statuses[result.status] = stats.statuses.get(result.status,
+                                                           0) + 1
+
+
+def default_acknowledgement_generator(sender_id, sender_name,
+                                      sender_type='SO'):
+    """
+    Creates a generator of acknowledgement files, answering the transactions
+    on a received CWR file.
+
+    :param sender_id: id of the sender of the acknowledgement
+    :param sender_name: name of the sender of the acknowledgement
+    :param sender_type: sender type code
+    :return: an acknowledgement file generator for the default standard
+    """
+    return AcknowledgementGenerator(default_record_encoder(), sender_id,
+                                    sender_name, sender_type=sender_type)
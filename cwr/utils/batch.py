@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import as_completed
+
+
+from cwr.parser.decoder.file import default_file_automaton_decoder, \
+    default_file_stream_decoder, default_filename_decoder
+from cwr.parser.decoder.parallel import process_pool, worker_decoder
+from cwr.parser.encoder.cwrjson import JSONEncoder
+
+"""
+Batch decoding of CWR files.
+
+The BatchDecoder decodes a group of CWR files, such as all the files received
+on a folder, using a pool of processes. Each process keeps its own decoder,
+created only once when the process starts, and decodes whole files, so all
+the CPUs are used when there are many files to decode.
+
+The files are ordered by their names, parsed with the filename decoder, so
+they are decoded by sender, year and sequence number. Files whose names don't
+follow the naming convention go last.
+
+For each file a FileReport is created, with the number of records found, the
+time taken, or the error if it was invalid. If an output folder is received,
+the contents of each valid file are written there as JSON. The reports for all
+the files are joined into a BatchReport, which includes the throughput of
+the whole batch.
+
+This is the module behind the cwr-batch command:
+
+    cwr-batch -o output/ --workers 8 incoming/
+
+Which writes the JSON files, and the report.json with the batch report, into
+the output folder.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Decoders which can be chosen from the command line
+DECODERS = {'automaton': default_file_automaton_decoder,
+            'stream': default_file_stream_decoder}
+
+# Name of the batch report on the output folder
+REPORT_NAME = 'report.json'
+
+
+def find_files(paths, recursive=False):
+    """
+    Finds the files to decode.
+
+    Each path can be a folder, a glob pattern or a file. Hidden files on
+    folders are skipped.
+
+    :param paths: paths to the files
+    :param recursive: indicates if the subfolders should be searched too
+    :return: a list with the paths of the files found, without repetitions
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, folders, names in os.walk(path):
+                folders[:] = sorted(name for name in folders
+                                    if not name.startswith('.'))
+                found.extend(os.path.join(folder, name)
+                             for name in sorted(names)
+                             if not name.startswith('.'))
+                if not recursive:
+                    break
+        elif glob.has_magic(path):
+            found.extend(sorted(name for name in
+                                glob.glob(path, recursive=recursive)
+                                if os.path.isfile(name)))
+        else:
+            found.append(path)
+
+    result = []
+    seen = set()
+    for path in found:
+        if path not in seen:
+            seen.add(path)
+            result.append(path)
+
+    return result
+
+
+def order_files(paths, filename_decoder):
+    """
+    Orders the files by sender, year and sequence number, as indicated on
+    their names.
+
+    :param paths: paths to the files
+    :param filename_decoder: decoder for the file names
+    :return: a sorted list with the paths
+    """
+
+    def key(path):
+        name = os.path.basename(path)
+        tag = filename_decoder.decode(name)
+
+        # Files without a valid name go last
+        return (not tag.sender, tag.sender, tag.year, tag.sequence_n, name)
+
+    return sorted(paths, key=key)
+
+
+class FileReport(object):
+    """
+    Results of decoding a single file on a batch.
+    """
+
+    __slots__ = ('path', 'file_name', 'valid', 'error', 'groups',
+                 'transactions', 'records', 'bytes', 'seconds', 'output')
+
+    def __init__(self, path):
+        self.path = path
+        self.file_name = os.path.basename(path)
+        self.valid = False
+        self.error = None
+        self.groups = 0
+        self.transactions = 0
+        self.records = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        # Path to the JSON file written
+        self.output = None
+
+    def __repr__(self):
+        return '<class %s>(file_name=%r, valid=%r, records=%r)' % (
+            self.__class__.__name__, self.file_name, self.valid,
+            self.records)
+
+    def as_dict(self):
+        """
+        Returns the report as a dictionary.
+
+        :return: a dictionary with the report values
+        """
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+
+class BatchReport(object):
+    """
+    Results of decoding a batch of files.
+    """
+
+    __slots__ = ('files', 'workers', 'seconds')
+
+    def __init__(self, workers):
+        # FileReport for each file, in the order they were decoded
+        self.files = []
+        self.workers = workers
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return '<class %s>(files=%r, invalid=%r, seconds=%r)' % (
+            self.__class__.__name__, len(self.files), self.invalid,
+            self.seconds)
+
+    @property
+    def invalid(self):
+        """
+        Number of invalid files.
+
+        :return: the number of files which could not be decoded
+        """
+        return sum(1 for report in self.files if not report.valid)
+
+    @property
+    def records(self):
+        """
+        Number of records decoded.
+
+        :return: the number of records on the valid files
+        """
+        return sum(report.records for report in self.files)
+
+    @property
+    def bytes(self):
+        """
+        Size of the files read.
+
+        :return: the number of bytes on all the files
+        """
+        return sum(report.bytes for report in self.files)
+
+    @property
+    def records_per_second(self):
+        """
+        Records decoded per second, taking the whole batch time.
+
+        :return: the number of records decoded per second
+        """
+        if self.seconds:
+            return self.records / self.seconds
+        else:
+            return 0.0
+
+    def as_dict(self):
+        """
+        Returns the report as a dictionary.
+
+        :return: a dictionary with the report values
+        """
+        if self.seconds:
+            files_per_second = len(self.files) / self.seconds
+            bytes_per_second = self.bytes / self.seconds
+        else:
+            files_per_second = 0.0
+            bytes_per_second = 0.0
+
+        return {'files': len(self.files),
+                'invalid': self.invalid,
+                'records': self.records,
+                'bytes': self.bytes,
+                'workers': self.workers,
+                'seconds': self.seconds,
+                'decoding_seconds': sum(report.seconds
+                                        for report in self.files),
+                'files_per_second': files_per_second,
+                'records_per_second': self.records_per_second,
+                'bytes_per_second': bytes_per_second,
+                'reports': [report.as_dict() for report in self.files]}
+
+
+def _write_json(cwr_file, path):
+    # Written on a temporary file first, so no partial files are left
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path),
+                                         suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8') as stream:
+            JSONEncoder().encode_to(cwr_file, stream)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def _decode_file(decoder, path, output_dir):
+    """
+    Decodes a single file, writing it as JSON if an output folder is
+    received.
+
+    :param decoder: the file decoder
+    :param path: path to the file
+    :param output_dir: folder for the JSON file, or None
+    :return: the FileReport for the file
+    """
+    report = FileReport(path)
+
+    start = time.perf_counter()
+    try:
+        report.bytes = os.path.getsize(path)
+
+        data = {}
+        data['filename'] = report.file_name
+        data['path'] = path
+
+        cwr_file = decoder.decode(data)
+
+        groups = cwr_file.transmission.groups
+        report.groups = len(groups)
+        report.transactions = sum(len(group.transactions)
+                                  for group in groups)
+        # Header and trailer records are counted too
+        report.records = 2 + sum(2 + sum(len(transaction)
+                                         for transaction in
+                                         group.transactions)
+                                 for group in groups)
+
+        if output_dir:
+            report.output = os.path.join(output_dir,
+                                         report.file_name + '.json')
+            _write_json(cwr_file, report.output)
+
+        report.valid = True
+    except Exception as e:
+        # Any error only affects its own file
+        report.error = '%s: %s' % (e.__class__.__name__, e)
+        report.groups = report.transactions = report.records = 0
+    finally:
+        report.seconds = time.perf_counter() - start
+
+    return report
+
+
+def _decode_on_worker(path, output_dir):
+    return _decode_file(worker_decoder(), path, output_dir)
+
+
+class BatchDecoder(object):
+    """
+    Decodes a batch of CWR files on a pool of processes.
+    """
+
+    def __init__(self, decoder_factory=default_file_automaton_decoder,
+                 output_dir=None, max_workers=None, filename_decoder=None):
+        """
+        Constructs a BatchDecoder.
+
+        The decoder factory is called once on each process, so it should be
+        a module level function, such as default_file_automaton_decoder.
+
+        If the number of workers is 0 the files are decoded on the current
+        process.
+
+        :param decoder_factory: function returning a file decoder
+        :param output_dir: folder for the JSON files, by default they are not
+        written
+        :param max_workers: number of processes, by default the number of
+        CPUs
+        :param filename_decoder: decoder for ordering the files by their
+        names
+        """
+        # Logger
+        self._logger = logging.getLogger(__name__)
+
+        self._decoder_factory = decoder_factory
+        self._output_dir = output_dir
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self._max_workers = max_workers
+
+        if filename_decoder:
+            self._filename_decoder = filename_decoder
+        else:
+            self._filename_decoder = default_filename_decoder()
+
+    @property
+    def max_workers(self):
+        """
+        Number of processes decoding the files.
+
+        :return: the number of processes, or 0 for the current process
+        """
+        return self._max_workers
+
+    def decode(self, paths, callback=None):
+        """
+        Decodes the files, in the order given by their names.
+
+        The callback, if received, is called with the FileReport for each
+        file as soon as it has been decoded, which may not be in order.
+
+        :param paths: paths to the files
+        :param callback: function receiving each FileReport
+        :return: the BatchReport for the files
+        """
+        paths = order_files(paths, self._filename_decoder)
+
+        if self._output_dir and not os.path.isdir(self._output_dir):
+            os.makedirs(self._output_dir)
+
+        if self._max_workers == 0:
+            workers = 0
+        else:
+            workers = min(self._max_workers, len(paths)) or 1
+
+        report = BatchReport(workers)
+        start = time.perf_counter()
+
+        if workers == 0:
+            decoder = self._decoder_factory()
+            for path in paths:
+                report.files.append(self._done(
+                    _decode_file(decoder, path, self._output_dir), callback))
+        else:
+            with process_pool(self._decoder_factory, workers) as pool:
+                futures = [pool.submit(_decode_on_worker, path,
+                                       self._output_dir) for path in paths]
+
+                for future in as_completed(futures):
+                    self._done(future.result(), callback)
+
+                report.files = [future.result() for future in futures]
+
+        report.seconds = time.perf_counter() - start
+
+        self._logger.info('Decoded %s files (%s invalid) in %.2f seconds',
+                          len(report.files), report.invalid, report.seconds)
+
+        return report
+
+    def _done(self, report, callback):
+        if report.valid:
+            self._logger.debug('Decoded %s: %s records in %.3f seconds',
+                               report.file_name, report.records,
+                               report.seconds)
+        else:
+            self._logger.warning('Invalid file %s: %s', report.file_name,
+                                 report.error)
+
+        if callback:
+            callback(report)
+
+        return report
+
+
+def _print_report(report):
+    if report.valid:
+        print('%s: %s records in %.2f seconds' % (report.file_name,
+                                                  report.records,
+                                                  report.seconds))
+    else:
+        print('%s: invalid, %s' % (report.file_name, report.error))
+
+
+def main(argv=None):
+    """
+    Runs the cwr-batch command.
+
+    :param argv: command line arguments, by default those of the process
+    :return: the exit status, 1 if any file was invalid
+    """
+    parser = argparse.ArgumentParser(
+        prog='cwr-batch',
+        description='Decodes a batch of CWR files on a pool of processes.')
+    parser.add_argument('paths', nargs='+',
+                        help='folders, glob patterns or files to decode')
+    parser.add_argument('-o', '--output', dest='output_dir',
+                        help='folder for the JSON files and the report')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='number of processes, by default the number '
+                             'of CPUs, 0 for decoding on this process')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='search the subfolders')
+    parser.add_argument('--report',
+                        help='path for the batch report, by default '
+                             '%s on the output folder' % REPORT_NAME)
+    parser.add_argument('--no-json', action='store_true',
+                        help='only write the report, not the JSON files')
+    parser.add_argument('--decoder', choices=sorted(DECODERS),
+                        default='automaton',
+                        help='decoder used for the files')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='do not print a line for each file')
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    paths = find_files(args.paths, args.recursive)
+    if not paths:
+        parser.error('no files found')
+
+    if args.no_json:
+        output_dir = None
+    else:
+        output_dir = args.output_dir
+
+    report_path = args.report
+    if not report_path and args.output_dir:
+        report_path = os.path.join(args.output_dir, REPORT_NAME)
+
+    if args.quiet:
+        callback = None
+    else:
+        callback = _print_report
+
+    decoder = BatchDecoder(DECODERS[args.decoder], output_dir=output_dir,
+                           max_workers=args.workers)
+    report = decoder.decode(paths, callback)
+
+    if report_path:
+        folder = os.path.dirname(report_path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        with open(report_path, 'w', encoding='utf-8') as stream:
+            json.dump(report.as_dict(), stream, indent=2)
+
+    print('Decoded %s files (%s invalid) with %s workers: %s records in '
+          '%.2f seconds, %.0f records per second' % (
+              len(report.files), report.invalid, report.workers,
+              report.records, report.seconds, report.records_per_second))
+
+    if report.invalid:
+        return 1
+    else:
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
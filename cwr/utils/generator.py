@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+from cwr.parser.decoder.file import default_automaton_factory, \
+    default_layout_factory
+from data_cwr.accessor import CWRTables
+
+"""
+Generator of synthetic CWR files.
+
+This creates valid CWR transmissions of any size, which are meant for load
+testing and benchmarking the decoders.
+
+The files are built from the same configuration as the grammar. The structure
+of each transaction is taken from the automatons (see the automaton module),
+which are walked choosing randomly the alternatives, the optional sections
+and the number of repetitions. Each record is then filled following its
+fixed-width layout, with random values for each field type. Lookup fields,
+and the country of the ISRC codes, take their values from the CWR tables.
+
+Shares are taken from what remains for each share field on the transaction,
+so the total of each right never exceeds 100%, and the performing rights
+share of each publisher never exceeds 50%.
+
+Records are created one by one, as strings, so files of any size are written
+with constant memory. A seed can be set so the same file is created each
+time.
+
+The generator for the default standard is returned by the
+default_file_generator() method.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Transaction rule for each transaction type
+transaction_rules = {'AGR': 'agreement_transaction',
+                     'ACK': 'acknowledgement_transaction',
+                     'EXC': 'work_transaction',
+                     'ISW': 'work_transaction',
+                     'NWR': 'work_transaction',
+                     'REV': 'work_transaction'}
+
+# Transaction types sent by default, with their weights
+default_mix = {'NWR': 0.6, 'REV': 0.2, 'AGR': 0.1, 'ACK': 0.1}
+
+# Words for the text fields
+_words = ('MUSIC', 'SONG', 'LOVE', 'NIGHT', 'BLUE', 'RIVER', 'SOCIETY',
+          'PUBLISHING', 'EDITIONS', 'SOUND', 'RECORDS', 'HEART', 'ROAD',
+          'SMITH', 'GARCIA', 'MARTIN', 'JOHN', 'MARIA', 'DANCE', 'WORLD',
+          'THE', 'OF', 'AND', 'SUMMER', 'RAIN', 'GOLD', 'STAR', 'LIGHT')
+
+_alphanumeric = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+# Maximum shares on specific records, when lower than the field's maximum
+_maximum_shares = {('publisher', 'pr_ownership_share'): 50}
+
+
+def _digits(rand, columns):
+    return '%0*d' % (columns, rand.randrange(10 ** columns))
+
+
+def _text(rand, field):
+    if field.values:
+        return _choice(rand, field)
+
+    text = ' '.join(rand.choice(_words) for _ in range(rand.randint(1, 3)))
+    return text[:field.columns].rstrip().ljust(field.columns)
+
+
+def _code(rand, length):
+    return ''.join(rand.choice(_alphanumeric) for _ in range(length))
+
+
+def _choice(rand, field):
+    # Some tables also have the codes aligned to the right, but they are
+    # written aligned to the left, as the encoder does
+    return rand.choice(field.values).strip().ljust(field.columns)
+
+
+def _numeric(rand, field):
+    return _digits(rand, field.columns)
+
+
+def _maximum_percentage(field):
+    if field.values:
+        return int(field.values[0])
+    else:
+        return 100
+
+
+def _percentage(rand, field):
+    decimals = field.columns - 3
+    return '%0*d' % (field.columns, rand.randrange(
+        _maximum_percentage(field) * 10 ** decimals))
+
+
+def _boolean(rand, field):
+    return rand.choice('YN')
+
+
+def _flag(rand, field):
+    return rand.choice('YNU')
+
+
+def _date(rand, field):
+    return '%04d%02d%02d' % (rand.randint(1950, 2029), rand.randint(1, 12),
+                             rand.randint(1, 28))
+
+
+def _time(rand, field):
+    return '%02d%02d%02d' % (rand.randint(0, 23), rand.randint(0, 59),
+                             rand.randint(0, 59))
+
+
+def _date_time(rand, field):
+    return _date(rand, field) + _time(rand, field)
+
+
+def _blank(rand, field):
+    return ' ' * field.columns
+
+
+def _lookup_int(rand, field):
+    return rand.choice(field.values).zfill(field.columns)
+
+
+def _iswc(rand, field):
+    return 'T' + _digits(rand, 10)
+
+
+def _ipi_base_n(rand, field):
+    return 'I-%s-%s' % (_digits(rand, 9), _digits(rand, 1))
+
+
+def _isrc(countries):
+    def generate(rand, field):
+        return rand.choice(countries) + _code(rand, 3) + _digits(rand, 7)
+
+    return generate
+
+
+def _avi(rand, field):
+    return _digits(rand, 3) + _code(rand, field.columns - 3)
+
+
+_generators = {'alphanum': _text,
+               'alphanum_ext': _text,
+               'numeric': _numeric,
+               'numeric_float': _numeric,
+               'percentage': _percentage,
+               'boolean': _boolean,
+               'flag': _flag,
+               'date': _date,
+               'time': _time,
+               'date_time': _date_time,
+               'blank': _blank,
+               'lookup': _choice,
+               'lookup_int': _lookup_int,
+               'iswc': _iswc,
+               'ipi_name_n': _numeric,
+               'ipi_base_n': _ipi_base_n,
+               'ean13': _numeric,
+               'visan': _numeric,
+               'avi': _avi,
+               'charset': _blank}
+
+
+def _empty(field):
+    # Empty dates and times are filled with zeroes, as it is usual on CWR
+    # files
+    if field.field_type in ('date', 'time'):
+        return '0' * field.columns
+    else:
+        return ' ' * field.columns
+
+
+class FileGenerator(object):
+    """
+    Creates the lines of synthetic CWR files.
+
+    The transmissions contain a group for each transaction type, in the order
+    received. The records are split among these groups according to the
+    weight of each transaction type.
+    """
+
+    def __init__(self, automaton_factory, layout_factory, tables, seed=None,
+                 optional=0.5, repeat=2, empty=0.2):
+        """
+        Constructs a FileGenerator.
+
+        :param automaton_factory: factory for the transactions automatons
+        :param layout_factory: factory for the records layouts
+        :param tables: the CWR tables, for the values not on the layouts
+        :param seed: seed for the random values
+        :param optional: probability of adding each optional section
+        :param repeat: maximum number of repetitions added to each repeated
+        section, over its minimum
+        :param empty: probability of leaving empty each optional field
+        """
+        self._automaton_factory = automaton_factory
+        self._layout_factory = layout_factory
+
+        self._random = random.Random(seed)
+
+        # Only the two letters country codes are used, as the table contains
+        # a few other values
+        countries = [country for country in
+                     tables.get_data('isrc_country_code')
+                     if len(country) == 2]
+        self._generators = dict(_generators, isrc=_isrc(countries))
+
+        self._optional = optional
+        self._repeat = repeat
+        self._empty = empty
+
+        # Fields for each record rule, along their generator
+        self._fields = {}
+
+    def lines(self, records, mix=None):
+        """
+        Creates the lines of a CWR file with approximately the received
+        number of records.
+
+        The transaction types are received as a dictionary with the weight of
+        each of them, such as {'NWR': 0.8, 'AGR': 0.2}. Types with more weight
+        will take more of the records.
+
+        :param records: number of records for the file
+        :param mix: weight for each transaction type
+        :return: a generator of lines, without line ends
+        """
+        if mix is None:
+            mix = default_mix
+
+        total = float(sum(mix.values()))
+
+        yield self.record('transmission_header',
+                          {'edi_standard': '01.10', 'character_set': None})
+
+        transaction_count = 0
+        record_count = 2
+        for group_id, transaction_type in enumerate(mix, 1):
+            # Records for the group, not counting the header and trailer
+            size = int(records * mix[transaction_type] / total) - 2
+
+            yield self.record('group_header',
+                              {'transaction_type': transaction_type,
+                               'group_id': '%05d' % group_id,
+                               'version_number': '02.10',
+                               'sd_type': None})
+
+            transactions = 0
+            group_records = 2
+            while transactions == 0 or group_records - 2 < size:
+                for line in self.transaction(transaction_type, transactions):
+                    group_records += 1
+                    yield line
+                transactions += 1
+
+            yield self.record('group_trailer_base',
+                              {'group_id': '%05d' % group_id,
+                               'transaction_count': '%08d' % transactions,
+                               'record_count': '%08d' % group_records,
+                               'currency_indicator': None,
+                               'total_monetary_value': None})
+
+            transaction_count += transactions
+            record_count += group_records
+
+        yield self.record('transmission_trailer',
+                          {'group_count': '%05d' % len(mix),
+                           'transaction_count': '%08d' % transaction_count,
+                           'record_count': '%08d' % record_count})
+
+    def write(self, stream, records, mix=None, line_end='\r\n'):
+        """
+        Writes a CWR file with approximately the received number of records.
+
+        :param stream: file-like object where the file is written
+        :param records: number of records for the file
+        :param mix: weight for each transaction type
+        :param line_end: line separator
+        :return: the number of records written
+        """
+        count = 0
+        for line in self.lines(records, mix):
+            stream.write(line)
+            stream.write(line_end)
+            count += 1
+
+        return count
+
+    def transaction(self, transaction_type, transaction_n):
+        """
+        Creates the lines of a single transaction.
+
+        :param transaction_type: type of the transaction, such as NWR
+        :param transaction_n: sequence number of the transaction
+        :return: a list with the lines of the transaction
+        """
+        automaton = self._automaton_factory.get_rule(
+            transaction_rules[transaction_type])
+
+        rule_ids = []
+        self._walk(automaton.node, rule_ids)
+
+        # Shares remaining on the transaction
+        shares = {}
+
+        lines = []
+        for record_n, rule_id in enumerate(rule_ids):
+            if record_n == 0:
+                record_type = transaction_type
+            else:
+                record_type = None
+
+            lines.append(self.record(rule_id, {
+                'transaction_sequence_n': '%08d' % transaction_n,
+                'record_sequence_n': '%08d' % record_n}, record_type, shares))
+
+        return lines
+
+    def record(self, rule_id, values=None, record_type=None, shares=None):
+        """
+        Creates a single record.
+
+        The values for specific fields can be received, already formatted,
+        indexed by the field id. None values are left empty.
+
+        If the shares remaining on the transaction are received, the share
+        fields take their values from them, and they are updated.
+
+        :param rule_id: id of the record rule
+        :param values: values for specific fields
+        :param record_type: record type, by default one of the record heads
+        :param shares: share remaining for each share field id
+        :return: the record's line
+        """
+        if rule_id not in self._fields:
+            layout = self._layout_factory.get_rule(rule_id)
+            self._fields[rule_id] = (
+                layout.heads,
+                [(field, self._generators[field.field_type],
+                  not field.compulsory)
+                 for field in layout.variants[0][1:]])
+
+        heads, fields = self._fields[rule_id]
+
+        if values is None:
+            values = {}
+
+        rand = self._random
+
+        if record_type is None:
+            record_type = rand.choice(heads)
+
+        line = [record_type]
+        for field, generator, can_be_empty in fields:
+            if field.field_id in values:
+                text = values[field.field_id]
+                if text is None:
+                    text = _empty(field)
+            elif can_be_empty and rand.random() < self._empty:
+                text = _empty(field)
+            elif shares is not None and field.field_type == 'percentage':
+                text = self._share(rule_id, field, shares)
+            else:
+                text = generator(rand, field)
+            line.append(text)
+
+        return ''.join(line)
+
+    def _share(self, rule_id, field, shares):
+        unit = 10 ** (field.columns - 3)
+
+        maximum = min(_maximum_percentage(field),
+                      _maximum_shares.get((rule_id, field.field_id), 100))
+        remaining = shares.get(field.field_id, 100 * unit)
+
+        value = self._random.randint(0, min(maximum * unit, remaining))
+        shares[field.field_id] = remaining - value
+
+        return '%0*d' % (field.columns, value)
+
+    def _walk(self, node, rule_ids):
+        node_type = node[0]
+
+        if node_type == 'record':
+            rule_ids.append(node[1])
+        elif node_type == 'sequence':
+            for child in node[1]:
+                self._walk(child, rule_ids)
+        elif node_type == 'option':
+            self._walk(self._random.choice(node[1]), rule_ids)
+        elif node_type == 'optional':
+            if self._random.random() < self._optional:
+                self._walk(node[1], rule_ids)
+        else:
+            # Repetition, with a minimum number of times
+            times = node[2] + self._random.randint(0, self._repeat)
+            for _ in range(times):
+                self._walk(node[1], rule_ids)
+
+
+def default_file_generator(seed=None):
+    """
+    Creates a generator of synthetic CWR files.
+
+    The same seed will always generate the same files.
+
+    :param seed: seed for the random values
+    :return: a synthetic file generator for the default standard
+    """
+    return FileGenerator(default_automaton_factory(),
+                         default_layout_factory(), CWRTables(), seed=seed)
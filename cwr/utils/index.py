@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+
+import sqlite3
+
+from cwr.file import CWRFile
+
+"""
+Index of the works and interested parties on CWR files.
+
+The TransmissionIndex stores, on a SQLite database, where each ISWC,
+submitter work number, IPI name number and IPI base number appears. Each
+decoded transmission is added to the index along its file name, and after
+that the files, groups, transactions and records mentioning any of these
+codes can be found without decoding the files again.
+
+The codes are taken from all the records containing them, such as the works,
+components, writers, publishers or interested parties for agreements, and
+they are normalized so the same code always matches, no matter how it was
+written on the file.
+
+Adding again a file with the same name replaces its previous entries, so the
+index can be kept updated as revised files arrive.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Types of codes indexed
+ISWC = 'iswc'
+SUBMITTER_WORK_N = 'submitter_work_n'
+IPI_NAME_N = 'ipi_name_n'
+IPI_BASE_N = 'ipi_base_n'
+
+KEY_TYPES = (ISWC, SUBMITTER_WORK_N, IPI_NAME_N, IPI_BASE_N)
+
+# Record attributes containing an interested party
+_parties = ('publisher', 'writer')
+
+# Maximum number of values on each batch query
+_batch_size = 500
+
+_schema = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key_type TEXT NOT NULL,
+    key TEXT NOT NULL,
+    file_id INTEGER NOT NULL REFERENCES files (id),
+    group_n INTEGER NOT NULL,
+    transaction_n INTEGER NOT NULL,
+    record_n INTEGER NOT NULL,
+    record_type TEXT,
+    field TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_key ON entries (key_type, key);
+CREATE INDEX IF NOT EXISTS entries_file ON entries (file_id);
+"""
+
+
+def normalize(key_type, value):
+    """
+    Transforms a code into the form stored on the index.
+
+    IPI name numbers are stored as eleven digits, while the other codes are
+    stored in uppercase, and the ISWC codes without separators.
+
+    :param key_type: type of the code
+    :param value: the code to normalize
+    :return: the normalized code, or None if it is empty
+    """
+    if value is None:
+        return None
+
+    if key_type == IPI_NAME_N:
+        try:
+            value = int(value)
+        except ValueError:
+            return None
+
+        if value == 0:
+            return None
+
+        return '%011d' % value
+
+    value = str(value).strip().upper()
+
+    if key_type == ISWC:
+        value = value.replace('-', '').replace('.', '')
+
+    if len(value) == 0:
+        return None
+
+    return value
+
+
+def _key_type(name):
+    for key_type in KEY_TYPES:
+        if name == key_type or name.endswith('_' + key_type):
+            return key_type
+
+    return None
+
+
+def _getter(party, name):
+    if party is None:
+        return lambda record: getattr(record, name)
+    else:
+        return lambda record: getattr(getattr(record, party), name, None)
+
+
+def _class_fields(cls):
+    """
+    Finds the fields containing indexed codes for a record class.
+
+    :param cls: the record class
+    :return: a list of (field, key type, getter) tuples
+    """
+    fields = []
+    for name in dir(cls):
+        if name.startswith('_'):
+            continue
+
+        if name in _parties:
+            for key_type in (IPI_NAME_N, IPI_BASE_N):
+                fields.append(('%s.%s' % (name, key_type), key_type,
+                               _getter(name, key_type)))
+        else:
+            key_type = _key_type(name)
+            if key_type:
+                fields.append((name, key_type, _getter(None, name)))
+
+    return fields
+
+
+class IndexEntry(object):
+    """
+    Position of a code on an indexed file.
+
+    The group, transaction and record are indicated by their position,
+    starting with 0, on the transmission, group and transaction respectively.
+    """
+
+    __slots__ = ('file_name', 'group_n', 'transaction_n', 'record_n',
+                 'record_type', 'field', 'key_type', 'key')
+
+    def __init__(self, file_name, group_n, transaction_n, record_n,
+                 record_type, field, key_type, key):
+        self.file_name = file_name
+        self.group_n = group_n
+        self.transaction_n = transaction_n
+        self.record_n = record_n
+        self.record_type = record_type
+        self.field = field
+        self.key_type = key_type
+        self.key = key
+
+    def __eq__(self, other):
+        return isinstance(other, IndexEntry) and \
+            self.as_tuple() == other.as_tuple()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __repr__(self):
+        return '<class %s>(file_name=%r, group_n=%r, transaction_n=%r, ' \
+               'record_n=%r, record_type=%r, field=%r, key_type=%r, ' \
+               'key=%r)' % ((self.__class__.__name__,) + self.as_tuple())
+
+    def as_tuple(self):
+        """
+        Returns the entry as a tuple.
+
+        :return: a tuple with the entry values
+        """
+        return (self.file_name, self.group_n, self.transaction_n,
+                self.record_n, self.record_type, self.field, self.key_type,
+                self.key)
+
+
+class TransmissionIndex(object):
+    """
+    Index of the codes on a group of CWR files, stored on a SQLite database.
+
+    It can be used as a context manager, closing the database at the end.
+    """
+
+    def __init__(self, path=':memory:'):
+        """
+        Constructs a TransmissionIndex.
+
+        The database is created if it does not exist.
+
+        :param path: path to the database file, by default it is kept only in
+        memory
+        """
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_schema)
+
+        # Indexed fields for each record class
+        self._fields = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def files(self):
+        """
+        Names of the indexed files.
+
+        :return: a sorted list with the file names
+        """
+        return [row[0] for row in self._connection.execute(
+            'SELECT name FROM files ORDER BY name')]
+
+    def add(self, file_name, transmission):
+        """
+        Adds a transmission to the index.
+
+        If a file with the same name was already indexed, its entries are
+        replaced.
+
+        :param file_name: name of the file containing the transmission
+        :param transmission: CWRFile or Transmission to index
+        :return: the number of entries added
+        """
+        if isinstance(transmission, CWRFile):
+            transmission = transmission.transmission
+
+        with self._connection as connection:
+            file_id = self._replace_file(connection, file_name)
+
+            rows = [(key_type, key, file_id) + position
+                    for key_type, key, position in
+                    self._entries(transmission)]
+
+            connection.executemany(
+                'INSERT INTO entries (key_type, key, file_id, group_n, '
+                'transaction_n, record_n, record_type, field) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+        return len(rows)
+
+    def remove(self, file_name):
+        """
+        Removes a file from the index.
+
+        :param file_name: name of the file to remove
+        """
+        with self._connection as connection:
+            self._remove_file(connection, file_name)
+
+    def lookup(self, key_type, value):
+        """
+        Finds where a code appears.
+
+        :param key_type: type of the code, such as 'iswc' or 'ipi_name_n'
+        :param value: the code to find
+        :return: a list with the IndexEntry for each appearance
+        """
+        return self.lookup_many(key_type, [value]).get(value, [])
+
+    def lookup_many(self, key_type, values):
+        """
+        Finds where each of several codes appear.
+
+        :param key_type: type of the codes, such as 'iswc' or 'ipi_name_n'
+        :param values: the codes to find
+        :return: a dictionary with the IndexEntry list for each code found,
+        indexed by the code as received
+        """
+        _check_key_type(key_type)
+
+        keys = {}
+        for value in values:
+            key = normalize(key_type, value)
+            if key is not None:
+                keys.setdefault(key, []).append(value)
+
+        result = {}
+        key_list = list(keys)
+        for i in range(0, len(key_list), _batch_size):
+            batch = key_list[i:i + _batch_size]
+
+            rows = self._connection.execute(
+                'SELECT files.name, group_n, transaction_n, record_n, '
+                'record_type, field, key FROM entries '
+                'JOIN files ON files.id = entries.file_id '
+                'WHERE key_type = ? AND key IN (%s) '
+                'ORDER BY files.name, group_n, transaction_n, record_n, '
+                'field' % ', '.join('?' * len(batch)),
+                [key_type] + batch)
+
+            for row in rows:
+                entry = IndexEntry(*(row[:6] + (key_type, row[6])))
+                for value in keys[row[6]]:
+                    result.setdefault(value, []).append(entry)
+
+        return result
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self._connection.close()
+
+    def _entries(self, transmission):
+        for group_n, group in enumerate(transmission.groups):
+            for transaction_n, transaction in enumerate(group.transactions):
+                for record_n, record in enumerate(transaction):
+                    position = (group_n, transaction_n, record_n,
+                                getattr(record, 'record_type', None))
+
+                    for field, key_type, get in self._record_fields(record):
+                        key = normalize(key_type, get(record))
+                        if key is not None:
+                            yield key_type, key, position + (field,)
+
+    def _record_fields(self, record):
+        cls = record.__class__
+        if cls not in self._fields:
+            self._fields[cls] = _class_fields(cls)
+
+        return self._fields[cls]
+
+    def _replace_file(self, connection, file_name):
+        self._remove_file(connection, file_name)
+
+        cursor = connection.execute('INSERT INTO files (name) VALUES (?)',
+                                    (file_name,))
+
+        return cursor.lastrowid
+
+    @staticmethod
+    def _remove_file(connection, file_name):
+        row = connection.execute('SELECT id FROM files WHERE name = ?',
+                                 (file_name,)).fetchone()
+
+        if row:
+            connection.execute('DELETE FROM entries WHERE file_id = ?', row)
+            connection.execute('DELETE FROM files WHERE id = ?', row)
+
+
+def _check_key_type(key_type):
+    if key_type not in KEY_TYPES:
+        raise ValueError('Invalid key type: %s' % key_type)
@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import sqlite3
+import time
+
+import pyparsing as pp
+
+from cwr.parser.decoder.file import default_record_decoder
+from cwr.parser.decoder.stream import GROUP_HEADER, GROUP_TRAILER, \
+    TRANSACTION, RecordSplitter, read_lines
+
+"""
+Loading of CWR files into a SQLite database.
+
+The SQLiteLoader reads a CWR file line by line, decoding each record with the
+fixed-width record decoder, and writes it on a table for its record type,
+such as NWR or SPU. The columns of each table are the fields of the record,
+named by their id in the fields configuration, like on the ColumnTable of
+the columnar module.
+
+Besides the fields, each row contains the file, group and transaction it
+belongs to, as references to the files, groups and transactions tables, and
+the number of its line. These columns begin with an underscore, so they
+never clash with the record fields:
+
+- files: _id, name, status
+- groups: _id, _file_id, _position, transaction_type, group_id
+- transactions: _id, _group_id, _position, record_type
+- each record table: _id, _file_id, _group_id, _transaction_id, _line_n and
+the record fields
+
+The rows are inserted in batches with executemany, and committed after a
+fixed number of rows, so the file never needs to be kept in memory, and any
+size can be loaded. Only the structure of the transmission is read, the order
+of the records inside each transaction is not validated.
+
+As a file is committed in several steps, the files table indicates the status
+of each of them. It is 'loading' until the file has been fully loaded, when
+it changes to 'complete'. If the file is invalid, the rows already written
+are deleted, and it is marked as 'failed'. A file left as 'loading', such as
+when the process is killed, can be removed with the delete method. So only
+the files marked as complete should be used.
+
+Dates and times are stored in the ISO format.
+
+The loader for the default standard is returned by the default_sqlite_loader()
+method.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# SQLite types for the field types
+_sql_types = {'numeric': 'INTEGER',
+              'lookup_int': 'INTEGER',
+              'ipi_name_n': 'INTEGER',
+              'ean13': 'INTEGER',
+              'boolean': 'INTEGER',
+              'numeric_float': 'REAL',
+              'percentage': 'REAL'}
+
+# Columns added to each record table
+_reference_columns = ('_file_id', '_group_id', '_transaction_id', '_line_n')
+
+# Status of the files
+LOADING = 'loading'
+COMPLETE = 'complete'
+FAILED = 'failed'
+
+_schema = """
+CREATE TABLE IF NOT EXISTS files (
+    _id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS groups (
+    _id INTEGER PRIMARY KEY,
+    _file_id INTEGER NOT NULL REFERENCES files (_id),
+    _position INTEGER NOT NULL,
+    transaction_type TEXT,
+    group_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    _id INTEGER PRIMARY KEY,
+    _group_id INTEGER NOT NULL REFERENCES groups (_id),
+    _position INTEGER NOT NULL,
+    record_type TEXT
+);
+"""
+
+
+def _iso(value):
+    if value is None:
+        return None
+    return value.isoformat()
+
+
+def _avi(value):
+    if value is None:
+        return None
+    return '%03d%s' % (value.society_code, value.av_number)
+
+
+_adapters = {'date': _iso,
+             'time': _iso,
+             'date_time': _iso,
+             'avi': _avi}
+
+
+def _quote(name):
+    return '"%s"' % name
+
+
+class LoadStats(object):
+    """
+    Statistics for the loading of a file.
+    """
+
+    __slots__ = ('file_id', 'rows', 'records', 'seconds', 'tables')
+
+    def __init__(self):
+        # Id of the file on the files table
+        self.file_id = None
+        self.rows = 0
+        self.records = 0
+        self.seconds = 0.0
+        # Rows on each table
+        self.tables = {}
+
+    def __repr__(self):
+        return '<class %s>(file_id=%r, rows=%r, records=%r, seconds=%r)' % (
+            self.__class__.__name__, self.file_id, self.rows, self.records,
+            self.seconds)
+
+    @property
+    def rows_per_second(self):
+        """
+        Rows written per second.
+
+        :return: the number of rows written per second
+        """
+        if self.seconds:
+            return self.rows / self.seconds
+        else:
+            return 0.0
+
+    def as_dict(self):
+        """
+        Returns the statistics as a dictionary.
+
+        :return: a dictionary with the statistics
+        """
+        return {'file_id': self.file_id,
+                'rows': self.rows,
+                'records': self.records,
+                'seconds': self.seconds,
+                'rows_per_second': self.rows_per_second,
+                'tables': dict(self.tables)}
+
+
+class _RecordTable(object):
+    """
+    Table for the records of a single type.
+    """
+
+    def __init__(self, record_type, record_decoder):
+        self.name = record_type
+
+        # Fields merged from all the rules, skipping the blank ones
+        self.columns = []
+        adapters = []
+        types = []
+        for rule_id in record_decoder.rule_ids(record_type):
+            for field in record_decoder.fields(rule_id):
+                if field.field_type == 'blank' or field.name in self.columns:
+                    continue
+                self.columns.append(field.name)
+                adapters.append(_adapters.get(field.field_type))
+                types.append(_sql_types.get(field.field_type, 'TEXT'))
+
+        self._adapters = [(i, adapter) for i, adapter in enumerate(adapters)
+                          if adapter is not None]
+
+        self.create = 'CREATE TABLE IF NOT EXISTS %s (_id INTEGER PRIMARY ' \
+                      'KEY, _file_id INTEGER, _group_id INTEGER, ' \
+                      '_transaction_id INTEGER, _line_n INTEGER%s)' % (
+                          _quote(self.name),
+                          ''.join(', %s %s' % (_quote(column), column_type)
+                                  for column, column_type in
+                                  zip(self.columns, types)))
+
+        names = _reference_columns + tuple(self.columns)
+        self.insert = 'INSERT INTO %s (%s) VALUES (%s)' % (
+            _quote(self.name), ', '.join(_quote(name) for name in names),
+            ', '.join('?' * len(names)))
+
+        # Rows waiting to be inserted
+        self.rows = []
+
+    def row(self, references, values):
+        row = [values.get(column) for column in self.columns]
+
+        for i, adapter in self._adapters:
+            row[i] = adapter(row[i])
+
+        return references + tuple(row)
+
+
+class SQLiteLoader(object):
+    """
+    Loads CWR files into a SQLite database, with a table for each record
+    type.
+
+    Several files can be loaded on the same database. The tables are created
+    the first time a record type is found.
+    """
+
+    def __init__(self, database, record_decoder, batch_size=1000,
+                 commit_size=100000):
+        """
+        Constructs a SQLiteLoader.
+
+        :param database: path to the database, or a sqlite3 connection
+        :param record_decoder: fixed-width record decoder
+        :param batch_size: rows inserted on each executemany call
+        :param commit_size: rows inserted on each database transaction
+        """
+        # Logger
+        self._logger = logging.getLogger(__name__)
+
+        if isinstance(database, sqlite3.Connection):
+            self._connection = database
+        else:
+            self._connection = sqlite3.connect(database)
+        self._connection.executescript(_schema)
+
+        self._record_decoder = record_decoder
+        self._batch_size = batch_size
+        self._commit_size = commit_size
+
+        self._splitter = RecordSplitter()
+
+        # Tables for each record type
+        self._tables = {}
+        # Tables created while loading the current file
+        self._created = []
+
+        self._groups = []
+        self._transactions = []
+
+        # Rows inserted since the last commit
+        self._uncommitted = 0
+
+        self._stats = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def connection(self):
+        """
+        Connection to the database.
+
+        :return: the sqlite3 connection
+        """
+        return self._connection
+
+    def load(self, file_name, data):
+        """
+        Loads a CWR file into the database.
+
+        If the file is invalid, the rows already written are deleted, and the
+        file is marked as failed.
+
+        :param file_name: name of the file
+        :param data: file contents, either as a string, a file-like object or
+        an iterable of lines
+        :return: the LoadStats for the file
+        """
+        if isinstance(data, str):
+            data = data.splitlines()
+
+        self._stats = stats = LoadStats()
+        start = time.perf_counter()
+
+        connection = self._connection
+
+        # The file is marked as loading before any of its rows is committed
+        file_id = connection.execute(
+            'INSERT INTO files (name, status) VALUES (?, ?)',
+            (file_name, LOADING)).lastrowid
+        connection.commit()
+        stats.file_id = file_id
+        stats.rows += 1
+        stats.tables['files'] = 1
+
+        group_id = self._next_id('groups')
+        transaction_id = self._next_id('transactions') - 1
+
+        group = None
+        group_n = -1
+        transaction = None
+        transaction_n = -1
+
+        try:
+            for piece, line_n, lines in self._splitter.split(
+                    read_lines(data)):
+                if piece == GROUP_HEADER:
+                    group_n += 1
+                    group = group_id + group_n
+                    transaction_n = -1
+                elif piece == TRANSACTION:
+                    transaction_n += 1
+                    transaction_id += 1
+                    transaction = transaction_id
+                    self._add_row(self._transactions, 'transactions', (
+                        transaction, group, transaction_n, lines[0][:3]))
+
+                for i, line in enumerate(lines):
+                    values = self._add_record(
+                        line, line_n + i,
+                        (file_id, group, transaction, line_n + i))
+
+                    if piece == GROUP_HEADER:
+                        self._add_row(self._groups, 'groups', (
+                            group, file_id, group_n,
+                            values.get('transaction_type'),
+                            values.get('group_id')))
+
+                if piece == TRANSACTION:
+                    transaction = None
+                elif piece == GROUP_TRAILER:
+                    group = None
+
+            self._flush()
+            self._set_status(file_id, COMPLETE)
+            connection.commit()
+        except Exception:
+            for table in self._tables.values():
+                del table.rows[:]
+            del self._groups[:]
+            del self._transactions[:]
+            connection.rollback()
+
+            # The tables created may have been rolled back, they will be
+            # created again if needed
+            for record_type in self._created:
+                del self._tables[record_type]
+
+            # The rows already committed are removed
+            self._delete_rows(file_id)
+            self._set_status(file_id, FAILED)
+            connection.commit()
+            raise
+        finally:
+            stats.seconds = time.perf_counter() - start
+            self._uncommitted = 0
+            self._created = []
+
+        self._logger.debug('Loaded %s rows from %s (%.0f rows/s)',
+                           stats.rows, file_name, stats.rows_per_second)
+
+        return stats
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self._connection.close()
+
+    def delete(self, file_id):
+        """
+        Removes a file from the database, along all its rows.
+
+        :param file_id: id of the file on the files table
+        """
+        self._delete_rows(file_id)
+        self._connection.execute('DELETE FROM files WHERE _id = ?',
+                                 (file_id,))
+        self._connection.commit()
+
+    def _delete_rows(self, file_id):
+        connection = self._connection
+
+        tables = [row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name "
+            "NOT IN ('files', 'groups', 'transactions')")]
+        for table in tables:
+            connection.execute('DELETE FROM %s WHERE _file_id = ?' %
+                               _quote(table), (file_id,))
+
+        connection.execute('DELETE FROM transactions WHERE _group_id IN '
+                           '(SELECT _id FROM groups WHERE _file_id = ?)',
+                           (file_id,))
+        connection.execute('DELETE FROM groups WHERE _file_id = ?',
+                           (file_id,))
+
+    def _set_status(self, file_id, status):
+        self._connection.execute('UPDATE files SET status = ? WHERE _id = ?',
+                                 (status, file_id))
+
+    def _add_record(self, line, line_n, references):
+        try:
+            rule_id, values = self._record_decoder.decode_values(line)
+        except pp.ParseException as e:
+            raise pp.ParseException(e.pstr, e.loc, 'Invalid record on line '
+                                                   '%s: %s' % (line_n, e.msg))
+
+        record_type = line[:3]
+        table = self._tables.get(record_type)
+        if table is None:
+            table = self._create_table(record_type)
+
+        self._stats.records += 1
+        self._add_row(table.rows, table.name, table.row(references, values))
+
+        return values
+
+    def _add_row(self, rows, name, row):
+        rows.append(row)
+
+        stats = self._stats
+        stats.rows += 1
+        stats.tables[name] = stats.tables.get(name, 0) + 1
+
+        if len(rows) >= self._batch_size:
+            self._flush()
+
+    def _flush(self):
+        connection = self._connection
+
+        # Groups and transactions go first, as the records refer to them
+        if self._groups:
+            connection.executemany(
+                'INSERT INTO groups (_id, _file_id, _position, '
+                'transaction_type, group_id) VALUES (?, ?, ?, ?, ?)',
+                self._groups)
+            self._uncommitted += len(self._groups)
+            del self._groups[:]
+
+        if self._transactions:
+            connection.executemany(
+                'INSERT INTO transactions (_id, _group_id, _position, '
+                'record_type) VALUES (?, ?, ?, ?)', self._transactions)
+            self._uncommitted += len(self._transactions)
+            del self._transactions[:]
+
+        for table in self._tables.values():
+            if table.rows:
+                connection.executemany(table.insert, table.rows)
+                self._uncommitted += len(table.rows)
+                del table.rows[:]
+
+        if self._uncommitted >= self._commit_size:
+            connection.commit()
+            self._uncommitted = 0
+
+    def _create_table(self, record_type):
+        table = _RecordTable(record_type, self._record_decoder)
+
+        self._connection.execute(table.create)
+        self._tables[record_type] = table
+        self._created.append(record_type)
+
+        return table
+
+    def _next_id(self, table):
+        row = self._connection.execute('SELECT MAX(_id) FROM %s' %
+                                       table).fetchone()
+
+        return (row[0] or 0) + 1
+
+
+def default_sqlite_loader(database, batch_size=1000, commit_size=100000):
+    """
+    Creates a loader which writes the records of CWR files to a SQLite
+    database.
+
+    :param database: path to the database, or a sqlite3 connection
+    :param batch_size: rows inserted on each executemany call
+    :param commit_size: rows inserted on each database transaction
+    :return: a SQLite loader for the default standard
+    """
+    return SQLiteLoader(database, default_record_decoder(),
+                        batch_size=batch_size, commit_size=commit_size)
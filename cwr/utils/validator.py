@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+
+from cwr.parser.decoder.stream import HEADER, GROUP_HEADER, GROUP_TRAILER, \
+    TRANSACTION, TRAILER
+
+"""
+Validation of the contents of CWR files.
+
+The decoders only check that each record is well formed, and that the records
+appear on the expected order. The StreamValidator checks the rules which
+depend on several records:
+
+- The counts on the group and transmission trailers match the contents
+- The group ids start with 1 and are consecutive, and each group trailer has
+the same id as its header
+- The transaction sequence numbers start with 0 on each group and are
+consecutive, and all the records on a transaction share the same number
+- The record sequence numbers start with 0 on each transaction and are
+consecutive
+- The ownership shares of the publishers and writers are within their ranges,
+and their total for each right does not exceed 100%
+
+It reads the pieces of the transmission returned by the events method of the
+stream decoders, in a single pass, keeping only the counters for the current
+group and transaction, so it can check files of any size. The stream decoders
+accept a validator, which will then check each file they decode, but if none
+is given they don't do any additional work.
+
+Each rule can be enabled or disabled on its own. The violations found are
+collected by rule.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Rules
+GROUP_ID = 'group_id'
+GROUP_TRANSACTION_COUNT = 'group_transaction_count'
+GROUP_RECORD_COUNT = 'group_record_count'
+TRANSMISSION_GROUP_COUNT = 'transmission_group_count'
+TRANSMISSION_TRANSACTION_COUNT = 'transmission_transaction_count'
+TRANSMISSION_RECORD_COUNT = 'transmission_record_count'
+TRANSACTION_SEQUENCE = 'transaction_sequence'
+RECORD_SEQUENCE = 'record_sequence'
+SHARE_RANGE = 'share_range'
+SHARE_TOTAL = 'share_total'
+
+RULES = (GROUP_ID, GROUP_TRANSACTION_COUNT, GROUP_RECORD_COUNT,
+         TRANSMISSION_GROUP_COUNT, TRANSMISSION_TRANSACTION_COUNT,
+         TRANSMISSION_RECORD_COUNT, TRANSACTION_SEQUENCE, RECORD_SEQUENCE,
+         SHARE_RANGE, SHARE_TOTAL)
+
+# Records with ownership shares, and the maximum PR share for each of them
+_share_records = {'SPU': 50.0,
+                  'OPU': 50.0,
+                  'SWR': 100.0,
+                  'OWR': 100.0}
+
+# Rights and the attributes containing their shares
+_rights = (('PR', 'pr_ownership_share'),
+           ('MR', 'mr_ownership_share'),
+           ('SR', 'sr_ownership_share'))
+
+
+class Violation(object):
+    """
+    A rule broken on a CWR file.
+
+    The group and transaction are indicated by their position, starting with
+    0, on the transmission and the group respectively. The record is
+    indicated by its position on the file, starting with 1 for the
+    transmission header, which is its line number unless the file contains
+    empty lines.
+    """
+
+    __slots__ = ('rule', 'message', 'record_n', 'group_n', 'transaction_n')
+
+    def __init__(self, rule, message, record_n, group_n=None,
+                 transaction_n=None):
+        self.rule = rule
+        self.message = message
+        self.record_n = record_n
+        self.group_n = group_n
+        self.transaction_n = transaction_n
+
+    def __repr__(self):
+        return '<class %s>(rule=%r, message=%r, record_n=%r, group_n=%r, ' \
+               'transaction_n=%r)' % (self.__class__.__name__, self.rule,
+                                      self.message, self.record_n,
+                                      self.group_n, self.transaction_n)
+
+    def __str__(self):
+        return 'Record %s: %s' % (self.record_n, self.message)
+
+    def as_dict(self):
+        """
+        Returns the violation as a dictionary.
+
+        :return: a dictionary with the violation values
+        """
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+
+class StreamValidator(object):
+    """
+    Validates the contents of a CWR file, reading the pieces of the
+    transmission as they are decoded.
+
+    The same validator can be used for several files, the violations are
+    cleared each time a new file begins.
+    """
+
+    def __init__(self, rules=None, share_tolerance=0.06, max_violations=100):
+        """
+        Constructs a StreamValidator.
+
+        Only a number of violations are kept for each rule, so invalid files
+        don't make the memory grow, but all of them are counted.
+
+        :param rules: rules to check, by default all of them
+        :param share_tolerance: amount the total of the shares can exceed 100
+        :param max_violations: maximum number of violations kept for each
+        rule
+        """
+        if rules is None:
+            rules = RULES
+        else:
+            for rule in rules:
+                if rule not in RULES:
+                    raise ValueError('Invalid rule: %s' % rule)
+
+        self._rules = frozenset(rules)
+        self._share_tolerance = share_tolerance
+        self._max_violations = max_violations
+
+        self._check_sequences = bool(self._rules &
+                                     set([TRANSACTION_SEQUENCE,
+                                          RECORD_SEQUENCE]))
+        self._check_shares = bool(self._rules & set([SHARE_RANGE,
+                                                     SHARE_TOTAL]))
+
+        self._handlers = {HEADER: self._header,
+                          GROUP_HEADER: self._group_header,
+                          TRANSACTION: self._transaction,
+                          GROUP_TRAILER: self._group_trailer,
+                          TRAILER: self._trailer}
+
+        self.reset()
+
+    @property
+    def rules(self):
+        """
+        Rules being checked.
+
+        :return: a frozenset with the rules
+        """
+        return self._rules
+
+    @property
+    def violations(self):
+        """
+        Violations found on the file, indexed by rule.
+
+        :return: a dictionary with the list of violations for each rule
+        """
+        return self._violations
+
+    @property
+    def counts(self):
+        """
+        Number of violations found on the file for each rule, including those
+        not kept.
+
+        :return: a dictionary with the number of violations for each rule
+        """
+        return self._counts
+
+    @property
+    def valid(self):
+        """
+        Indicates if no rule has been broken.
+
+        :return: True if no violation has been found, False otherwise
+        """
+        return not self._counts
+
+    def reset(self):
+        """
+        Clears the violations and counters, to begin with a new file.
+        """
+        self._violations = {}
+        self._counts = {}
+
+        # Records read, including the current piece
+        self._record_n = 0
+
+        self._groups = 0
+        self._transactions = 0
+
+        self._in_group = False
+        self._group_id = None
+        self._group_transactions = 0
+        self._group_records = 0
+        self._last_transaction_sequence_n = -1
+
+    def check(self, events):
+        """
+        Validates the pieces of a transmission while they are read.
+
+        The pieces are returned unchanged, so this can wrap the events of a
+        stream decoder.
+
+        :param events: iterable of (piece id, value) tuples
+        :return: a generator of the same (piece id, value) tuples
+        """
+        self.reset()
+
+        handlers = self._handlers
+        for piece, value in events:
+            handlers[piece](value)
+            yield piece, value
+
+    def feed(self, piece, value):
+        """
+        Validates a single piece of the transmission.
+
+        :param piece: id of the transmission piece
+        :param value: the model instances created from it
+        """
+        self._handlers[piece](value)
+
+    def _add(self, rule, message, record_n, transaction_n=None):
+        count = self._counts.get(rule, 0)
+        self._counts[rule] = count + 1
+
+        if count < self._max_violations:
+            if self._in_group:
+                group_n = self._groups - 1
+            else:
+                group_n = None
+            self._violations.setdefault(rule, []).append(
+                Violation(rule, message, record_n, group_n, transaction_n))
+
+    def _header(self, header):
+        self.reset()
+        self._record_n = 1
+
+    def _group_header(self, header):
+        self._record_n += 1
+        self._groups += 1
+
+        self._in_group = True
+        self._group_id = header.group_id
+        self._group_transactions = 0
+        self._group_records = 1
+
+        if GROUP_ID in self._rules and header.group_id != self._groups:
+            self._add(GROUP_ID, 'Group id %s should be %s' %
+                      (header.group_id, self._groups), self._record_n)
+
+    def _transaction(self, records):
+        first = self._record_n + 1
+        transaction_n = self._group_transactions
+
+        self._record_n += len(records)
+        self._transactions += 1
+        self._group_transactions += 1
+        self._group_records += len(records)
+
+        if self._check_sequences:
+            self._check_sequence(records, first, transaction_n)
+
+        if self._check_shares:
+            self._check_share(records, first, transaction_n)
+
+    def _check_sequence(self, records, first, transaction_n):
+        rules = self._rules
+        header = records[0]
+
+        transaction_sequence_n = header.transaction_sequence_n
+        if TRANSACTION_SEQUENCE in rules:
+            expected = self._transaction_sequence_n(transaction_n)
+            if transaction_sequence_n != expected:
+                self._add(TRANSACTION_SEQUENCE,
+                          'Transaction sequence number %s should be %s' %
+                          (transaction_sequence_n, expected), first,
+                          transaction_n)
+            self._last_transaction_sequence_n = transaction_sequence_n
+
+        expected = 0
+        for i, record in enumerate(records):
+            if TRANSACTION_SEQUENCE in rules and \
+                    record.transaction_sequence_n != transaction_sequence_n:
+                self._add(TRANSACTION_SEQUENCE,
+                          '%s transaction sequence number %s should be %s' %
+                          (record.record_type, record.transaction_sequence_n,
+                           transaction_sequence_n), first + i, transaction_n)
+
+            record_sequence_n = record.record_sequence_n
+            if RECORD_SEQUENCE in rules and record_sequence_n != expected:
+                self._add(RECORD_SEQUENCE,
+                          '%s record sequence number %s should be %s' %
+                          (record.record_type, record_sequence_n, expected),
+                          first + i, transaction_n)
+
+            # The sequence continues from the actual value, so a single
+            # error is reported only once
+            expected = record_sequence_n + 1
+
+    def _transaction_sequence_n(self, transaction_n):
+        if transaction_n == 0:
+            return 0
+        else:
+            return self._last_transaction_sequence_n + 1
+
+    def _check_share(self, records, first, transaction_n):
+        rules = self._rules
+
+        totals = None
+        for i, record in enumerate(records):
+            maximum_pr = _share_records.get(record.record_type)
+            if maximum_pr is None:
+                continue
+
+            if totals is None:
+                totals = [0.0, 0.0, 0.0]
+
+            for j, (right, attribute) in enumerate(_rights):
+                share = getattr(record, attribute)
+                if not share:
+                    continue
+
+                totals[j] += share
+
+                if SHARE_RANGE in rules:
+                    if j == 0:
+                        maximum = maximum_pr
+                    else:
+                        maximum = 100.0
+                    if share < 0 or share > maximum:
+                        self._add(SHARE_RANGE,
+                                  '%s %s ownership share %s should be '
+                                  'between 0 and %s' %
+                                  (record.record_type, right, share,
+                                   maximum), first + i, transaction_n)
+
+        if totals is not None and SHARE_TOTAL in rules:
+            for (right, _), total in zip(_rights, totals):
+                if total > 100.0 + self._share_tolerance:
+                    self._add(SHARE_TOTAL,
+                              'Total %s ownership share %s exceeds 100' %
+                              (right, round(total, 2)), first,
+                              transaction_n)
+
+    def _group_trailer(self, trailer):
+        self._record_n += 1
+        self._group_records += 1
+
+        rules = self._rules
+        record_n = self._record_n
+
+        if GROUP_ID in rules and trailer.group_id != self._group_id:
+            self._add(GROUP_ID, 'Group trailer id %s should be %s' %
+                      (trailer.group_id, self._group_id), record_n)
+
+        if GROUP_TRANSACTION_COUNT in rules and \
+                trailer.transaction_count != self._group_transactions:
+            self._add(GROUP_TRANSACTION_COUNT,
+                      'Group transaction count %s should be %s' %
+                      (trailer.transaction_count, self._group_transactions),
+                      record_n)
+
+        if GROUP_RECORD_COUNT in rules and \
+                trailer.record_count != self._group_records:
+            self._add(GROUP_RECORD_COUNT,
+                      'Group record count %s should be %s' %
+                      (trailer.record_count, self._group_records), record_n)
+
+        self._in_group = False
+
+    def _trailer(self, trailer):
+        self._record_n += 1
+
+        rules = self._rules
+        record_n = self._record_n
+
+        if TRANSMISSION_GROUP_COUNT in rules and \
+                trailer.group_count != self._groups:
+            self._add(TRANSMISSION_GROUP_COUNT,
+                      'Transmission group count %s should be %s' %
+                      (trailer.group_count, self._groups), record_n)
+
+        if TRANSMISSION_TRANSACTION_COUNT in rules and \
+                trailer.transaction_count != self._transactions:
+            self._add(TRANSMISSION_TRANSACTION_COUNT,
+                      'Transmission transaction count %s should be %s' %
+                      (trailer.transaction_count, self._transactions),
+                      record_n)
+
+        if TRANSMISSION_RECORD_COUNT in rules and \
+                trailer.record_count != self._record_n:
+            self._add(TRANSMISSION_RECORD_COUNT,
+                      'Transmission record count %s should be %s' %
+                      (trailer.record_count, self._record_n), record_n)
@@ -63,6 +63,8 @@ class BaseWorkRecord(TransactionRecord, metaclass=ABCMeta):
     which are the title, the language and the ISWC.
     """
 
+    __slots__ = ('_title', '_language_code', '_iswc')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -163,6 +165,17 @@ class WorkRecord(BaseWorkRecord):
     data of a single work, which mostly means it's title.
     """
 
+    __slots__ = ('_submitter_work_n', '_date_publication_printed_edition',
+                 '_copyright_date', '_copyright_number',
+                 '_text_music_relationship', '_music_arrangement',
+                 '_lyric_adaptation', '_composite_type',
+                 '_composite_component_count', '_duration', '_version_type',
+                 '_excerpt_type', '_opus_number',
+                 '_musical_work_distribution_category',
+                 '_grand_rights_indicator', '_recorded_indicator',
+                 '_exceptional_clause', '_catalogue_number', '_work_type',
+                 '_contact_id', '_contact_name', '_priority_flag')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -683,6 +696,12 @@ class ComponentRecord(TransactionRecord):
     Record will identify an individual component of such composite.
     """
 
+    __slots__ = ('_submitter_work_n', '_title', '_iswc', '_duration',
+                 '_writer_1_first_name', '_writer_1_last_name',
+                 '_writer_1_ipi_base_n', '_writer_1_ipi_name_n',
+                 '_writer_2_first_name', '_writer_2_last_name',
+                 '_writer_2_ipi_base_n', '_writer_2_ipi_name_n')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -972,6 +991,12 @@ class AuthoredWorkRecord(BaseWorkRecord):
     version.
     """
 
+    __slots__ = ('_submitter_work_n', '_source', '_writer_1_first_name',
+                 '_writer_1_last_name', '_writer_1_ipi_base_n',
+                 '_writer_1_ipi_name_n', '_writer_2_first_name',
+                 '_writer_2_last_name', '_writer_2_ipi_base_n',
+                 '_writer_2_ipi_name_n')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -1223,6 +1248,8 @@ class AlternateTitleRecord(TransactionRecord):
     Versions (VER) Record should be used.
     """
 
+    __slots__ = ('_alternate_title', '_title_type', '_language_code')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -1309,6 +1336,11 @@ class RecordingDetailRecord(TransactionRecord):
     work.
     """
 
+    __slots__ = ('_first_release_date', '_first_album_title',
+                 '_first_album_label', '_first_release_catalog_n', '_ean',
+                 '_isrc', '_recording_format', '_recording_technique',
+                 '_media_type', '_first_release_duration')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -1515,6 +1547,8 @@ class InstrumentationDetailRecord(TransactionRecord):
     serious works.
     """
 
+    __slots__ = ('_instrument_code', '_number_players')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -1578,6 +1612,11 @@ class WorkOriginRecord(TransactionRecord):
     Note that the cue sheet is always the final authority for usage data.
     """
 
+    __slots__ = ('_intended_purpose', '_production_title', '_cd_identifier',
+                 '_cut_number', '_library', '_bltvr', '_visan',
+                 '_production_n', '_episode_title', '_episode_n',
+                 '_year_production', '_audio_visual_key')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -1820,6 +1859,9 @@ class InstrumentationSummaryRecord(TransactionRecord):
     two wind quintets and two pianos.
     """
 
+    __slots__ = ('_number_voices', '_standard_instrumentation_type',
+                 '_instrumentation_description')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -1899,6 +1941,11 @@ class PerformingArtistRecord(TransactionRecord):
     public or on a recording.
     """
 
+    __slots__ = ('_performing_artist_first_name',
+                 '_performing_artist_last_name',
+                 '_performing_artist_ipi_name_n',
+                 '_performing_artist_ipi_base_n')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -97,4 +97,9 @@ setup(
     tests_require=_tests_require,
     extras_require={'test': _tests_require},
     cmdclass={'test': _ToxTester},
+    entry_points={
+        'console_scripts': [
+            'cwr-batch = cwr.utils.batch:main',
+        ],
+    },
 )
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+from cwr.utils.generator import default_file_generator
+
+"""
+Synthetic CWR files for the benchmarks.
+
+The files are created with the FileGenerator, using a fixed seed, so the same
+size always gives the same file, with the default mix of transaction types.
+
+The files are written line by line, so files of any size can be created.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Seed for the random values, so the results can be compared between runs
+corpus_seed = 1
+
+
+def corpus_lines(records):
+    """
+    Creates the lines of a CWR file with approximately the received number
+    of records.
+
+    :param records: number of records for the file
+    :return: a generator of lines, without line ends
+    """
+    return default_file_generator(corpus_seed).lines(records)
+
+
+def write_corpus(path, records):
+    """
+    Writes a CWR file with approximately the received number of records.
+
+    :param path: path for the file
+    :param records: number of records for the file
+    :return: the number of records written
+    """
+    with open(path, 'w', encoding='latin-1', newline='') as output:
+        return default_file_generator(corpus_seed).write(output, records)
+
+
+def corpus_file_name(sequence_n=1):
+    """
+    Returns a valid file name for the synthetic files.
+
+    :param sequence_n: sequence number for the file
+    :return: a CWR file name
+    """
+    return 'CW%02d%04dPB_SO.V21' % (sequence_n // 10000 % 100,
+                                    sequence_n % 10000)
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from cwr.parser.decoder.cwrjson import JSONDecoder
+from cwr.parser.decoder.dictionary import FileDictionaryDecoder
+from cwr.parser.decoder.file import default_file_automaton_decoder, \
+    default_file_decoder, default_file_stream_decoder, \
+    default_filename_decoder
+from cwr.parser.encoder.cwrjson import JSONEncoder
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from tests.benchmark.corpus import corpus_file_name, write_corpus
+
+"""
+Benchmarks for the CWR decoders and encoders.
+
+These measure:
+- The time taken to create each decoder
+- The filenames decoded per second
+- The records and megabytes decoded per second, for each file decoder
+- The time taken to encode and decode the files as dictionaries and JSON
+- The peak memory used while decoding, for each file decoder
+
+The files are created with the corpus module, for each of the sizes
+received.
+
+The results are stored on a JSON file, and can be compared with a baseline,
+which is just the results of a previous run. When any result is worse than
+the baseline by more than a threshold, it is reported as a regression and
+the script ends with an error.
+
+For example:
+python -m tests.benchmark.suite --sizes 1000 100000 --output results.json
+--baseline tests/benchmark/baseline.json --threshold 0.25
+--threshold-for memory=0.1
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# File decoders, by name
+decoders = {'automaton': default_file_automaton_decoder,
+            'stream': default_file_stream_decoder,
+            'grammar': default_file_decoder}
+
+# Maximum number of records for the slowest decoders
+default_limits = {'stream': 10000,
+                  'grammar': 10000}
+
+# Metrics where a lower value is better
+_lower_is_better = ('seconds', 'peak_bytes')
+
+# Stored baseline
+default_baseline = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def _measure(function, repeat=1):
+    """
+    Calls a function several times, returning the best time.
+
+    :param function: the function to measure
+    :param repeat: number of times to call it
+    :return: a tuple with the best time and the last result
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best, result
+
+
+def _peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def _environment():
+    return {'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def run_benchmarks(sizes, decoder_names=None, work_dir=None, repeat=1,
+                   limits=None, names=10000):
+    """
+    Runs the benchmarks.
+
+    The results are returned as a dictionary, with the environment where
+    they were run, and the results indexed by the benchmark name. Each result
+    is a dictionary with its metrics.
+
+    :param sizes: number of records for each file to decode
+    :param decoder_names: names of the file decoders to measure
+    :param work_dir: folder for the files created, a temporal one by default
+    :param repeat: number of times each benchmark is run, keeping the best
+    :param limits: maximum number of records for each decoder
+    :param names: number of filenames decoded
+    :return: a dictionary with the results
+    """
+    if decoder_names is None:
+        decoder_names = sorted(decoders)
+
+    if limits is None:
+        limits = default_limits
+
+    results = {}
+
+    for name in decoder_names:
+        seconds, _ = _measure(decoders[name], repeat)
+        results['startup.%s' % name] = {'seconds': seconds}
+
+    filename_decoder = default_filename_decoder()
+    file_names = [corpus_file_name(i) for i in range(names)]
+
+    seconds, _ = _measure(lambda: [filename_decoder.decode(file_name)
+                                   for file_name in file_names], repeat)
+    results['filename'] = {'seconds': seconds,
+                           'names_per_second': names / seconds}
+
+    remove_dir = work_dir is None
+    if remove_dir:
+        work_dir = tempfile.mkdtemp(prefix='cwr_benchmark')
+
+    try:
+        for size in sizes:
+            results.update(_run_size(size, decoder_names, work_dir, repeat,
+                                     limits))
+    finally:
+        if remove_dir:
+            shutil.rmtree(work_dir)
+
+    return {'environment': _environment(), 'results': results}
+
+
+def _run_size(size, decoder_names, work_dir, repeat, limits):
+    results = {}
+
+    path = os.path.join(work_dir, corpus_file_name(size))
+    records = write_corpus(path, size)
+    megabytes = os.path.getsize(path) / 1000000.0
+
+    data = {'path': path}
+
+    decoded = None
+    for name in decoder_names:
+        if name in limits and size > limits[name]:
+            continue
+
+        decoder = decoders[name]()
+        seconds, cwr_file = _measure(lambda: decoder.decode(data), repeat)
+        results['decode.%s.%s' % (name, size)] = {
+            'seconds': seconds,
+            'records_per_second': records / seconds,
+            'mb_per_second': megabytes / seconds}
+
+        peak = _peak_memory(lambda: decoder.decode(data))
+        results['memory.%s.%s' % (name, size)] = {'peak_bytes': peak}
+
+        if decoded is None:
+            decoded = cwr_file
+
+    if decoded is None:
+        return results
+
+    dict_encoder = FileDictionaryEncoder()
+    seconds, encoded = _measure(lambda: dict_encoder.encode(decoded), repeat)
+    results['encode.dict.%s' % size] = {'seconds': seconds}
+
+    dict_decoder = FileDictionaryDecoder()
+    seconds, _ = _measure(lambda: dict_decoder.decode(encoded), repeat)
+    results['decode.dict.%s' % size] = {'seconds': seconds}
+
+    json_encoder = JSONEncoder()
+    seconds, encoded = _measure(lambda: json_encoder.encode(decoded), repeat)
+    results['encode.json.%s' % size] = {
+        'seconds': seconds,
+        'mb_per_second': len(encoded) / 1000000.0 / seconds}
+
+    json_decoder = JSONDecoder()
+    seconds, _ = _measure(lambda: json_decoder.decode(encoded), repeat)
+    results['decode.json.%s' % size] = {
+        'seconds': seconds,
+        'mb_per_second': len(encoded) / 1000000.0 / seconds}
+
+    return results
+
+
+def _threshold(name, threshold, thresholds):
+    # The longest prefix of the benchmark name is used
+    best = None
+    for prefix in thresholds:
+        if name == prefix or name.startswith(prefix + '.'):
+            if best is None or len(prefix) > len(best):
+                best = prefix
+
+    if best is None:
+        return threshold
+    else:
+        return thresholds[best]
+
+
+def compare(results, baseline, threshold=0.2, thresholds=None):
+    """
+    Compares the results of the benchmarks with a baseline.
+
+    A result is a regression when it is worse than the baseline by more than
+    the threshold, which is a fraction of the baseline value. So a threshold
+    of 0.2 accepts times up to a 20% longer, or throughputs up to a 20%
+    lower.
+
+    Thresholds for specific benchmarks can be received, indexed by the
+    benchmark name or any prefix of it, such as 'decode' or
+    'decode.automaton'.
+
+    Benchmarks missing on any of the two results are ignored.
+
+    :param results: results of the benchmarks
+    :param baseline: results used as baseline
+    :param threshold: default threshold
+    :param thresholds: thresholds for specific benchmarks
+    :return: a list with the regressions found
+    """
+    if thresholds is None:
+        thresholds = {}
+
+    current = results['results']
+
+    regressions = []
+    for name, metrics in sorted(baseline['results'].items()):
+        if name not in current:
+            continue
+
+        allowed = _threshold(name, threshold, thresholds)
+
+        for metric, expected in sorted(metrics.items()):
+            value = current[name].get(metric)
+            if value is None or not expected:
+                continue
+
+            change = (value - expected) / float(expected)
+
+            if metric in _lower_is_better:
+                regression = change > allowed
+            else:
+                regression = -change > allowed
+
+            if regression:
+                regressions.append({'benchmark': name,
+                                    'metric': metric,
+                                    'baseline': expected,
+                                    'result': value,
+                                    'change': change})
+
+    return regressions
+
+
+def _parse_thresholds(values):
+    thresholds = {}
+    for value in values:
+        name, _, limit = value.partition('=')
+        thresholds[name] = float(limit)
+
+    return thresholds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Runs the CWR benchmarks, comparing them with a '
+                    'baseline.')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 100000, 1000000],
+                        help='number of records for each file')
+    parser.add_argument('--decoders', nargs='+', choices=sorted(decoders),
+                        default=sorted(decoders),
+                        help='file decoders to measure')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='times each benchmark is run')
+    parser.add_argument('--limit', action='append', default=[],
+                        metavar='DECODER=RECORDS',
+                        help='maximum records for a decoder')
+    parser.add_argument('--work-dir', help='folder for the files created')
+    parser.add_argument('--output', help='file where the results are stored')
+    parser.add_argument('--baseline', help='results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed regression, as a fraction')
+    parser.add_argument('--threshold-for', action='append', default=[],
+                        metavar='BENCHMARK=THRESHOLD',
+                        help='allowed regression for a benchmark')
+    args = parser.parse_args(argv)
+
+    limits = dict(default_limits)
+    for name, limit in _parse_thresholds(args.limit).items():
+        limits[name] = int(limit)
+
+    results = run_benchmarks(args.sizes, args.decoders, args.work_dir,
+                             args.repeat, limits)
+
+    for name, metrics in sorted(results['results'].items()):
+        print('%-30s %s' % (name, ', '.join(
+            '%s=%.4g' % item for item in sorted(metrics.items()))))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        regressions = compare(results, baseline, args.threshold,
+                              _parse_thresholds(args.threshold_for))
+
+        for regression in regressions:
+            print('Regression on %(benchmark)s %(metric)s: %(baseline).4g -> '
+                  '%(result).4g (%(change)+.1f%%)' %
+                  dict(regression, change=regression['change'] * 100))
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from cwr.parser.decoder.file import default_file_automaton_decoder
+from tests.benchmark.corpus import corpus_file_name, corpus_lines
+from tests.benchmark.suite import compare, run_benchmarks
+
+"""
+Tests for the benchmarks suite.
+
+The following cases are tested:
+- The synthetic files are valid, and have the expected number of records
+- The same size always gives the same file
+- The benchmarks return the results for each decoder and size, including
+the memory used
+- Results worse than the baseline are reported as regressions
+- The thresholds are chosen by the benchmark name
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _results(**results):
+    return {'results': results}
+
+
+class TestCorpus(unittest.TestCase):
+    def test_valid(self):
+        lines = list(corpus_lines(500))
+
+        decoder = default_file_automaton_decoder()
+        result = decoder.decode({'filename': corpus_file_name(),
+                                 'contents': lines})
+
+        transmission = result.transmission
+        trailer = transmission.trailer
+
+        self.assertEqual(len(lines), trailer.record_count)
+        self.assertEqual(len(transmission.groups), trailer.group_count)
+        self.assertEqual(sum(len(group.transactions)
+                             for group in transmission.groups),
+                         trailer.transaction_count)
+
+        for group in transmission.groups:
+            self.assertEqual(len(group.transactions),
+                             group.group_trailer.transaction_count)
+
+    def test_size(self):
+        lines = list(corpus_lines(10000))
+
+        self.assertTrue(abs(len(lines) - 10000) < 100)
+
+    def test_same_file(self):
+        self.assertEqual(list(corpus_lines(500)), list(corpus_lines(500)))
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    def test_results(self):
+        results = run_benchmarks([50], ['automaton', 'grammar'], names=10)
+
+        names = set(results['results'])
+
+        self.assertTrue('startup.automaton' in names)
+        self.assertTrue('filename' in names)
+        self.assertTrue('decode.automaton.50' in names)
+        self.assertTrue('decode.grammar.50' in names)
+        self.assertTrue('memory.automaton.50' in names)
+        self.assertTrue('memory.grammar.50' in names)
+        self.assertTrue('encode.json.50' in names)
+        self.assertTrue('decode.json.50' in names)
+
+        decode = results['results']['decode.automaton.50']
+        self.assertTrue(decode['records_per_second'] > 0)
+        self.assertTrue(decode['mb_per_second'] > 0)
+
+    def test_limits(self):
+        results = run_benchmarks([50], ['grammar'], limits={'grammar': 10},
+                                 names=10)
+
+        self.assertFalse('decode.grammar.50' in results['results'])
+
+
+class TestCompare(unittest.TestCase):
+    def test_no_regression(self):
+        baseline = _results(a={'seconds': 1.0, 'mb_per_second': 10.0})
+        results = _results(a={'seconds': 1.1, 'mb_per_second': 9.0})
+
+        self.assertEqual([], compare(results, baseline, 0.2))
+
+    def test_slower(self):
+        baseline = _results(a={'seconds': 1.0})
+        results = _results(a={'seconds': 1.5})
+
+        regressions = compare(results, baseline, 0.2)
+
+        self.assertEqual(1, len(regressions))
+        self.assertEqual('a', regressions[0]['benchmark'])
+        self.assertEqual('seconds', regressions[0]['metric'])
+        self.assertAlmostEqual(0.5, regressions[0]['change'])
+
+    def test_lower_throughput(self):
+        baseline = _results(a={'records_per_second': 100.0})
+        results = _results(a={'records_per_second': 50.0})
+
+        self.assertEqual(1, len(compare(results, baseline, 0.2)))
+
+    def test_faster(self):
+        baseline = _results(a={'seconds': 1.0, 'peak_bytes': 100})
+        results = _results(a={'seconds': 0.1, 'peak_bytes': 10})
+
+        self.assertEqual([], compare(results, baseline, 0.2))
+
+    def test_missing(self):
+        baseline = _results(a={'seconds': 1.0})
+        results = _results(b={'seconds': 5.0})
+
+        self.assertEqual([], compare(results, baseline, 0.2))
+
+    def test_thresholds(self):
+        baseline = _results(**{'decode.grammar.10': {'seconds': 1.0},
+                               'decode.automaton.10': {'seconds': 1.0}})
+        results = _results(**{'decode.grammar.10': {'seconds': 1.5},
+                              'decode.automaton.10': {'seconds': 1.5}})
+
+        regressions = compare(results, baseline, 0.2,
+                              {'decode': 1.0, 'decode.automaton': 0.1})
+
+        self.assertEqual(['decode.automaton.10'],
+                         [r['benchmark'] for r in regressions])
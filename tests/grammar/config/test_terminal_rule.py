@@ -2,7 +2,7 @@
 
 import unittest
 
-from cwr.grammar.factory.config import rule_terminal
+from cwr.grammar.factory.config import rule_options_list, rule_terminal
 
 __author__ = 'Bernardo Martínez Garrido'
 __license__ = 'MIT'
@@ -58,3 +58,13 @@ class TestConfigTerminalRule(unittest.TestCase):
 
         self.assertEqual('compulsory', result.rule_options[0])
         self.assertEqual('optional', result.rule_options[1])
+
+    def test_options_list(self):
+        result = self._rule.parseString('field: header (compulsory)')
+
+        self.assertEqual(['compulsory'], rule_options_list(result))
+
+    def test_options_list_not_options(self):
+        result = self._rule.parseString('field: header')
+
+        self.assertEqual([], rule_options_list(result))
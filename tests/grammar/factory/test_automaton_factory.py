@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from cwr.parser.decoder.file import default_automaton_factory
+
+"""
+Tests for the automatons created from the transactions configuration.
+
+The following cases are tested:
+- Valid sequences of record types are accepted
+- Invalid sequences of record types are rejected
+- The rules are returned in the same order the grammar would try them
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+_factory = default_automaton_factory()
+
+
+class TestAutomatonValid(unittest.TestCase):
+    def test_agreement_transaction(self):
+        automaton = _factory.get_rule('agreement_transaction')
+
+        result = automaton.match(['AGR', 'TER', 'IPA', 'IPA'])
+
+        self.assertEqual([['agreement'], ['territory_in_agreement'],
+                          ['interested_party_agreement'],
+                          ['interested_party_agreement']], result)
+
+    def test_agreement_transaction_repeated(self):
+        automaton = _factory.get_rule('agreement_transaction')
+
+        result = automaton.match(['AGR', 'TER', 'TER', 'IPA', 'NPA', 'IPA',
+                                  'TER', 'IPA', 'IPA', 'NPA'])
+
+        self.assertEqual(10, len(result))
+
+    def test_work_transaction(self):
+        automaton = _factory.get_rule('work_transaction')
+
+        result = automaton.match(['NWR', 'SPU', 'SPU', 'SPT', 'SWR', 'SWT',
+                                  'PWR', 'PER', 'REC'])
+
+        self.assertEqual(['work'], result[0])
+        self.assertEqual(['publisher'], result[1])
+        self.assertEqual(['recording_detail'], result[-1])
+
+    def test_work_only(self):
+        automaton = _factory.get_rule('work_transaction')
+
+        self.assertEqual([['work']], automaton.match(['NWR']))
+
+    def test_acknowledgement_transaction(self):
+        automaton = _factory.get_rule('acknowledgement_transaction')
+
+        result = automaton.match(['ACK', 'MSG', 'MSG', 'NWR', 'EXC'])
+
+        self.assertEqual(['acknowledgement'], result[0])
+        self.assertEqual(['work_conflict'], result[-1])
+
+    def test_option(self):
+        automaton = _factory.get_rule('group_trailer_base') | \
+                    _factory.get_rule('group_trailer_short')
+
+        result = automaton.match(['GRT'])
+
+        self.assertEqual([['group_trailer_base', 'group_trailer_short']],
+                         result)
+
+    def test_same_instance(self):
+        self.assertTrue(_factory.get_rule('work_transaction') is
+                        _factory.get_rule('work_transaction'))
+
+
+class TestAutomatonInvalid(unittest.TestCase):
+    def test_empty(self):
+        automaton = _factory.get_rule('agreement_transaction')
+
+        self.assertEqual(None, automaton.match([]))
+
+    def test_missing_territory(self):
+        automaton = _factory.get_rule('agreement_transaction')
+
+        self.assertEqual(None, automaton.match(['AGR', 'IPA', 'IPA']))
+
+    def test_missing_assignee(self):
+        automaton = _factory.get_rule('agreement_transaction')
+
+        self.assertEqual(None, automaton.match(['AGR', 'TER', 'IPA']))
+
+    def test_wrong_order(self):
+        automaton = _factory.get_rule('work_transaction')
+
+        self.assertEqual(None, automaton.match(['NWR', 'REC', 'SPU']))
+
+    def test_unknown_record(self):
+        automaton = _factory.get_rule('work_transaction')
+
+        self.assertEqual([], automaton.step(automaton.start, 'XXX'))
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from cwr.grammar.factory.cache import CachedLayoutFactory, config_hash, \
+    model_hash
+from cwr.parser.decoder.file import default_layout_factory, \
+    default_record_decoder
+from tests.parser.file.decoder.test_fixed import _agreement
+
+"""
+Tests for the CachedLayoutFactory.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestCachedLayoutFactory(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_cold(self):
+        factory = CachedLayoutFactory(self._directory, default_layout_factory)
+
+        layout = factory.get_rule('agreement')
+
+        self.assertEqual([121], layout.lengths())
+        self.assertFalse(factory.loaded)
+        self.assertTrue(os.path.isfile(factory.path))
+
+    def test_warm(self):
+        CachedLayoutFactory(self._directory,
+                            default_layout_factory).get_layouts()
+
+        factory = CachedLayoutFactory(self._directory, default_layout_factory)
+
+        layouts = factory.get_layouts()
+
+        self.assertTrue(factory.loaded)
+        self.assertEqual(len(default_layout_factory().get_layouts()),
+                         len(layouts))
+        self.assertEqual([121], factory.get_rule('agreement').lengths())
+
+    def test_key(self):
+        CachedLayoutFactory(self._directory, default_layout_factory,
+                            key='a').get_layouts()
+
+        factory = CachedLayoutFactory(self._directory, default_layout_factory,
+                                      key='b')
+        factory.get_layouts()
+
+        self.assertFalse(factory.loaded)
+
+    def test_corrupt_cache(self):
+        factory = CachedLayoutFactory(self._directory, default_layout_factory)
+
+        with open(factory.path, 'wb') as cache_file:
+            cache_file.write(b'corrupt')
+
+        factory.get_layouts()
+
+        self.assertFalse(factory.loaded)
+
+    def test_decoder(self):
+        default_record_decoder(cache_dir=self._directory)
+        decoder = default_record_decoder(cache_dir=self._directory)
+
+        result = decoder.decode(_agreement)
+
+        self.assertEqual('AGR', result.record_type)
+
+    def test_config_hash(self):
+        self.assertEqual(config_hash(), config_hash())
+
+    def test_model_hash(self):
+        self.assertEqual(model_hash(), model_hash())
+        self.assertNotEqual(config_hash(), model_hash())
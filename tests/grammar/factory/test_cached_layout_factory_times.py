@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import shutil
+import tempfile
+import time
+import unittest
+
+from cwr.grammar.factory.cache import CachedLayoutFactory
+from cwr.parser.decoder.file import default_layout_factory
+
+"""
+Compares the startup times of the layouts with and without a cache.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestCachedLayoutFactoryTimes(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_cold_warm(self):
+        start = time.perf_counter()
+        CachedLayoutFactory(self._directory,
+                            default_layout_factory).get_layouts()
+        end = time.perf_counter()
+
+        time_cold = (end - start)
+
+        start = time.perf_counter()
+        CachedLayoutFactory(self._directory,
+                            default_layout_factory).get_layouts()
+        end = time.perf_counter()
+
+        time_warm = (end - start)
+
+        self.assertTrue(time_warm < time_cold)
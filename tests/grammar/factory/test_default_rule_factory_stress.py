@@ -35,9 +35,9 @@ class TestDefaultRuleFactory(unittest.TestCase):
                 elif len(record) > 0:
                     record = record + '\n' + _agreement_full()
 
-        start = time.clock()
+        start = time.perf_counter()
         grammar.parseString(record)
-        end = time.clock()
+        end = time.perf_counter()
 
         time_parse = (end - start)
 
@@ -19,14 +19,14 @@ class TestDefaultRuleFactory(unittest.TestCase):
         self._factory = default_grammar_factory()
 
     def test_10000(self):
-        start = time.clock()
+        start = time.perf_counter()
         if sys.version_info[0] == 2:
             for x in range(10000):
                 self._factory.get_rule('transmission')
         else:
             for x in range(10000):
                 self._factory.get_rule('transmission')
-        end = time.clock()
+        end = time.perf_counter()
 
         time_parse = (end - start)
 
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from cwr.parser.decoder.file import default_layout_factory
+
+"""
+Tests for the RecordLayoutFactory.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestRecordLayoutFactory(unittest.TestCase):
+    def setUp(self):
+        self._factory = default_layout_factory()
+
+    def test_record(self):
+        layout = self._factory.get_rule('agreement')
+
+        self.assertEqual(['AGR'], layout.heads)
+        self.assertEqual('transaction_record', layout.rule_type)
+        self.assertEqual([121], layout.lengths())
+
+    def test_prefix(self):
+        fields = self._factory.get_rule('agreement').variants[0]
+
+        self.assertEqual('record_type', fields[0].field_id)
+        self.assertEqual(0, fields[0].position)
+        self.assertEqual(3, fields[0].columns)
+        self.assertEqual('transaction_sequence_n', fields[1].field_id)
+        self.assertEqual(3, fields[1].position)
+        self.assertEqual('record_sequence_n', fields[2].field_id)
+        self.assertEqual(11, fields[2].position)
+
+    def test_several_heads(self):
+        layout = self._factory.get_rule('work')
+
+        self.assertEqual(['NWR', 'REV', 'ISW'], layout.heads)
+
+    def test_optional(self):
+        layout = self._factory.get_rule('transmission_header')
+
+        self.assertEqual([101, 86], layout.lengths())
+
+    def test_sizes(self):
+        cases = (('acknowledgement', 'creation_date_time', 14),
+                 ('message', 'message_type', 1),
+                 ('message', 'message_level', 1),
+                 ('component', 'component_duration', 6))
+
+        for rule_id, field_id, columns in cases:
+            fields = self._factory.get_rule(rule_id).variants[0]
+            field = [field for field in fields if field.field_id == field_id]
+
+            self.assertEqual(columns, field[0].columns)
+
+    def test_field(self):
+        layout = self._factory.get_rule('group_header')
+
+        field = layout.field(3)
+
+        self.assertEqual('transaction_type', field.field_id)
+        self.assertEqual(None, layout.field(1000))
+
+    def test_same_instance(self):
+        layout = self._factory.get_rule('agreement')
+
+        self.assertTrue(layout is self._factory.get_rule('agreement'))
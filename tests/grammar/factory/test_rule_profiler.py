@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.grammar.factory.profile import RuleProfiler
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_grammar_factory
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from tests.parser.file.decoder.test_file import _two_groups
+from tests.parser.file.decoder.test_fixed import _agreement
+
+"""
+Tests for the rules profiler.
+
+The following cases are tested:
+- Records are counted by rule id and by record type
+- Fields are counted by record type and field id
+- Failed attempts are counted
+- Optional fields are counted only once
+- Profiled files are decoded the same as without the profiler
+- The statistics can be reset
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestRuleProfilerRecord(unittest.TestCase):
+    def setUp(self):
+        self._profiler = RuleProfiler()
+        factory = default_grammar_factory(self._profiler)
+        self._grammar = factory.get_rule('agreement')
+
+    def test_record(self):
+        self._grammar.parseString(_agreement)
+
+        report = self._profiler.report()
+
+        stats = report['records']['AGR']
+        self.assertEqual(1, stats['calls'])
+        self.assertEqual(1, stats['successes'])
+        self.assertEqual(0, stats['failures'])
+        # The line end is included
+        self.assertTrue(stats['chars'] >= len(_agreement))
+        self.assertTrue(stats['time'] > 0)
+
+        self.assertEqual(stats, report['rules']['agreement'])
+
+    def test_fields(self):
+        self._grammar.parseString(_agreement)
+
+        fields = self._profiler.report()['fields']['AGR']
+
+        self.assertEqual({'calls': 1, 'successes': 1, 'failures': 0,
+                          'chars': 8},
+                         _without_time(fields['agreement_start_date']))
+        self.assertEqual(14, fields['submitter_agreement_n']['chars'])
+
+    def test_failure(self):
+        record = _agreement[:60] + 'XXXXXXXX' + _agreement[68:]
+
+        self.assertRaises(ParseException, self._grammar.parseString, record)
+
+        report = self._profiler.report()
+
+        self.assertEqual(1, report['records']['AGR']['failures'])
+        self.assertEqual(1, report['fields']['AGR']['agreement_end_date'][
+            'failures'])
+
+    def test_repeated(self):
+        for _ in range(3):
+            self._grammar.parseString(_agreement)
+
+        report = self._profiler.report()
+
+        self.assertEqual(3, report['records']['AGR']['calls'])
+        self.assertEqual(3, report['fields']['AGR']['agreement_end_date'][
+            'calls'])
+
+    def test_top(self):
+        self._grammar.parseString(_agreement)
+
+        top = self._profiler.top(3)
+
+        self.assertEqual(3, len(top))
+        self.assertEqual('AGR', top[0][0])
+        self.assertTrue(top[0][2]['time'] >= top[1][2]['time'])
+
+    def test_reset(self):
+        self._grammar.parseString(_agreement)
+        self._profiler.reset()
+
+        self.assertEqual({'rules': {}, 'records': {}, 'fields': {}},
+                         self._profiler.report())
+
+        self._grammar.parseString(_agreement)
+
+        self.assertEqual(1, self._profiler.report()['records']['AGR'][
+            'calls'])
+
+
+class TestRuleProfilerFile(unittest.TestCase):
+    def test_same_result(self):
+        data = {'filename': 'CW12012311_22.V21', 'contents': _two_groups()}
+        encoder = FileDictionaryEncoder()
+
+        expected = encoder.encode(default_file_decoder().decode(data))
+
+        profiler = RuleProfiler()
+        result = encoder.encode(
+            default_file_decoder(profiler=profiler).decode(data))
+
+        self.assertEqual(expected, result)
+
+        report = profiler.report()
+
+        self.assertEqual(1, report['rules']['transmission']['successes'])
+        self.assertTrue(report['rules']['transmission']['chars'] >=
+                        len(_two_groups()))
+        self.assertEqual(2, report['records']['NWR']['successes'])
+        self.assertEqual(4, report['records']['IPA']['successes'])
+        self.assertTrue('NWR' in report['fields'])
+
+
+def _without_time(stats):
+    result = dict(stats)
+    del result['time']
+    return result
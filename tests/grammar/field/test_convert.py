@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import datetime
+import unittest
+
+from cwr.grammar.field import convert
+from cwr.grammar.field.convert import InternCache
+
+"""
+Tests for the fields converters.
+
+The following cases are tested:
+- Dates, times and dates with times are created from the CWR and ISO formats
+- Repeated values return the same instance
+- Invalid values raise a ValueError
+- Floats are created from digits
+- Lists of values are converted
+- The intern cache is bounded
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestConvertDate(unittest.TestCase):
+    def test_cwr(self):
+        self.assertEqual(datetime.date(2003, 2, 16),
+                         convert.to_date('20030216'))
+
+    def test_iso(self):
+        self.assertEqual(datetime.date(2003, 2, 16),
+                         convert.to_date('2003-02-16'))
+
+    def test_interned(self):
+        self.assertTrue(convert.to_date('20030216') is
+                        convert.to_date('20030216'))
+
+    def test_same_as_strptime(self):
+        date = datetime.date(2000, 1, 1)
+        for _ in range(400):
+            text = date.strftime('%Y%m%d')
+            self.assertEqual(
+                datetime.datetime.strptime(text, '%Y%m%d').date(),
+                convert.to_date(text))
+            date += datetime.timedelta(days=1)
+
+    def test_invalid_day(self):
+        self.assertRaises(ValueError, convert.to_date, '20030230')
+
+    def test_invalid_month(self):
+        self.assertRaises(ValueError, convert.to_date, '20031301')
+
+    def test_invalid_letters(self):
+        self.assertRaises(ValueError, convert.to_date, '2003AB16')
+
+    def test_invalid_spaces(self):
+        self.assertRaises(ValueError, convert.to_date, ' 2003021')
+
+    def test_invalid_length(self):
+        self.assertRaises(ValueError, convert.to_date, '200302161')
+
+
+class TestConvertTime(unittest.TestCase):
+    def test_cwr(self):
+        self.assertEqual(datetime.time(1, 12, 0), convert.to_time('011200'))
+
+    def test_iso(self):
+        self.assertEqual(datetime.time(1, 12, 0), convert.to_time('01:12:00'))
+
+    def test_interned(self):
+        self.assertTrue(convert.to_time('011200') is
+                        convert.to_time('011200'))
+
+    def test_invalid_hour(self):
+        self.assertRaises(ValueError, convert.to_time, '241200')
+
+    def test_invalid_letters(self):
+        self.assertRaises(ValueError, convert.to_time, '01AB00')
+
+
+class TestConvertDateTime(unittest.TestCase):
+    def test_cwr(self):
+        self.assertEqual(datetime.datetime(2003, 2, 16, 1, 12, 0),
+                         convert.to_date_time('20030216011200'))
+
+    def test_iso(self):
+        self.assertEqual(datetime.datetime(2003, 2, 16, 1, 12, 0),
+                         convert.to_date_time('2003-02-16T01:12:00'))
+
+    def test_iso_date(self):
+        self.assertEqual(datetime.datetime(2003, 2, 16),
+                         convert.to_date_time('2003-02-16'))
+
+    def test_combine(self):
+        date = datetime.date(2003, 2, 16)
+        time = datetime.time(1, 12, 0)
+
+        self.assertEqual(datetime.datetime(2003, 2, 16, 1, 12, 0),
+                         convert.combine_date_time(date, time))
+        self.assertTrue(convert.combine_date_time(date, time) is
+                        convert.combine_date_time(date, time))
+
+    def test_combine_cache(self):
+        date = datetime.date(2003, 2, 16)
+        time = datetime.time(1, 12, 0)
+
+        convert.combine_date_time(date, time)
+
+        self.assertIsNone(convert.date_times.get((date, time)))
+        self.assertIsNotNone(convert.combined_date_times.get((date, time)))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, convert.to_date_time, '2003021601120')
+
+
+class TestConvertNumericFloat(unittest.TestCase):
+    def test_decimals(self):
+        self.assertEqual(123.45, convert.to_numeric_float('12345', 3))
+
+    def test_same_as_string(self):
+        for number in range(0, 100000, 7):
+            text = '%05d' % number
+            self.assertEqual(float(text[:3] + '.' + text[3:]),
+                             convert.to_numeric_float(text, 3))
+
+    def test_no_decimals(self):
+        self.assertEqual(12345.0, convert.to_numeric_float('12345', 5))
+
+    def test_only_decimals(self):
+        self.assertEqual(0.5, convert.to_numeric_float('5', 0))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, convert.to_numeric_float, '12A45', 3)
+
+
+class TestConvertBatch(unittest.TestCase):
+    def test_dates(self):
+        result = convert.to_dates(['20030216', '20030217', '20030216'])
+
+        self.assertEqual([datetime.date(2003, 2, 16),
+                          datetime.date(2003, 2, 17),
+                          datetime.date(2003, 2, 16)], result)
+        self.assertTrue(result[0] is result[2])
+
+    def test_interned_after_clear(self):
+        convert.dates.clear()
+        result = convert.to_dates(['20030216', '20030216'])
+        convert.dates.clear()
+
+        self.assertTrue(result[0] is result[1])
+
+    def test_times(self):
+        self.assertEqual([datetime.time(1, 12, 0), datetime.time(0, 3, 0)],
+                         convert.to_times(['011200', '000300']))
+
+    def test_date_times(self):
+        self.assertEqual([datetime.datetime(2003, 2, 16, 1, 12, 0)],
+                         convert.to_date_times(['20030216011200']))
+
+    def test_missing(self):
+        self.assertEqual([None, datetime.date(2003, 2, 16)],
+                         convert.to_dates([None, '20030216']))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, convert.to_dates,
+                          ['20030216', '20030230'])
+
+
+class TestInternCache(unittest.TestCase):
+    def test_put(self):
+        cache = InternCache(2)
+        cache.put('a', 1)
+
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(None, cache.get('b'))
+
+    def test_bounded(self):
+        cache = InternCache(2)
+        for i in range(10):
+            cache.put(i, i)
+
+        self.assertTrue(len(cache) <= 2)
+        self.assertEqual(9, cache.get(9))
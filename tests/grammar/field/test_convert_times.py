@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import datetime
+import unittest
+import time
+
+from cwr.grammar.field import basic, convert
+from cwr.parser.decoder.file import default_record_decoder
+from tests.parser.file.decoder.test_fixed import _agreement
+
+"""
+Compares the times of the date converters with those of parsing the dates with
+strptime, and checks the times of the fields using them.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _dates(count):
+    start = datetime.date(2003, 1, 1)
+    return [(start + datetime.timedelta(days=i % 60)).strftime('%Y%m%d')
+            for i in range(count)]
+
+
+class TestConvertTimes(unittest.TestCase):
+    def test_dates(self):
+        texts = _dates(5000)
+
+        start = time.perf_counter()
+        for text in texts:
+            convert.to_date(text)
+        time_convert = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for text in texts:
+            datetime.datetime.strptime(text, '%Y%m%d').date()
+        time_strptime = time.perf_counter() - start
+
+        self.assertTrue(time_convert < time_strptime)
+
+    def test_date_field(self):
+        field = basic.date()
+
+        start = time.perf_counter()
+        for text in _dates(5000):
+            field.parseString(text)
+        end = time.perf_counter()
+
+        self.assertTrue(end - start < 5)
+
+    def test_agreement_records(self):
+        decoder = default_record_decoder()
+
+        records = [_agreement.replace('20120102', date)
+                   for date in _dates(2000)]
+
+        start = time.perf_counter()
+        for record in records:
+            decoder.decode(record)
+        end = time.perf_counter()
+
+        self.assertTrue(end - start < 5)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import unittest
+import time
+
+import pyparsing as pp
+
+from cwr.grammar.field import basic
+from data_cwr.accessor import CWRTables
+from tests.utils.grammar import get_record_grammar
+
+"""
+Compares the times of the lookup fields and the Pyparsing alternations on the
+biggest tables, and on territory records.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _time(rule, texts):
+    start = time.perf_counter()
+    for text in texts:
+        rule.parseString(text)
+    end = time.perf_counter()
+
+    return end - start
+
+
+class TestLookupTimes(unittest.TestCase):
+    def setUp(self):
+        self._tables = CWRTables()
+
+    def _assert_faster(self, table_id):
+        values = self._tables.get_data(table_id)
+        texts = values * (2000 // len(values) + 1)
+
+        # The alternation is given the same parse action as the lookup field
+        alternation = pp.oneOf(values).leaveWhitespace()
+        alternation.setParseAction(lambda s: s[0].strip())
+
+        time_alternation = _time(alternation, texts)
+        time_lookup = _time(basic.lookup(values), texts)
+
+        self.assertTrue(time_lookup < time_alternation)
+
+    def test_tis_code(self):
+        self._assert_faster('tis_code')
+
+    def test_society_code(self):
+        self._assert_faster('society_code')
+
+    def test_territory_records(self):
+        grammar = get_record_grammar('publisher_territory')
+        codes = self._tables.get_data('tis_code')
+
+        records = ['SPT000001790000054770             013330133301333I%sY001'
+                   % code for code in codes] * 10
+
+        start = time.perf_counter()
+        for record in records:
+            grammar.parseString(record)
+        end = time.perf_counter()
+
+        self.assertTrue(end - start < 5)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from cwr.grammar.field import basic
+from cwr.grammar.field.lookup import LookupValues, lookup_values
+
+"""
+Tests for the sets of values used to validate Lookup (L) fields.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestLookupValues(unittest.TestCase):
+    def setUp(self):
+        self.values = LookupValues(['A', 'AB', 'ABC', 'XY', 'E '])
+
+    def test_widths(self):
+        self.assertEqual((3, 2, 1), self.values.widths)
+
+    def test_contains(self):
+        self.assertTrue('AB' in self.values)
+        self.assertTrue('E ' in self.values)
+        self.assertFalse('B' in self.values)
+        self.assertFalse('ABCD' in self.values)
+
+    def test_match_longest(self):
+        self.assertEqual('ABC', self.values.match('ABCD'))
+        self.assertEqual('AB', self.values.match('ABX'))
+        self.assertEqual('A', self.values.match('AX'))
+
+    def test_match_position(self):
+        self.assertEqual('XY', self.values.match('000XY000', 3))
+
+    def test_match_whitespaces(self):
+        self.assertEqual('E ', self.values.match('E 12'))
+
+    def test_match_none(self):
+        self.assertEqual(None, self.values.match('ZZZ'))
+        self.assertEqual(None, self.values.match(''))
+
+    def test_shared(self):
+        self.assertTrue(lookup_values(['AB1', 'CD2']) is
+                        lookup_values(['AB1', 'CD2']))
+
+    def test_string(self):
+        values = lookup_values('AB1 CD2')
+
+        self.assertTrue('AB1' in values)
+        self.assertTrue('CD2' in values)
+
+
+class TestLookupLongest(unittest.TestCase):
+    """
+    Tests that the lookup field accepts the longest value, as the Pyparsing
+    alternation did.
+    """
+
+    def setUp(self):
+        self.lookup = basic.lookup(['A', 'AB', 'ABC'])
+
+    def test_longest(self):
+        result = self.lookup.parseString('ABC')
+        self.assertEqual('ABC', result[0])
+
+    def test_shorter(self):
+        result = self.lookup.parseString('AB')
+        self.assertEqual('AB', result[0])
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import tracemalloc
+import unittest
+
+from cwr.agreement import AgreementRecord
+from cwr.interested_party import Publisher, PublisherRecord
+from cwr.work import WorkRecord
+
+"""
+Memory used by the model classes.
+
+The records use slots for their attributes, which is compared with the memory
+used by subclasses of them which recover the instance dictionary, as the
+records had before.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class _WorkRecordDict(WorkRecord):
+    pass
+
+
+class _AgreementRecordDict(AgreementRecord):
+    pass
+
+
+class _PublisherRecordDict(PublisherRecord):
+    pass
+
+
+def _bytes_per_record(factory, count=2000):
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        records = [factory(i) for i in range(count)]
+        end = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    del records
+
+    return (end - start) / count
+
+
+def _work(record_class):
+    return lambda i: record_class(record_type='NWR',
+                                  transaction_sequence_n=i,
+                                  record_sequence_n=0,
+                                  submitter_work_n='WORK',
+                                  title='TITLE')
+
+
+def _agreement(record_class):
+    return lambda i: record_class(record_type='AGR',
+                                  transaction_sequence_n=i,
+                                  record_sequence_n=0,
+                                  submitter_agreement_n='AGREEMENT',
+                                  agreement_type='OS')
+
+
+def _publisher(record_class):
+    return lambda i: record_class(record_type='SPU',
+                                  transaction_sequence_n=i,
+                                  record_sequence_n=1,
+                                  publisher=Publisher(ip_n='IP',
+                                                      publisher_name='NAME'))
+
+
+class TestRecordMemory(unittest.TestCase):
+    def test_no_dictionary(self):
+        self.assertFalse(hasattr(WorkRecord(), '__dict__'))
+        self.assertFalse(hasattr(AgreementRecord(), '__dict__'))
+        self.assertFalse(hasattr(PublisherRecord(), '__dict__'))
+        self.assertFalse(hasattr(Publisher(), '__dict__'))
+
+    def test_work(self):
+        slots = _bytes_per_record(_work(WorkRecord))
+        dictionary = _bytes_per_record(_work(_WorkRecordDict))
+
+        self.assertTrue(slots < dictionary)
+
+    def test_agreement(self):
+        slots = _bytes_per_record(_agreement(AgreementRecord))
+        dictionary = _bytes_per_record(_agreement(_AgreementRecordDict))
+
+        self.assertTrue(slots < dictionary)
+
+    def test_publisher(self):
+        slots = _bytes_per_record(_publisher(PublisherRecord))
+        dictionary = _bytes_per_record(_publisher(_PublisherRecordDict))
+
+        self.assertTrue(slots < dictionary)
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import datetime
 import unittest
 
 from cwr.parser.decoder.cwrjson import JSONDecoder
@@ -49,3 +50,7 @@ class TestFileJSONDecoding(unittest.TestCase):
         self.assertEqual(2, len(transactions))
 
         self.assertEqual('AGR', transactions[0][0].record_type)
+        self.assertEqual(datetime.date(2003, 2, 15),
+                         transactions[0][0].agreement_start_date)
+        self.assertEqual(datetime.datetime(2003, 2, 16),
+                         transmission.header.creation_date_time)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+
+from cwr.parser.decoder.cwrjson import JSONLinesDecoder
+from cwr.parser.encoder.cwrjson import JSONLinesEncoder
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from tests.parser.cwrjson.encoder.test_json_stream import _file
+
+"""
+JSON Lines decoding tests.
+
+The following cases are tested:
+- Files encoded into JSON Lines are decoded back into the same file
+- Transactions are returned lazily
+- Invalid lines are rejected
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestFileJSONLinesDecode(unittest.TestCase):
+    def setUp(self):
+        self._decoder = JSONLinesDecoder()
+        self._encoder = JSONLinesEncoder()
+
+    def test_round_trip(self):
+        data = _file()
+        encoder = FileDictionaryEncoder()
+
+        result = self._decoder.decode(self._encoder.encode(data))
+
+        expected = encoder.encode(data)
+        result = encoder.encode(result)
+
+        # Dates are kept as ISO strings, as on the JSONDecoder
+        self.assertEqual(expected['tag'], result['tag'])
+        self.assertEqual(len(expected['transmission']['groups']),
+                         len(result['transmission']['groups']))
+        self.assertEqual(
+            expected['transmission']['groups'][1]['transactions'][0][2],
+            result['transmission']['groups'][1]['transactions'][0][2])
+
+    def test_stream(self):
+        result = self._decoder.decode(
+            io.StringIO(self._encoder.encode(_file())))
+
+        self.assertEqual(2, len(result.transmission.groups))
+        self.assertEqual('11', result.tag.sender)
+
+    def test_no_tag(self):
+        lines = self._encoder.encode(_file()).splitlines()[1:]
+
+        result = self._decoder.decode(lines)
+
+        self.assertEqual(None, result.tag)
+
+    def test_transactions_lazy(self):
+        lines = iter(self._encoder.encode(_file()).splitlines())
+
+        transactions = self._decoder.transactions(lines)
+
+        transaction = next(transactions)
+
+        self.assertEqual('AGR', transaction[0].record_type)
+        # Only the lines up to the first transaction have been read
+        self.assertEqual('transaction', next(lines)[2:13])
+
+    def test_transactions(self):
+        lines = self._encoder.encode(_file()).splitlines()
+
+        transactions = list(self._decoder.transactions(lines))
+
+        self.assertEqual(4, len(transactions))
+        self.assertEqual(10, len(transactions[2]))
+
+
+class TestFileJSONLinesDecodeInvalid(unittest.TestCase):
+    def setUp(self):
+        self._decoder = JSONLinesDecoder()
+
+    def test_invalid_json(self):
+        events = self._decoder.events(['{"header": '])
+
+        self.assertRaises(ValueError, list, events)
+
+    def test_unknown_piece(self):
+        events = self._decoder.events(['{"unknown": {}}'])
+
+        self.assertRaises(ValueError, list, events)
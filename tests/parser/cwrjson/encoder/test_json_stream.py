@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import unittest
+
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_file_stream_decoder
+from cwr.parser.encoder.cwrjson import JSONEncoder, JSONLinesEncoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+Streaming JSON encoding tests.
+
+The following cases are tested:
+- The JSON written to a stream is the same as the one returned by encode
+- JSON Lines contain a line for each piece of the transmission
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _file():
+    data = {}
+    data['filename'] = 'CW12012311_22.V21'
+    data['contents'] = _two_groups()
+
+    return default_file_decoder().decode(data)
+
+
+class TestFileJSONEncodeTo(unittest.TestCase):
+    def setUp(self):
+        self._encoder = JSONEncoder()
+
+    def test_same_as_encode(self):
+        data = _file()
+        stream = io.StringIO()
+
+        self._encoder.encode_to(data, stream)
+
+        self.assertEqual(self._encoder.encode(data), stream.getvalue())
+
+    def test_no_tag(self):
+        data = _file()
+        data.tag = None
+        stream = io.StringIO()
+
+        self._encoder.encode_to(data, stream)
+
+        self.assertEqual(json.loads(self._encoder.encode(data)),
+                         json.loads(stream.getvalue()))
+
+
+class TestFileJSONLinesEncode(unittest.TestCase):
+    def setUp(self):
+        self._encoder = JSONLinesEncoder()
+
+    def test_lines(self):
+        lines = self._encoder.encode(_file()).splitlines()
+
+        pieces = [list(json.loads(line).keys())[0] for line in lines]
+
+        self.assertEqual(['tag', 'header',
+                          'group_header', 'transaction', 'transaction',
+                          'group_trailer',
+                          'group_header', 'transaction', 'transaction',
+                          'group_trailer',
+                          'trailer'], pieces)
+
+    def test_transaction(self):
+        lines = self._encoder.encode(_file()).splitlines()
+
+        transaction = json.loads(lines[3])['transaction']
+
+        self.assertEqual(4, len(transaction))
+        self.assertEqual('AGR', transaction[0]['record_type'])
+
+    def test_encode_to(self):
+        data = _file()
+        stream = io.StringIO()
+
+        self._encoder.encode_to(data, stream)
+
+        self.assertEqual(self._encoder.encode(data), stream.getvalue())
+
+    def test_encode_events(self):
+        data = _file()
+        stream = io.StringIO()
+
+        events = default_file_stream_decoder().events(
+            io.StringIO(_two_groups()))
+        self._encoder.encode_events(events, stream, tag=data.tag)
+
+        self.assertEqual(self._encoder.encode(data), stream.getvalue())
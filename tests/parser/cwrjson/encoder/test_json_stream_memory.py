@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import io
+import tracemalloc
+import unittest
+
+from cwr.group import Group
+from cwr.parser.encoder.cwrjson import JSONEncoder, JSONLinesEncoder
+from cwr.transmission import Transmission
+from tests.parser.cwrjson.encoder.test_json_stream import _file
+
+"""
+Compares the memory used by the JSON encoders.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class _NullStream(object):
+    def write(self, data):
+        pass
+
+
+def _big_file(transactions_n):
+    data = _file()
+
+    group = data.transmission.groups[1]
+    transactions = list(group.transactions) * (transactions_n // 2)
+    groups = [Group(group.group_header, group.group_trailer, transactions)]
+
+    data.transmission = Transmission(data.transmission.header,
+                                     data.transmission.trailer, groups)
+
+    return data
+
+
+def _peak(function, *args):
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestFileJSONEncodeMemory(unittest.TestCase):
+    def setUp(self):
+        # Around 5000 records
+        self._file = _big_file(500)
+
+    def test_encode_to(self):
+        encoder = JSONEncoder()
+
+        peak_full = _peak(encoder.encode, self._file)
+        peak_stream = _peak(encoder.encode_to, self._file, _NullStream())
+
+        self.assertTrue(peak_stream * 10 < peak_full)
+
+    def test_json_lines(self):
+        encoder = JSONLinesEncoder()
+
+        peak_full = _peak(JSONEncoder().encode, self._file)
+        peak_stream = _peak(encoder.encode_to, self._file, _NullStream())
+
+        self.assertTrue(peak_stream * 10 < peak_full)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import array
+import datetime
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.parser.decoder.file import default_columnar_decoder, \
+    default_record_decoder
+from cwr.parser.encoder.dictionary import AgreementDictionaryEncoder, \
+    PublisherRecordDictionaryEncoder, WorkDictionaryEncoder
+from tests.parser.file.decoder.test_fixed import _agreement, _header, \
+    _publisher, _work, _writer
+
+"""
+Columnar decoder tests.
+
+The following cases are tested:
+- Records are stored on a table for each record type
+- Numeric fields are stored on arrays
+- Strings are interned
+- Dates are converted by columns
+- Rows can be transformed back into model instances
+- Record types can be filtered
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _lines():
+    publisher_2 = _publisher[:3] + '00001235' + _publisher[11:]
+
+    return [_header, _agreement, _work, _publisher, publisher_2, _writer]
+
+
+class TestColumnarDecoder(unittest.TestCase):
+    def setUp(self):
+        self._decoder = default_columnar_decoder()
+        self._record_decoder = default_record_decoder()
+
+    def test_tables(self):
+        tables = self._decoder.decode(_lines())
+
+        self.assertEqual(set(['HDR', 'AGR', 'NWR', 'SPU', 'SWR']),
+                         set(tables.keys()))
+        self.assertEqual(2, len(tables['SPU']))
+        self.assertEqual(1, len(tables['NWR']))
+        self.assertEqual('SPU', tables['SPU'].record_type)
+
+    def test_string(self):
+        tables = self._decoder.decode('\r\n'.join(_lines()))
+
+        self.assertEqual(2, len(tables['SPU']))
+
+    def test_columns(self):
+        table = self._decoder.decode(_lines())['SPU']
+
+        sequence = table.column('transaction_sequence_n')
+        self.assertTrue(isinstance(sequence, array.array))
+        self.assertEqual([1234, 1235], list(sequence))
+
+        share = table.column('pr_ownership_share')
+        self.assertTrue(isinstance(share, array.array))
+        self.assertEqual(2, len(share))
+
+        self.assertEqual(['PUBLISHER NAME', 'PUBLISHER NAME'],
+                         list(table.column('publisher_name')))
+
+    def test_interned(self):
+        table = self._decoder.decode(_lines())['SPU']
+
+        names = table.column('publisher_name')
+        self.assertTrue(names[0] is names[1])
+
+    def test_dates(self):
+        table = self._decoder.decode(_lines())['AGR']
+
+        self.assertEqual([datetime.date(2012, 1, 2)],
+                         table.column('agreement_start_date'))
+        self.assertEqual(datetime.date(2013, 2, 3),
+                         table.row(0)['agreement_end_date'])
+
+    def test_names(self):
+        table = self._decoder.decode(_lines())['SPU']
+
+        self.assertEqual('record_type', table.names[0])
+        self.assertTrue('publisher_name' in table.names)
+
+    def test_records(self):
+        tables = self._decoder.decode(_lines())
+
+        cases = ((tables['AGR'], AgreementDictionaryEncoder(), _agreement),
+                 (tables['NWR'], WorkDictionaryEncoder(), _work),
+                 (tables['SPU'], PublisherRecordDictionaryEncoder(),
+                  _publisher))
+
+        for table, encoder, line in cases:
+            expected = self._record_decoder.decode(line)
+            self.assertEqual(encoder.encode(expected),
+                             encoder.encode(table.record(0)))
+
+    def test_records_all(self):
+        table = self._decoder.decode(_lines())['SPU']
+
+        records = list(table.records())
+
+        self.assertEqual(2, len(records))
+        self.assertEqual(1235, records[1].transaction_sequence_n)
+        self.assertEqual('PUBLISHER NAME', records[1].publisher.publisher_name)
+
+    def test_filter(self):
+        decoder = default_columnar_decoder(record_types=['SPU', 'SWR'])
+
+        tables = decoder.decode(_lines())
+
+        self.assertEqual(set(['SPU', 'SWR']), set(tables.keys()))
+
+    def test_invalid(self):
+        lines = _lines()
+        lines[2] = lines[2][:3] + 'A' + lines[2][4:]
+
+        with self.assertRaises(ParseException) as context:
+            self._decoder.decode(lines)
+
+        self.assertTrue('line 3' in context.exception.msg)
+
+    def test_invalid_date(self):
+        lines = _lines()
+        lines[1] = lines[1].replace('20130203', '20130230')
+
+        with self.assertRaises(ParseException) as context:
+            self._decoder.decode(lines)
+
+        self.assertTrue('line 2' in context.exception.msg)
+        self.assertEqual('agreement_end_date',
+                         context.exception.field_id)
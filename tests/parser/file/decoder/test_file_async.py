@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pyparsing import ParseException
+
+from cwr.parser.decoder.asynchronous import AsyncFileDecoder, read_lines
+from cwr.parser.decoder.file import default_file_async_decoder, \
+    default_file_automaton_decoder, default_file_stream_decoder, \
+    default_filename_decoder
+from cwr.parser.decoder.parallel import WorkerDecoder, process_pool
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from cwr.utils.generator import default_file_generator
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+CWR file asynchronous decoder tests.
+
+The following cases are tested:
+- The asynchronous decoder returns the same file as the stream decoder
+- Lines are read from chunks of bytes or strings, and from stream readers
+- Transactions are returned in the file's order
+- The source is read only as fast as the transactions are consumed
+- Transactions can be decoded on threads or processes
+- Invalid files are rejected
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+async def _chunks(contents, size):
+    for i in range(0, len(contents), size):
+        yield contents[i:i + size]
+
+
+async def _collect(iterator):
+    return [value async for value in iterator]
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class _CountingSource(object):
+    """
+    Source returning the lines of a file, counting how many were read.
+    """
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.read = 0
+
+    async def __aiter__(self):
+        for line in self.lines:
+            self.read += 1
+            yield line + '\r\n'
+
+
+class TestReadLines(unittest.TestCase):
+    def test_bytes_split_lines(self):
+        contents = _two_groups().encode('latin-1')
+
+        lines = _run(_collect(read_lines(_chunks(contents, 7))))
+
+        self.assertEqual(34, len(lines))
+        self.assertEqual(1, lines[0][0])
+        self.assertTrue(lines[0][1].startswith('HDR'))
+        self.assertTrue(lines[-1][1].startswith('TRL'))
+        self.assertEqual(_two_groups().splitlines()[12], lines[12][1])
+
+    def test_multibyte(self):
+        contents = 'HDR ÁÉÍ\r\nTRL\r\n'.encode('utf-8')
+
+        lines = _run(_collect(read_lines(_chunks(contents, 1), 'utf-8')))
+
+        self.assertEqual([(1, 'HDR ÁÉÍ'), (2, 'TRL')], lines)
+
+    def test_no_final_line_end(self):
+        lines = _run(_collect(read_lines(_chunks('HDR\r\n\r\nTRL', 2))))
+
+        self.assertEqual([(1, 'HDR'), (3, 'TRL')], lines)
+
+
+class TestFileAsyncDecodeValid(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_file_async_decoder()
+        self._encoder = FileDictionaryEncoder()
+
+    def _assert_same_as_stream(self, contents, result):
+        data = {}
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = contents
+
+        expected = default_file_stream_decoder().decode(data)
+
+        self.assertEqual(self._encoder.encode(expected),
+                         self._encoder.encode(result))
+
+    def test_same_as_stream_decoder(self):
+        data = {}
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = _chunks(_two_groups().encode('latin-1'), 100)
+
+        result = _run(self._parser.decode(data))
+
+        self._assert_same_as_stream(_two_groups(), result)
+
+    def test_stream_reader(self):
+        async def decode():
+            reader = asyncio.StreamReader()
+            reader.feed_data(_two_groups().encode('latin-1'))
+            reader.feed_eof()
+
+            data = {}
+            data['filename'] = 'CW12012311_22.V21'
+            data['contents'] = reader
+
+            return await self._parser.decode(data)
+
+        self._assert_same_as_stream(_two_groups(), _run(decode()))
+
+    def test_events(self):
+        events = _run(_collect(self._parser.events(
+            _chunks(_two_groups(), 50))))
+
+        self.assertEqual(['header',
+                          'group_header', 'transaction', 'transaction',
+                          'group_trailer',
+                          'group_header', 'transaction', 'transaction',
+                          'group_trailer',
+                          'trailer'], [piece for piece, value in events])
+
+    def test_transactions(self):
+        transactions = _run(_collect(self._parser.transactions(
+            _chunks(_two_groups(), 50))))
+
+        self.assertEqual(['AGR', 'AGR', 'NWR', 'NWR'],
+                         [transaction[0].record_type
+                          for transaction in transactions])
+
+    def test_generated_order(self):
+        lines = list(default_file_generator(4).lines(3000))
+
+        parser = default_file_async_decoder(max_pending=4)
+        transactions = _run(_collect(parser.transactions(
+            _CountingSource(lines))))
+
+        expected = [value for piece, value in
+                    default_file_stream_decoder().events(lines)
+                    if piece == 'transaction']
+
+        self.assertEqual(len(expected), len(transactions))
+        self.assertEqual([transaction[0].transaction_sequence_n
+                          for transaction in expected],
+                         [transaction[0].transaction_sequence_n
+                          for transaction in transactions])
+
+
+class TestFileAsyncDecodeBackpressure(unittest.TestCase):
+    def test_slow_consumer(self):
+        lines = list(default_file_generator(5).lines(2000))
+        source = _CountingSource(lines)
+
+        parser = default_file_async_decoder(max_pending=2)
+
+        async def consume():
+            read = []
+            transactions = parser.transactions(source)
+            async for _ in transactions:
+                await asyncio.sleep(0.001)
+                read.append(source.read)
+                if len(read) == 5:
+                    break
+            await transactions.aclose()
+            return read
+
+        read = _run(consume())
+
+        # Only a few transactions are read ahead of the consumer
+        self.assertTrue(source.read < len(lines) / 4)
+        self.assertEqual(read[-1], source.read)
+
+    def test_max_pending(self):
+        decoder = default_file_automaton_decoder()
+        running = []
+
+        class _Tracking(object):
+            def decode_piece(self, piece, lines, line_n=1):
+                running.append(line_n)
+                return decoder.decode_piece(piece, lines, line_n)
+
+        parser = AsyncFileDecoder(_Tracking(), default_filename_decoder(),
+                                  max_pending=3)
+
+        async def consume():
+            events = parser.events(_CountingSource(
+                _two_groups().splitlines()))
+            await events.__anext__()
+            # The header is returned before reading the whole file
+            await events.aclose()
+
+        _run(consume())
+
+        self.assertTrue(len(running) < 10)
+
+
+class TestFileAsyncDecodeExecutors(unittest.TestCase):
+    def test_thread_pool(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parser = default_file_async_decoder(executor=executor)
+
+            transactions = _run(_collect(parser.transactions(
+                _chunks(_two_groups(), 64))))
+
+        self.assertEqual(4, len(transactions))
+
+    def test_process_pool(self):
+        with process_pool(default_file_automaton_decoder, 2) as pool:
+            parser = AsyncFileDecoder(WorkerDecoder(),
+                                      default_filename_decoder(),
+                                      executor=pool)
+
+            transactions = _run(_collect(parser.transactions(
+                _chunks(_two_groups(), 64))))
+
+        self.assertEqual(['AGR', 'AGR', 'NWR', 'NWR'],
+                         [transaction[0].record_type
+                          for transaction in transactions])
+
+
+class TestFileAsyncDecodeInvalid(unittest.TestCase):
+    def test_invalid_record(self):
+        contents = _two_groups().replace('TER0000000000000000I2136',
+                                         'TER0000000000000000X2136')
+
+        parser = default_file_async_decoder()
+
+        self.assertRaises(ParseException, _run, _collect(
+            parser.transactions(_chunks(contents, 80))))
+
+    def test_invalid_record_process_pool(self):
+        contents = _two_groups().replace('TER0000000000000000I2136',
+                                         'TER0000000000000000X2136')
+
+        with process_pool(default_file_automaton_decoder, 1) as pool:
+            parser = AsyncFileDecoder(WorkerDecoder(),
+                                      default_filename_decoder(),
+                                      executor=pool)
+
+            self.assertRaises(ParseException, _run, _collect(
+                parser.transactions(_chunks(contents, 80))))
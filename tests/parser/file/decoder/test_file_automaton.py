@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.parser.decoder.automaton import tokenize
+from cwr.parser.decoder.file import default_file_automaton_decoder, \
+    default_file_stream_decoder
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+CWR file automaton decoder tests.
+
+The following cases are tested:
+- The automaton decoder returns the same file as the stream decoder
+- Invalid or incomplete files are rejected
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestTokenize(unittest.TestCase):
+    def test_tokens(self):
+        result = list(tokenize(['HDR12', 'GRH34']))
+
+        self.assertEqual([('HDR', 'HDR12'), ('GRH', 'GRH34')], result)
+
+
+class TestFileAutomatonDecodeValid(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_file_automaton_decoder()
+
+    def test_same_as_stream_decoder(self):
+        encoder = FileDictionaryEncoder()
+
+        data = {}
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = _two_groups()
+
+        expected = encoder.encode(
+            default_file_stream_decoder().decode(dict(data)))
+        result = encoder.encode(self._parser.decode(dict(data)))
+
+        self.assertEqual(expected, result)
+
+    def test_stream(self):
+        data = {}
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = io.StringIO(_two_groups())
+
+        result = self._parser.decode(data).transmission
+
+        self.assertEqual(2, len(result.groups))
+        self.assertEqual(10, len(result.groups[1].transactions[0]))
+
+    def test_events(self):
+        events = self._parser.events(io.StringIO(_two_groups()))
+
+        pieces = [piece for piece, value in events]
+
+        self.assertEqual(['header',
+                          'group_header', 'transaction', 'transaction',
+                          'group_trailer',
+                          'group_header', 'transaction', 'transaction',
+                          'group_trailer',
+                          'trailer'], pieces)
+
+
+class TestFileAutomatonDecodeInvalid(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_file_automaton_decoder()
+
+    def _decode(self, contents):
+        data = {}
+
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = contents
+
+        return self._parser.decode(data)
+
+    def test_empty_contents(self):
+        self.assertRaises(ParseException, self._decode, '')
+
+    def test_bad_contents(self):
+        self.assertRaises(ParseException, self._decode,
+                          'Contents of the file')
+
+    def test_no_trailer(self):
+        self.assertRaises(ParseException, self._decode,
+                          _two_groups().rsplit('\n', 1)[0])
+
+    def test_bad_record(self):
+        contents = _two_groups().replace('TER0000000000000000I2136',
+                                         'TER0000000000000000X2136')
+
+        self.assertRaises(ParseException, self._decode, contents)
+
+    def test_unexpected_record(self):
+        contents = _two_groups().replace('TER0000000000000000I2136',
+                                         'SPT0000000000000000I2136')
+
+        with self.assertRaises(ParseException) as context:
+            self._decode(contents)
+
+        self.assertTrue('line 4' in context.exception.msg)
+
+    def test_incomplete_transaction(self):
+        lines = _two_groups().split('\n')
+        # Removes the territory from the first agreement
+        del lines[3]
+
+        self.assertRaises(ParseException, self._decode, '\n'.join(lines))
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import unittest
+import time
+
+from cwr.parser.decoder.file import default_file_automaton_decoder, \
+    default_file_stream_decoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+Compares the times of the automaton decoder and the stream decoder.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _time(decoder, contents):
+    start = time.perf_counter()
+    for piece in decoder.events(contents):
+        pass
+    end = time.perf_counter()
+
+    return end - start
+
+
+class TestFileAutomatonDecoderTimes(unittest.TestCase):
+    def setUp(self):
+        lines = _two_groups().split('\n')
+
+        # Repeats the transactions of the works group
+        self._contents = lines[:12] + lines[12:-2] * 50 + lines[-2:]
+
+    def test_100(self):
+        time_stream = _time(default_file_stream_decoder(), self._contents)
+        time_automaton = _time(default_file_automaton_decoder(),
+                               self._contents)
+
+        self.assertTrue(time_automaton < time_stream)
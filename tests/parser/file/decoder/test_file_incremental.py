@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.grammar.factory.cache import config_hash, model_hash, save_pickle
+from cwr.parser.decoder.file import default_file_incremental_decoder, \
+    default_file_stream_decoder
+from cwr.parser.decoder.incremental import TransactionCache, \
+    transaction_hash
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+CWR file incremental decoder tests.
+
+The following cases are tested:
+- The incremental decoder returns the same file as the full decoder
+- Transactions already decoded are taken from the cache
+- Changed transactions are parsed again
+- The transaction sequence numbers are set on the reused transactions
+- The cache is kept on disk between decoders
+- The cache is bounded, and returns copies of the transactions
+- Transactions which can't be read are handled as missing
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _data(contents):
+    data = {}
+    data['filename'] = 'CW12012311_22.V21'
+    data['contents'] = contents
+
+    return data
+
+
+def _revised():
+    lines = _two_groups().splitlines()
+
+    # The title of the second work is changed
+    lines[22] = lines[22].replace('WORK NAME', 'WORK NAMX')
+
+    return '\r\n'.join(lines)
+
+
+def _renumbered():
+    lines = _two_groups().splitlines()
+
+    # The second work takes a new transaction sequence number
+    for i in range(22, 32):
+        lines[i] = lines[i][:3] + '00000200' + lines[i][11:]
+
+    return '\r\n'.join(lines)
+
+
+class TestFileIncrementalDecode(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._parser = default_file_incremental_decoder(self._directory)
+        self._full_parser = default_file_stream_decoder()
+        self._encoder = FileDictionaryEncoder()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def _assert_same_as_full(self, contents, result):
+        expected = self._full_parser.decode(_data(contents))
+
+        self.assertEqual(self._encoder.encode(expected),
+                         self._encoder.encode(result))
+
+    def test_first_decode(self):
+        result = self._parser.decode(_data(_two_groups()))
+
+        self._assert_same_as_full(_two_groups(), result)
+
+        # Each group contains the same transaction twice
+        self.assertEqual({'transactions': 4, 'reused': 2, 'decoded': 2},
+                         self._parser.stats.as_dict())
+
+    def test_second_decode(self):
+        self._parser.decode(_data(_two_groups()))
+        result = self._parser.decode(_data(_two_groups()))
+
+        self._assert_same_as_full(_two_groups(), result)
+
+        self.assertEqual({'transactions': 4, 'reused': 4, 'decoded': 0},
+                         self._parser.stats.as_dict())
+
+    def test_revised(self):
+        self._parser.decode(_data(_two_groups()))
+        result = self._parser.decode(_data(_revised()))
+
+        self._assert_same_as_full(_revised(), result)
+
+        self.assertEqual({'transactions': 4, 'reused': 3, 'decoded': 1},
+                         self._parser.stats.as_dict())
+
+        work = result.transmission.groups[1].transactions[1][0]
+        self.assertEqual('WORK NAMX', work.title)
+
+    def test_renumbered(self):
+        self._parser.decode(_data(_two_groups()))
+        result = self._parser.decode(_data(_renumbered()))
+
+        self._assert_same_as_full(_renumbered(), result)
+
+        self.assertEqual(0, self._parser.stats.decoded)
+
+        transactions = result.transmission.groups[1].transactions
+        for record in transactions[0]:
+            self.assertEqual(199, record.transaction_sequence_n)
+        for record in transactions[1]:
+            self.assertEqual(200, record.transaction_sequence_n)
+
+    def test_reused_are_copies(self):
+        result = self._parser.decode(_data(_two_groups()))
+
+        transactions = result.transmission.groups[1].transactions
+        self.assertIsNot(transactions[0][0], transactions[1][0])
+
+    def test_persistent(self):
+        self._parser.decode(_data(_two_groups()))
+
+        self.assertTrue(os.path.isfile(self._parser.cache.path))
+
+        parser = default_file_incremental_decoder(self._directory)
+        result = parser.decode(_data(_revised()))
+
+        self._assert_same_as_full(_revised(), result)
+
+        self.assertEqual(3, parser.stats.reused)
+
+    def test_bad_record(self):
+        data = _data(_two_groups().replace('TER0000000000000000I2136',
+                                           'TER0000000000000000X2136'))
+
+        self.assertRaises(ParseException, self._parser.decode, data)
+
+
+class TestTransactionCache(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_hash_ignores_transaction_sequence(self):
+        lines = _two_groups().splitlines()
+
+        self.assertEqual(transaction_hash(lines[12:22]),
+                         transaction_hash(lines[22:32]))
+        self.assertEqual(transaction_hash(lines[12:22]),
+                         transaction_hash(_renumbered().splitlines()[22:32]))
+        self.assertNotEqual(transaction_hash(lines[12:22]),
+                            transaction_hash(_revised().splitlines()[22:32]))
+
+    def test_get_missing(self):
+        cache = TransactionCache(self._directory)
+
+        self.assertIsNone(cache.get(b'key'))
+
+    def test_get_copy(self):
+        cache = TransactionCache(self._directory)
+
+        value = ['a', 'b']
+        cache.put(b'key', value)
+
+        self.assertEqual(value, cache.get(b'key'))
+        self.assertIsNot(value, cache.get(b'key'))
+
+    def test_bounded(self):
+        cache = TransactionCache(self._directory, max_size=2)
+
+        cache.put(b'1', [1])
+        cache.put(b'2', [2])
+        cache.get(b'1')
+        cache.put(b'3', [3])
+
+        self.assertEqual(2, len(cache))
+        self.assertIn(b'1', cache)
+        self.assertNotIn(b'2', cache)
+        self.assertIn(b'3', cache)
+
+    def test_save(self):
+        cache = TransactionCache(self._directory)
+        cache.put(b'key', [1])
+
+        self.assertTrue(cache.modified)
+
+        cache.save()
+
+        self.assertFalse(cache.modified)
+        self.assertEqual([1], TransactionCache(self._directory).get(b'key'))
+
+    def test_key(self):
+        cache = TransactionCache(self._directory, key='a')
+        cache.put(b'key', [1])
+        cache.save()
+
+        self.assertIsNone(TransactionCache(self._directory,
+                                           key='b').get(b'key'))
+
+    def test_corrupt(self):
+        cache = TransactionCache(self._directory)
+
+        with open(cache.path, 'wb') as cache_file:
+            cache_file.write(b'not a cache')
+
+        self.assertEqual(0, len(TransactionCache(self._directory)))
+
+    def test_corrupt_transaction(self):
+        cache = TransactionCache(self._directory)
+
+        save_pickle(collections.OrderedDict([(b'key', b'not a transaction')]),
+                    cache.path)
+
+        cache = TransactionCache(self._directory)
+
+        self.assertIsNone(cache.get(b'key'))
+        self.assertNotIn(b'key', cache)
+
+    def test_default_key(self):
+        cache = TransactionCache(self._directory)
+
+        self.assertIn(config_hash(), cache.path)
+        self.assertIn(model_hash(), cache.path)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+import time
+import unittest
+
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_file_stream_decoder
+from cwr.parser.decoder.lenient import decode_lenient
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+CWR file lenient decoding tests.
+
+The following cases are tested:
+- Valid files are decoded as with the grammar
+- Invalid transactions are ignored, and the rest of the file is decoded
+- The errors indicate the line, record type and field
+- Invalid control records are ignored
+- Unknown record types begin a new transaction
+- Transactions without a valid group header are reported
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _data(contents):
+    return {'filename': 'CW12012311_22.V21', 'contents': contents}
+
+
+class TestFileDecodeLenient(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_file_decoder()
+
+    def test_valid(self):
+        encoder = FileDictionaryEncoder()
+
+        expected = encoder.encode(self._parser.decode(_data(_two_groups())))
+        result, errors = self._parser.decode_lenient(_data(_two_groups()))
+
+        self.assertEqual([], errors)
+        self.assertEqual(expected, encoder.encode(result))
+
+    def test_invalid_field(self):
+        contents = _two_groups().replace('TER0000000000000000I2136',
+                                         'TER0000000000000000X2136', 1)
+
+        result, errors = self._parser.decode_lenient(_data(contents))
+
+        groups = result.transmission.groups
+        self.assertEqual(2, len(groups))
+        self.assertEqual(1, len(groups[0].transactions))
+        self.assertEqual(2, len(groups[1].transactions))
+
+        self.assertEqual(1, len(errors))
+        error = errors[0]
+        self.assertEqual('transaction', error.piece)
+        self.assertEqual(4, error.line_n)
+        self.assertEqual('TER', error.record_type)
+        self.assertEqual('inclusion_exclusion_indicator', error.field_id)
+
+    def test_unexpected_record(self):
+        lines = _two_groups().split('\n')
+        lines[3] = 'XXX' + lines[3][3:]
+
+        result, errors = self._parser.decode_lenient(_data('\n'.join(lines)))
+
+        self.assertEqual(1, len(result.transmission.groups[0].transactions))
+
+        # The transaction is cut before the unknown record
+        self.assertEqual([(3, 'AGR'), (4, 'XXX')],
+                         [(error.line_n, error.record_type)
+                          for error in errors])
+        self.assertEqual(None, errors[1].field_id)
+
+    def test_unknown_transaction_header(self):
+        lines = _two_groups().split('\n')
+        i = [i for i, line in enumerate(lines) if line[:3] == 'NWR'][1]
+        lines[i] = 'XWR' + lines[i][3:]
+
+        result, errors = self._parser.decode_lenient(_data('\n'.join(lines)))
+
+        # The previous transaction is kept
+        transactions = result.transmission.groups[1].transactions
+        self.assertEqual(1, len(transactions))
+        self.assertEqual('NWR', transactions[0][0].record_type)
+
+        self.assertEqual(1, len(errors))
+        self.assertEqual(i + 1, errors[0].line_n)
+        self.assertEqual('XWR', errors[0].record_type)
+
+    def test_several_errors(self):
+        lines = _two_groups().split('\n')
+        # First agreement and second work
+        lines[3] = lines[3].replace('I2136', 'X2136')
+        lines[23] = lines[23][:19] + 'x' + lines[23][20:]
+
+        result, errors = self._parser.decode_lenient(_data('\n'.join(lines)))
+
+        groups = result.transmission.groups
+        self.assertEqual(1, len(groups[0].transactions))
+        self.assertEqual(1, len(groups[1].transactions))
+
+        self.assertEqual([4, 24], [error.line_n for error in errors])
+
+    def test_invalid_group_header(self):
+        lines = _two_groups().split('\n')
+        lines[1] = 'GRHXXX' + lines[1][6:]
+
+        result, errors = self._parser.decode_lenient(_data('\n'.join(lines)))
+
+        groups = result.transmission.groups
+        self.assertEqual(1, len(groups))
+        self.assertEqual('NWR', groups[0].group_header.transaction_type)
+
+        # The transactions of the group are reported
+        self.assertEqual([('group_header', 2), ('transaction', 3),
+                          ('transaction', 7)],
+                         [(error.piece, error.line_n) for error in errors])
+
+    def test_missing_group_header(self):
+        lines = _two_groups().split('\n')
+        del lines[1]
+
+        result, errors = self._parser.decode_lenient(_data('\n'.join(lines)))
+
+        self.assertEqual(1, len(result.transmission.groups))
+        self.assertEqual(['Transaction outside a group'] * 2,
+                         [error.message for error in errors])
+
+    def test_missing_trailer(self):
+        contents = _two_groups().rsplit('\n', 1)[0]
+
+        result, errors = self._parser.decode_lenient(_data(contents))
+
+        self.assertEqual(None, result.transmission.trailer)
+        self.assertEqual(2, len(result.transmission.groups))
+
+    def test_stream_decoder(self):
+        contents = _two_groups().replace('TER0000000000000000I2136',
+                                         'TER0000000000000000X2136', 1)
+
+        transmission, errors = decode_lenient(default_file_stream_decoder(),
+                                              contents.splitlines())
+
+        self.assertEqual(1, len(transmission.groups[0].transactions))
+        self.assertEqual(1, len(errors))
+        self.assertEqual(4, errors[0].line_n)
+        self.assertEqual('TER', errors[0].record_type)
+
+
+class TestFileDecodeLenientTimes(unittest.TestCase):
+    def _time(self, contents):
+        parser = default_file_decoder()
+
+        start = time.perf_counter()
+        parser.decode_lenient(_data(contents))
+        end = time.perf_counter()
+
+        return end - start
+
+    def test_errors_linear(self):
+        lines = _two_groups().split('\n')
+        works = lines[12:-2]
+
+        valid = lines[:12] + works * 50 + lines[-2:]
+
+        # Every transaction contains an invalid record
+        invalid_works = list(works)
+        invalid_works[1] = invalid_works[1].replace('MUSIC SOCIETY',
+                                                    'music society')
+        invalid_works[11] = invalid_works[11].replace('MUSIC SOCIETY',
+                                                      'music society')
+        invalid = lines[:12] + invalid_works * 50 + lines[-2:]
+
+        time_valid = self._time('\n'.join(valid))
+        time_invalid = self._time('\n'.join(invalid))
+
+        self.assertTrue(time_invalid < time_valid * 3)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_file_stream_decoder
+from cwr.parser.decoder.mapped import MappedFile, charset_encoding
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+Memory-mapped CWR file tests.
+
+The following cases are tested:
+- Lines are read from the mapped file
+- The encoding is taken from the header character set
+- The file decoders accept a path instead of the contents
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestMappedFile(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _write(self, contents):
+        path = os.path.join(self._dir, 'CW12012311_22.V21')
+        with open(path, 'wb') as file:
+            file.write(contents)
+        return path
+
+    def test_lines(self):
+        path = self._write(b'HDR1\r\nGRH2\r\n\r\nTRL3')
+
+        with MappedFile(path) as mapped:
+            self.assertEqual(['HDR1', 'GRH2', '', 'TRL3'], list(mapped))
+
+    def test_lines_unix(self):
+        path = self._write(b'HDR1\nGRH2\n')
+
+        with MappedFile(path) as mapped:
+            self.assertEqual(['HDR1', 'GRH2'], list(mapped))
+
+    def test_empty(self):
+        path = self._write(b'')
+
+        with MappedFile(path) as mapped:
+            self.assertEqual([], list(mapped))
+
+    def test_default_encoding(self):
+        path = self._write(b'HDR1\r\nNWR\xe9\r\n')
+
+        with MappedFile(path) as mapped:
+            self.assertEqual('latin-1', mapped.encoding)
+            self.assertEqual(['HDR1', 'NWR\xe9'], list(mapped))
+
+    def test_header_encoding(self):
+        header = 'HDR'.ljust(86) + 'UTF-8'
+        path = self._write((header + '\r\nNWR\xe9').encode('utf-8'))
+
+        with MappedFile(path) as mapped:
+            self.assertEqual('utf-8', mapped.encoding)
+            self.assertEqual('NWR\xe9', list(mapped)[1])
+
+    def test_received_encoding(self):
+        path = self._write('HDR1\r\nNWR\xe9'.encode('utf-8'))
+
+        with MappedFile(path, encoding='utf-8') as mapped:
+            self.assertEqual('NWR\xe9', list(mapped)[1])
+
+
+class TestCharsetEncoding(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual('latin-1', charset_encoding(None))
+        self.assertEqual('latin-1', charset_encoding(''))
+
+    def test_known(self):
+        self.assertEqual('big5', charset_encoding('Big5'))
+        self.assertEqual('gb2312', charset_encoding('GB'))
+
+    def test_unicode(self):
+        self.assertEqual('utf-8', charset_encoding('U+0400'))
+
+    def test_unknown(self):
+        self.assertEqual('latin-1', charset_encoding('XXX'))
+
+
+class TestFileDecodePath(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'CW12012311_22.V21')
+        with open(self._path, 'wb') as file:
+            file.write(_two_groups().encode('latin-1'))
+
+        data = {'filename': 'CW12012311_22.V21', 'contents': _two_groups()}
+        self._expected = FileDictionaryEncoder().encode(
+            default_file_decoder().decode(data))
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_file_decoder(self):
+        result = default_file_decoder().decode({'path': self._path})
+
+        self.assertEqual(self._expected,
+                         FileDictionaryEncoder().encode(result))
+
+    def test_stream_decoder(self):
+        result = default_file_stream_decoder().decode({'path': self._path})
+
+        self.assertEqual(self._expected,
+                         FileDictionaryEncoder().encode(result))
+
+    def test_filename(self):
+        data = {'path': self._path, 'filename': 'CW13012311_22.V21'}
+
+        result = default_file_stream_decoder().decode(data)
+
+        self.assertEqual(2013, result.tag.year)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import pyparsing as pp
+
+from cwr.parser.decoder.file import FileDecoder, default_file_decoder, \
+    default_filename_decoder, default_grammar_factory
+from cwr.parser.decoder.memo import ParseCache
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+Parse cache tests.
+
+The following cases are tested:
+- The cache discards the least recently used results
+- The statistics are counted
+- Files decoded with the cache are the same as without it
+- The cache is used only while decoding
+- Pyparsing is restored after decoding
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _data():
+    return {'filename': 'CW12012311_22.V21', 'contents': _two_groups()}
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self._cache = ParseCache(2)
+
+    def test_get_missing(self):
+        self.assertEqual(None, self._cache.get('a'))
+        self.assertEqual(1, self._cache.misses)
+        self.assertEqual(0, self._cache.hits)
+
+    def test_get(self):
+        self._cache.put('a', 1)
+
+        self.assertEqual(1, self._cache.get('a'))
+        self.assertEqual(1, self._cache.hits)
+
+    def test_eviction(self):
+        self._cache.put('a', 1)
+        self._cache.put('b', 2)
+        self._cache.put('c', 3)
+
+        self.assertEqual(2, len(self._cache))
+        self.assertEqual(1, self._cache.evictions)
+        self.assertEqual(None, self._cache.get('a'))
+
+    def test_least_recently_used(self):
+        self._cache.put('a', 1)
+        self._cache.put('b', 2)
+        self._cache.get('a')
+        self._cache.put('c', 3)
+
+        self.assertEqual(1, self._cache.get('a'))
+        self.assertEqual(None, self._cache.get('b'))
+
+    def test_reset_stats(self):
+        self._cache.put('a', 1)
+        self._cache.get('a')
+        self._cache.get('b')
+        self._cache.reset_stats()
+
+        self.assertEqual(0, self._cache.hits)
+        self.assertEqual(0, self._cache.misses)
+        self.assertEqual(0, self._cache.evictions)
+
+
+class TestFileDecodeCached(unittest.TestCase):
+    def setUp(self):
+        self._rule = default_grammar_factory().get_rule('transmission')
+
+    def _decoder(self, cache):
+        return FileDecoder(self._rule, default_filename_decoder(),
+                           parse_cache=cache)
+
+    def test_no_cache(self):
+        self.assertEqual(None, default_file_decoder().parse_cache)
+
+    def test_same_result(self):
+        encoder = FileDictionaryEncoder()
+
+        expected = encoder.encode(default_file_decoder().decode(_data()))
+
+        decoder = self._decoder(ParseCache(100000))
+        result = encoder.encode(decoder.decode(_data()))
+
+        self.assertEqual(expected, result)
+        self.assertTrue(decoder.parse_cache.hits > 0)
+        self.assertEqual(0, decoder.parse_cache.evictions)
+
+    def test_bounded(self):
+        decoder = self._decoder(ParseCache(10))
+        decoder.decode(_data())
+
+        cache = decoder.parse_cache
+        self.assertTrue(cache.evictions > 0)
+        self.assertEqual(10, cache.max_size)
+
+    def test_cleared_after_decoding(self):
+        decoder = self._decoder(ParseCache(1000))
+        decoder.decode(_data())
+
+        self.assertEqual(0, len(decoder.parse_cache))
+
+    def test_not_shared(self):
+        cached = self._decoder(ParseCache(1000))
+        cached.decode(_data())
+        misses = cached.parse_cache.misses
+
+        default_file_decoder().decode(_data())
+
+        self.assertEqual(misses, cached.parse_cache.misses)
+
+    def test_pyparsing_restored(self):
+        original = pp.ParserElement._parse
+
+        ParseCache(1000)
+        self.assertEqual(original, pp.ParserElement._parse)
+
+        self._decoder(ParseCache(1000)).decode(_data())
+        self.assertEqual(original, pp.ParserElement._parse)
+
+    def test_pyparsing_restored_on_error(self):
+        original = pp.ParserElement._parse
+
+        data = {'filename': 'CW12012311_22.V21', 'contents': 'HDR'}
+        decoder = self._decoder(ParseCache(1000))
+        self.assertRaises(pp.ParseException, decoder.decode, data)
+
+        self.assertEqual(original, pp.ParserElement._parse)
+
+    def test_nested(self):
+        original = pp.ParserElement._parse
+
+        outer = ParseCache(1000)
+        with outer.activate():
+            with ParseCache(1000).activate():
+                pass
+            self.assertNotEqual(original, pp.ParserElement._parse)
+
+        self.assertEqual(original, pp.ParserElement._parse)
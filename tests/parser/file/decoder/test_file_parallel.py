@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.parser.decoder.file import default_file_automaton_decoder, \
+    default_file_decoder, default_file_stream_decoder, \
+    default_filename_decoder
+from cwr.parser.decoder.fixed import RecordParseException
+from cwr.parser.decoder.parallel import ParallelFileDecoder, process_pool
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+CWR file parallel decoder tests.
+
+The following cases are tested:
+- The parallel decoder returns the same file as the full decoder
+- The pieces of the transmission are returned in the file's order
+- The same pool is used for all the files, or the one received
+- Invalid files are rejected
+- The record, field and line of an error are kept
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _parser(chunk_size=1, decoder_factory=default_file_stream_decoder):
+    return ParallelFileDecoder(decoder_factory,
+                               default_filename_decoder(),
+                               max_workers=2, chunk_size=chunk_size)
+
+
+def _data():
+    data = {}
+
+    data['filename'] = 'CW12012311_22.V21'
+    data['contents'] = _two_groups()
+
+    return data
+
+
+class TestFileParallelDecodeValid(unittest.TestCase):
+    def test_same_as_full_decoder(self):
+        encoder = FileDictionaryEncoder()
+
+        data = {}
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = _two_groups()
+
+        expected = encoder.encode(default_file_decoder().decode(dict(data)))
+        with _parser() as parser:
+            result = encoder.encode(parser.decode(dict(data)))
+
+        self.assertEqual(expected, result)
+
+    def test_events(self):
+        with _parser(chunk_size=3) as parser:
+            events = parser.events(io.StringIO(_two_groups()))
+
+            pieces = [piece for piece, value in events]
+
+        self.assertEqual(['header',
+                          'group_header', 'transaction', 'transaction',
+                          'group_trailer',
+                          'group_header', 'transaction', 'transaction',
+                          'group_trailer',
+                          'trailer'], pieces)
+
+    def test_chunks(self):
+        chunks = list(_parser(chunk_size=4).chunks(_two_groups().split('\n')))
+
+        self.assertEqual([4, 4, 2], [len(chunk) for chunk in chunks])
+
+    def test_pool_kept(self):
+        with _parser() as parser:
+            parser.decode(_data())
+            pool = parser.pool
+            parser.decode(_data())
+
+            self.assertIs(pool, parser.pool)
+
+    def test_pool_closed(self):
+        parser = _parser()
+        parser.decode(_data())
+        pool = parser.pool
+        parser.close()
+
+        transmission = parser.decode(_data()).transmission
+        parser.close()
+
+        self.assertIsNot(pool, parser.pool)
+        self.assertEqual(2, len(transmission.groups))
+
+    def test_received_pool(self):
+        with process_pool(default_file_stream_decoder, 1) as pool:
+            parser = ParallelFileDecoder(default_file_stream_decoder,
+                                         default_filename_decoder(),
+                                         pool=pool)
+            parser.decode(_data())
+            parser.close()
+
+            transmission = parser.decode(_data()).transmission
+
+            self.assertIs(pool, parser.pool)
+            self.assertEqual(2, len(transmission.groups))
+
+
+class TestFileParallelDecodeInvalid(unittest.TestCase):
+    def test_bad_record(self):
+        data = {}
+
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = _two_groups().replace('TER0000000000000000I2136',
+                                                 'TER0000000000000000X2136')
+
+        with _parser() as parser:
+            self.assertRaises(ParseException, parser.decode, data)
+
+    def test_bad_record_fields(self):
+        data = _data()
+        data['contents'] = data['contents'].replace(
+            'TER0000000000000000I2136', 'TER0000000000000000X2136')
+
+        with _parser(decoder_factory=default_file_automaton_decoder) as \
+                parser:
+            with self.assertRaises(RecordParseException) as context:
+                parser.decode(data)
+
+        self.assertEqual('TER', context.exception.record_type)
+        self.assertEqual('inclusion_exclusion_indicator',
+                         context.exception.field_id)
+        self.assertEqual(4, context.exception.line_n)
+
+    def test_valid_after_invalid(self):
+        data = _data()
+        data['contents'] = data['contents'].replace(
+            'TER0000000000000000I2136', 'TER0000000000000000X2136')
+
+        with _parser() as parser:
+            self.assertRaises(ParseException, parser.decode, data)
+
+            transmission = parser.decode(_data()).transmission
+
+        self.assertEqual(2, len(transmission.groups))
+
+    def test_no_trailer(self):
+        data = {}
+
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = _two_groups().rsplit('\n', 1)[0]
+
+        with _parser() as parser:
+            self.assertRaises(ParseException, parser.decode, data)
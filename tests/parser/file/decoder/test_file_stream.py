@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.group import GroupTrailer
+from cwr.transmission import TransmissionHeader, TransmissionTrailer
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_file_stream_decoder
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+CWR file stream decoder tests.
+
+The following cases are tested:
+- The stream decoder returns the same file as the full decoder
+- The pieces of the transmission are returned in the file's order
+- Invalid or incomplete files are rejected
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestFileStreamDecodeValid(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_file_stream_decoder()
+
+    def test_two_groups(self):
+        data = {}
+
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = io.StringIO(_two_groups())
+
+        result = self._parser.decode(data)
+
+        result = result.transmission
+
+        self.assertTrue(isinstance(result.header, TransmissionHeader))
+        self.assertTrue(isinstance(result.trailer, TransmissionTrailer))
+
+        self.assertEqual(2, len(result.groups))
+
+        group = result.groups[0]
+
+        self.assertEqual('AGR', group.group_header.transaction_type)
+        self.assertTrue(isinstance(group.group_trailer, GroupTrailer))
+
+        self.assertEqual(2, len(group.transactions))
+        self.assertEqual(4, len(group.transactions[0]))
+
+        group = result.groups[1]
+
+        self.assertEqual('NWR', group.group_header.transaction_type)
+
+        self.assertEqual(2, len(group.transactions))
+        self.assertEqual(10, len(group.transactions[0]))
+
+    def test_same_as_full_decoder(self):
+        encoder = FileDictionaryEncoder()
+
+        data = {}
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = _two_groups()
+
+        expected = encoder.encode(default_file_decoder().decode(dict(data)))
+        result = encoder.encode(self._parser.decode(dict(data)))
+
+        self.assertEqual(expected, result)
+
+    def test_events(self):
+        events = self._parser.events(io.StringIO(_two_groups()))
+
+        pieces = [piece for piece, value in events]
+
+        self.assertEqual(['header',
+                          'group_header', 'transaction', 'transaction',
+                          'group_trailer',
+                          'group_header', 'transaction', 'transaction',
+                          'group_trailer',
+                          'trailer'], pieces)
+
+    def test_empty_lines(self):
+        data = {}
+
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = _two_groups().replace('\n', '\r\n\n') + '\n\n'
+
+        result = self._parser.decode(data)
+
+        self.assertEqual(2, len(result.transmission.groups))
+
+
+class TestFileStreamDecodeInvalid(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_file_stream_decoder()
+
+    def test_empty_contents(self):
+        data = {}
+
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = ''
+
+        self.assertRaises(ParseException, self._parser.decode, data)
+
+    def test_bad_contents(self):
+        data = {}
+
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = 'Contents of the file'
+
+        self.assertRaises(ParseException, self._parser.decode, data)
+
+    def test_no_trailer(self):
+        data = {}
+
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = _two_groups().rsplit('\n', 1)[0]
+
+        self.assertRaises(ParseException, self._parser.decode, data)
+
+    def test_bad_record(self):
+        data = {}
+
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = _two_groups().replace('TER0000000000000000I2136',
+                                                 'TER0000000000000000X2136')
+
+        self.assertRaises(ParseException, self._parser.decode, data)
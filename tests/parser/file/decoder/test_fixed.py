@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.parser.decoder.file import default_record_decoder, \
+    default_grammar_factory
+from cwr.parser.encoder.dictionary import AgreementDictionaryEncoder, \
+    PublisherRecordDictionaryEncoder, TransmissionHeaderDictionaryEncoder, \
+    WorkDictionaryEncoder, WriterRecordDictionaryEncoder
+
+"""
+Fixed-width record decoder tests.
+
+The following cases are tested:
+- The decoder returns the same values as the grammar rules
+- Trailing whitespaces are handled as in the grammar
+- Invalid records are rejected
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+_agreement = 'AGR0000123400000023C1234567890123D1234567890123OG201201022013020320140304D20100405D201605062017060701234MYY0123456789012A'
+
+_header = 'HDRPB226144593AGENCIA GRUPO MUSICAL                        01.102013080902591120130809               '
+
+_publisher = 'SPU000012340000002319A12345678PUBLISHER NAME                                AQ92370341200014107338A0123456789123009020500100300001102312BY I-000000229-7A0123456789124A0123456789125OSB'
+
+_work = 'NWR0000017900000000NAME OF THE STREET                                            1430374       T037306869919980730            UNC000000YMTX   ORI   ORIORI                                          N00000000000U                                                  Y'
+
+_writer = 'SWR0000123400000023A12345678LAST NAME                                    FIRST NAME                    NA 92370341200014107338009020500100300001102312YYY I-000000229-7012345678901B'
+
+
+class TestFixedWidthDecodeValid(unittest.TestCase):
+    def setUp(self):
+        self._decoder = default_record_decoder()
+        self._grammar = default_grammar_factory()
+
+    def _assert_same(self, rule_id, encoder, record):
+        expected = self._grammar.get_rule(rule_id).parseString(record)[0]
+        result = self._decoder.decode(record)
+
+        self.assertEqual(encoder.encode(expected), encoder.encode(result))
+
+    def test_agreement(self):
+        self._assert_same('agreement', AgreementDictionaryEncoder(),
+                          _agreement)
+
+    def test_header(self):
+        self._assert_same('transmission_header',
+                          TransmissionHeaderDictionaryEncoder(), _header)
+
+    def test_publisher(self):
+        self._assert_same('publisher', PublisherRecordDictionaryEncoder(),
+                          _publisher)
+
+    def test_work(self):
+        self._assert_same('work', WorkDictionaryEncoder(), _work)
+
+    def test_writer(self):
+        self._assert_same('writer', WriterRecordDictionaryEncoder(), _writer)
+
+    def test_values(self):
+        result = self._decoder.decode(_agreement)
+
+        self.assertEqual('AGR', result.record_type)
+        self.assertEqual(1234, result.transaction_sequence_n)
+        self.assertEqual(23, result.record_sequence_n)
+        self.assertEqual('C1234567890123', result.submitter_agreement_n)
+        self.assertEqual('OG', result.agreement_type)
+        self.assertEqual(datetime.date(2012, 1, 2),
+                         result.agreement_start_date)
+        self.assertEqual(datetime.date(2013, 2, 3), result.agreement_end_date)
+        self.assertEqual(1234, result.number_of_works)
+
+    def test_dictionary(self):
+        result = self._decoder.decode_dictionary(_agreement)
+
+        self.assertEqual('AGR', result['record_type'])
+        self.assertEqual('OG', result['agreement_type'])
+
+    def test_values_raw(self):
+        rule_id, values = self._decoder.decode_values(_agreement, raw=True)
+
+        self.assertEqual('agreement', rule_id)
+        self.assertEqual('20120102', values['agreement_start_date'])
+        self.assertEqual(1234, values['number_of_works'])
+
+    def test_header_short(self):
+        # The optional character set is missing
+        record = _header[:86] + '     '
+
+        result = self._decoder.decode(record)
+
+        self.assertEqual(None, result.character_set)
+        self.assertEqual('AGENCIA GRUPO MUSICAL', result.sender_name)
+
+    def test_rule_ids(self):
+        self.assertEqual(['work'], self._decoder.rule_ids('NWR'))
+        self.assertEqual([], self._decoder.rule_ids('XXX'))
+
+
+class TestFixedWidthDecodeInvalid(unittest.TestCase):
+    def setUp(self):
+        self._decoder = default_record_decoder()
+
+    def test_empty(self):
+        self.assertRaises(ParseException, self._decoder.decode, '')
+
+    def test_unknown_record(self):
+        self.assertRaises(ParseException, self._decoder.decode,
+                          'XXX' + _agreement[3:])
+
+    def test_too_long(self):
+        self.assertRaises(ParseException, self._decoder.decode,
+                          _agreement + 'ABC')
+
+    def test_too_short(self):
+        self.assertRaises(ParseException, self._decoder.decode,
+                          _agreement[:50])
+
+    def test_last_field_short(self):
+        # The last field is missing its trailing whitespaces
+        record = _agreement[:-3] + 'A '
+
+        self.assertRaises(ParseException, self._decoder.decode, record)
+
+    def test_invalid_numeric(self):
+        record = _agreement[:3] + 'A' + _agreement[4:]
+
+        self.assertRaises(ParseException, self._decoder.decode, record)
+
+    def test_invalid_date(self):
+        record = _agreement.replace('20120102', '20121302')
+
+        self.assertRaises(ParseException, self._decoder.decode, record)
+
+    def test_invalid_date_raw(self):
+        record = _agreement.replace('20120102', '20121302')
+
+        self.assertRaises(ParseException, self._decoder.decode_values, record,
+                          raw=True)
+
+    def test_invalid_lookup(self):
+        record = _agreement.replace('OG2012', 'XX2012')
+
+        self.assertRaises(ParseException, self._decoder.decode, record)
+
+    def test_error_column(self):
+        record = _agreement.replace('20120102', '20121302')
+
+        with self.assertRaises(ParseException) as context:
+            self._decoder.decode(record)
+
+        self.assertEqual(record.find('20121302'), context.exception.loc)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import unittest
+import time
+
+from cwr.parser.decoder.file import default_record_decoder, \
+    default_grammar_factory
+from tests.parser.file.decoder.test_fixed import _agreement, _publisher, \
+    _work, _writer
+
+"""
+Compares the times of the fixed-width decoder and the grammar rules.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestFixedWidthDecoderTimes(unittest.TestCase):
+    def setUp(self):
+        self._decoder = default_record_decoder()
+        self._grammar = default_grammar_factory()
+
+        self._records = [('agreement', _agreement),
+                         ('publisher', _publisher),
+                         ('work', _work),
+                         ('writer', _writer)]
+
+    def test_1000(self):
+        rules = [(self._grammar.get_rule(rule_id), record)
+                 for rule_id, record in self._records]
+
+        start = time.perf_counter()
+        for x in range(250):
+            for rule, record in rules:
+                rule.parseString(record)
+        end = time.perf_counter()
+
+        time_grammar = (end - start)
+
+        start = time.perf_counter()
+        for x in range(250):
+            for rule_id, record in self._records:
+                self._decoder.decode(record)
+        end = time.perf_counter()
+
+        time_fixed = (end - start)
+
+        self.assertTrue(time_fixed < time_grammar)
+        self.assertTrue(time_fixed < 1)
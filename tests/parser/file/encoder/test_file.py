@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+import unittest
+
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_file_stream_decoder, default_record_decoder
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from cwr.parser.encoder.file import default_file_encoder, \
+    default_record_encoder
+from cwr.transmission import TransmissionHeader
+from tests.parser.file.decoder.test_file import _two_groups
+from tests.parser.file.decoder.test_fixed import _agreement, _publisher, \
+    _writer
+
+"""
+CWR file encoder tests.
+
+The following cases are tested:
+- Encoded files are decoded back into the same transmission
+- Records are written as fixed-width lines
+- Lines are written to a stream
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestFileEncodeValid(unittest.TestCase):
+    def setUp(self):
+        self._encoder = default_file_encoder()
+        self._decoder = default_file_decoder()
+
+        data = {}
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = _two_groups()
+
+        self._file = self._decoder.decode(data)
+
+    def test_round_trip(self):
+        encoder = FileDictionaryEncoder()
+
+        data = {}
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = self._encoder.encode(self._file)
+
+        result = self._decoder.decode(data)
+
+        self.assertEqual(encoder.encode(self._file), encoder.encode(result))
+
+    def test_lines(self):
+        lines = list(self._encoder.lines(self._file))
+
+        self.assertEqual(len(_two_groups().split('\n')), len(lines))
+        self.assertEqual('HDR', lines[0][:3])
+        self.assertEqual('GRH', lines[1][:3])
+        self.assertEqual('TRL', lines[-1][:3])
+
+    def test_line_separator(self):
+        result = self._encoder.encode(self._file.transmission)
+
+        self.assertTrue(result.endswith('\r\n'))
+        self.assertEqual(len(_two_groups().split('\n')),
+                         result.count('\r\n'))
+
+    def test_write(self):
+        stream = io.StringIO()
+
+        self._encoder.write(self._file, stream)
+
+        self.assertEqual(self._encoder.encode(self._file), stream.getvalue())
+
+    def test_write_stream_decoder(self):
+        stream = io.StringIO()
+
+        self._encoder.write(self._file, stream)
+        stream.seek(0)
+
+        data = {}
+        data['filename'] = 'CW12012311_22.V21'
+        data['contents'] = stream
+
+        result = default_file_stream_decoder().decode(data)
+
+        self.assertEqual(2, len(result.transmission.groups))
+
+
+class TestRecordEncodeValid(unittest.TestCase):
+    def setUp(self):
+        self._encoder = default_record_encoder()
+        self._decoder = default_record_decoder()
+
+    def test_agreement(self):
+        record = self._decoder.decode(_agreement)
+
+        self.assertEqual(_agreement, self._encoder.encode(record))
+
+    def test_publisher(self):
+        record = self._decoder.decode(_publisher)
+
+        self.assertEqual(_publisher, self._encoder.encode(record))
+
+    def test_writer(self):
+        record = self._decoder.decode(_writer)
+
+        self.assertEqual(_writer, self._encoder.encode(record))
+
+    def test_header(self):
+        header = TransmissionHeader(record_type='HDR',
+                                    sender_id=226144593,
+                                    sender_name='AGENCIA GRUPO MUSICAL',
+                                    sender_type='PB',
+                                    creation_date_time=datetime.datetime(
+                                        2013, 8, 9, 2, 59, 11),
+                                    transmission_date=datetime.date(
+                                        2013, 8, 9),
+                                    edi_standard='01.10')
+
+        result = self._encoder.encode(header)
+
+        self.assertEqual(101, len(result))
+        self.assertEqual('HDRPB226144593AGENCIA GRUPO MUSICAL', result[:35])
+        self.assertEqual('01.102013080902591120130809', result[59:86])
+
+
+class TestRecordEncodeInvalid(unittest.TestCase):
+    def setUp(self):
+        self._encoder = default_record_encoder()
+
+    def test_too_long(self):
+        values = default_record_decoder().decode_dictionary(_agreement)
+        values['submitter_agreement_n'] = 'A' * 20
+
+        self.assertRaises(ValueError, self._encoder.encode_dictionary, values)
+
+    def test_unknown_record(self):
+        self.assertRaises(ValueError, self._encoder.encode_dictionary,
+                          {'record_type': 'XXX'})
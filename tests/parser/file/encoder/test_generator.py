@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+
+from cwr.parser.decoder.file import default_file_automaton_decoder, \
+    default_file_decoder
+from cwr.parser.encoder.file import default_file_encoder
+from cwr.utils.generator import default_file_generator
+from cwr.utils.validator import StreamValidator
+
+"""
+Synthetic CWR file generator tests.
+
+The following cases are tested:
+- Generated files are decoded by the grammar and the automaton decoders
+- Generated files pass all the validation rules, including the shares
+- Decoded files are encoded back into the same lines
+- The same seed generates the same file
+- The trailers contain the number of groups, transactions and records
+- Each record type has a single length
+- The transaction types and the size requested are respected
+- Lines are written to a stream
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _decode(decoder, lines):
+    data = {}
+    data['filename'] = 'CW150001PB_SO.V21'
+    data['contents'] = '\r\n'.join(lines) + '\r\n'
+
+    return decoder.decode(data)
+
+
+class TestFileGeneratorDecoded(unittest.TestCase):
+    def setUp(self):
+        self._grammar_decoder = default_file_decoder()
+        self._automaton_decoder = default_file_automaton_decoder()
+
+    def test_grammar(self):
+        for seed in range(3):
+            lines = list(default_file_generator(seed).lines(150))
+
+            transmission = _decode(self._grammar_decoder, lines).transmission
+
+            self.assertEqual(4, len(transmission.groups))
+            self.assertEqual(len(lines), transmission.trailer.record_count)
+
+    def test_encoded(self):
+        lines = list(default_file_generator(5).lines(3000))
+
+        transmission = _decode(self._automaton_decoder, lines).transmission
+        encoded = list(default_file_encoder().lines(transmission))
+
+        self.assertEqual(len(lines), len(encoded))
+        for line, result in zip(lines, encoded):
+            # The model does not keep the publisher name of the PWR records
+            if line[:3] != 'PWR':
+                self.assertEqual(line, result)
+
+    def test_automaton(self):
+        for seed in range(10):
+            lines = list(default_file_generator(seed).lines(300))
+
+            transmission = _decode(self._automaton_decoder,
+                                   lines).transmission
+
+            self.assertEqual(4, len(transmission.groups))
+            self.assertEqual(len(lines), transmission.trailer.record_count)
+
+    def test_validated(self):
+        for seed in range(3):
+            validator = StreamValidator()
+            decoder = default_file_automaton_decoder(validator=validator)
+
+            _decode(decoder, default_file_generator(seed).lines(5000))
+
+            self.assertEqual({}, validator.counts)
+
+    def test_transaction_types(self):
+        lines = default_file_generator(1).lines(200, {'AGR': 1, 'ACK': 1,
+                                                      'REV': 1})
+
+        transmission = _decode(self._automaton_decoder, lines).transmission
+
+        types = [group.group_header.transaction_type
+                 for group in transmission.groups]
+        self.assertEqual(['AGR', 'ACK', 'REV'], types)
+
+        for group in transmission.groups:
+            transaction_type = group.group_header.transaction_type
+            for transaction in group.transactions:
+                self.assertEqual(transaction_type,
+                                 transaction[0].record_type)
+
+
+class TestFileGeneratorLines(unittest.TestCase):
+    def test_same_seed(self):
+        first = list(default_file_generator(7).lines(500))
+        second = list(default_file_generator(7).lines(500))
+
+        self.assertEqual(first, second)
+
+    def test_different_seed(self):
+        first = list(default_file_generator(7).lines(500))
+        second = list(default_file_generator(8).lines(500))
+
+        self.assertNotEqual(first, second)
+
+    def test_size(self):
+        lines = list(default_file_generator(3).lines(2000))
+
+        self.assertTrue(2000 <= len(lines) < 2200)
+
+    def test_mix(self):
+        lines = list(default_file_generator(3).lines(2000, {'NWR': 3,
+                                                           'AGR': 1}))
+
+        groups = [i for i, line in enumerate(lines) if line[:3] == 'GRH']
+
+        self.assertEqual(2, len(groups))
+        self.assertEqual('NWR', lines[groups[0]][3:6])
+        self.assertEqual('AGR', lines[groups[1]][3:6])
+
+        # The first group takes three times the records of the second
+        first = groups[1] - groups[0]
+        second = len(lines) - 1 - groups[1]
+        self.assertTrue(2.5 < first / float(second) < 3.5)
+
+    def test_trailers(self):
+        lines = list(default_file_generator(5).lines(1000))
+
+        group_records = 0
+        transactions = 0
+        total_transactions = 0
+        for line in lines[1:-1]:
+            record_type = line[:3]
+            group_records += 1
+
+            if record_type == 'GRH':
+                group_records = 1
+                transactions = 0
+            elif record_type == 'GRT':
+                self.assertEqual(transactions, int(line[8:16]))
+                self.assertEqual(group_records, int(line[16:24]))
+                total_transactions += transactions
+            elif line[11:19] == '00000000':
+                # First record of a transaction
+                transactions += 1
+
+        trailer = lines[-1]
+        self.assertEqual('TRL', trailer[:3])
+        self.assertEqual(4, int(trailer[3:8]))
+        self.assertEqual(total_transactions, int(trailer[8:16]))
+        self.assertEqual(len(lines), int(trailer[16:24]))
+
+    def test_record_lengths(self):
+        lengths = {}
+        for line in default_file_generator(1).lines(20000):
+            lengths.setdefault(line[:3], set()).add(len(line))
+
+        for record_type, values in lengths.items():
+            self.assertEqual(1, len(values), record_type)
+
+    def test_sequences(self):
+        lines = list(default_file_generator(2).lines(500))
+
+        transaction_n = -1
+        record_n = -1
+        for line in lines:
+            if line[:3] in ('HDR', 'GRH', 'GRT', 'TRL'):
+                if line[:3] == 'GRH':
+                    transaction_n = -1
+                continue
+
+            if line[11:19] == '00000000':
+                transaction_n += 1
+                record_n = 0
+            else:
+                record_n += 1
+
+            self.assertEqual(transaction_n, int(line[3:11]))
+            self.assertEqual(record_n, int(line[11:19]))
+
+
+class TestFileGeneratorWrite(unittest.TestCase):
+    def test_write(self):
+        generator = default_file_generator(4)
+        stream = io.StringIO()
+
+        count = generator.write(stream, 300)
+
+        lines = list(default_file_generator(4).lines(300))
+        self.assertEqual(len(lines), count)
+        self.assertEqual('\r\n'.join(lines) + '\r\n', stream.getvalue())
+
+    def test_write_line_end(self):
+        stream = io.StringIO()
+
+        default_file_generator(4).write(stream, 100, line_end='\n')
+
+        self.assertNotIn('\r', stream.getvalue())
+        self.assertEqual(stream.getvalue().count('\n'),
+                         len(list(default_file_generator(4).lines(100))))
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+import unittest
+
+from cwr.acknowledgement import MessageRecord
+from cwr.parser.decoder.file import default_file_automaton_decoder
+from cwr.utils.acknowledgement import Acknowledgement, \
+    default_acknowledgement_generator
+from cwr.utils.generator import default_file_generator
+from cwr.utils.validator import StreamValidator
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+Acknowledgement generator tests.
+
+The following cases are tested:
+- Each transaction is answered with an ACK transaction
+- The status and messages are taken from the callback
+- The sequence numbers and trailer counts are correct
+- The file can be decoded back
+- Decoded files and streams of events are acknowledged the same way
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+_creation = datetime.datetime(2014, 1, 2, 3, 4, 5)
+
+
+def _data(contents):
+    data = {}
+    data['filename'] = 'CW12012311_22.V21'
+    data['contents'] = contents
+
+    return data
+
+
+def _message(text):
+    return MessageRecord(message_type='T', message_level='T',
+                         validation_n='003', message_text=text,
+                         message_record_type='NWR')
+
+
+def _status(group_header, transaction):
+    if transaction[0].record_type == 'NWR':
+        return Acknowledgement('RJ', [_message('INSTRUMENTATION REQUIRED'),
+                                      _message('TITLE REQUIRED')],
+                               recipient_creation_n='SOC0001')
+    else:
+        return 'AS'
+
+
+class TestAcknowledgementGenerator(unittest.TestCase):
+    def setUp(self):
+        self._generator = default_acknowledgement_generator(226144593,
+                                                            'SOCIETY')
+        self._decoder = default_file_automaton_decoder()
+        self._submission = self._decoder.decode(_data(_two_groups()))
+
+    def _lines(self, callback=_status):
+        return list(self._generator.lines(self._submission, callback,
+                                          creation_date_time=_creation))
+
+    def test_structure(self):
+        lines = self._lines()
+
+        self.assertEqual(['HDR', 'GRH',
+                          'ACK', 'AGR',
+                          'ACK', 'AGR',
+                          'ACK', 'MSG', 'MSG', 'NWR',
+                          'ACK', 'MSG', 'MSG', 'NWR',
+                          'GRT', 'TRL'], [line[:3] for line in lines])
+        self.assertEqual('GRHACK00001', lines[1][:11])
+        self.assertEqual('GRT000010000000400000014', lines[-2][:24])
+        self.assertEqual('TRL000010000000400000016', lines[-1][:24])
+
+    def test_sequences(self):
+        lines = self._lines()
+
+        self.assertEqual([(0, 0), (0, 1),
+                          (1, 0), (1, 1),
+                          (2, 0), (2, 1), (2, 2), (2, 3),
+                          (3, 0), (3, 1), (3, 2), (3, 3)],
+                         [(int(line[3:11]), int(line[11:19]))
+                          for line in lines[2:-2]])
+
+    def test_stats(self):
+        self._lines()
+
+        self.assertEqual({'transactions': 4, 'records': 16, 'messages': 4,
+                          'statuses': {'AS': 2, 'RJ': 2}},
+                         self._generator.stats.as_dict())
+
+    def test_decode(self):
+        validator = StreamValidator()
+        decoder = default_file_automaton_decoder(validator=validator)
+
+        result = decoder.decode(_data(self._lines()))
+
+        self.assertTrue(validator.valid)
+
+        transmission = result.transmission
+        self.assertEqual(226144593, transmission.header.sender_id)
+        self.assertEqual(_creation, transmission.header.creation_date_time)
+
+        group = transmission.groups[0]
+        self.assertEqual('ACK', group.group_header.transaction_type)
+
+        acknowledgement = group.transactions[2][0]
+        # The sample file uses the same id for both groups
+        self.assertEqual(1, acknowledgement.original_group_id)
+        self.assertEqual(199,
+                         acknowledgement.original_transaction_sequence_n)
+        self.assertEqual('NWR', acknowledgement.original_transaction_type)
+        self.assertEqual('RJ', acknowledgement.transaction_status)
+        self.assertEqual('WORK NAME', acknowledgement.creation_title)
+        self.assertEqual('1450455', acknowledgement.submitter_creation_n)
+        self.assertEqual('SOC0001', acknowledgement.recipient_creation_n)
+        self.assertEqual(datetime.datetime(2013, 8, 9, 2, 59, 11),
+                         acknowledgement.creation_date_time)
+        self.assertEqual(_creation.date(), acknowledgement.processing_date)
+
+        message = group.transactions[2][2]
+        self.assertEqual('TITLE REQUIRED', message.message_text)
+
+        agreement = group.transactions[0][0]
+        self.assertEqual('00023683606100', agreement.submitter_creation_n)
+
+    def test_callback(self):
+        received = []
+
+        def callback(group_header, transaction):
+            received.append((group_header.transaction_type,
+                             transaction[0].record_type, len(transaction)))
+            return 'AS'
+
+        self._lines(callback)
+
+        self.assertEqual([('AGR', 'AGR', 4), ('AGR', 'AGR', 4),
+                          ('NWR', 'NWR', 10), ('NWR', 'NWR', 10)], received)
+
+    def test_submission_not_changed(self):
+        self._lines()
+
+        work = self._submission.transmission.groups[1].transactions[1][0]
+        self.assertEqual((199, 0), (work.transaction_sequence_n,
+                                    work.record_sequence_n))
+
+    def test_returned_records(self):
+        def callback(group_header, transaction):
+            work = transaction[0]
+            if work.record_type == 'NWR':
+                return Acknowledgement('AS', records=[work])
+            return 'AS'
+
+        lines = self._lines(callback)
+
+        self.assertEqual(['ACK', 'AGR', 'ACK', 'AGR', 'ACK', 'NWR', 'ACK',
+                          'NWR'], [line[:3] for line in lines[2:-2]])
+        self.assertEqual('NWR0000000300000001', lines[-3][:19])
+
+    def test_events(self):
+        events = self._decoder.events(_two_groups().splitlines())
+
+        lines = list(self._generator.lines(events, _status,
+                                           creation_date_time=_creation))
+
+        self.assertEqual(self._lines(), lines)
+
+    def test_write(self):
+        output = io.StringIO()
+
+        stats = self._generator.write(self._submission, output, _status,
+                                      creation_date_time=_creation,
+                                      line_separator='\n')
+
+        self.assertEqual(16, stats.records)
+        self.assertEqual('\n'.join(self._lines()) + '\n', output.getvalue())
+
+
+class TestAcknowledgementGeneratorGenerated(unittest.TestCase):
+    def test_generated(self):
+        lines = list(default_file_generator(11).lines(5000))
+        decoder = default_file_automaton_decoder()
+        generator = default_acknowledgement_generator(226144593, 'SOCIETY')
+
+        output = io.StringIO()
+        stats = generator.write(decoder.events(lines), output,
+                                lambda group_header, transaction: 'AS')
+
+        # Acknowledgements on the submission are not answered
+        answered = [value for piece, value in decoder.events(lines)
+                    if piece == 'transaction' and
+                    value[0].record_type != 'ACK']
+        self.assertEqual(len(answered), stats.transactions)
+
+        validator = StreamValidator()
+        result = default_file_automaton_decoder(validator=validator).decode(
+            _data(output.getvalue()))
+
+        self.assertTrue(validator.valid)
+        self.assertEqual(stats.transactions,
+                         result.transmission.trailer.transaction_count)
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from cwr.parser.decoder.file import default_file_stream_decoder, \
+    default_filename_decoder
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from cwr.utils.batch import BatchDecoder, find_files, main, order_files
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+Batch decoder tests.
+
+The following cases are tested:
+- Files are found on folders and with glob patterns
+- Files are ordered by sender, year and sequence number
+- Each file is decoded, and written as JSON
+- Invalid files, or any other error, are reported without stopping the batch
+- Files can be decoded on a pool of processes
+- The command writes the batch report
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _invalid():
+    return _two_groups().replace('TER0000000000000000I2136',
+                                 'TER0000000000000000X2136')
+
+
+class _FailingDecoder(object):
+    """
+    Decoder failing with an unexpected error on the files of a sender.
+    """
+
+    def __init__(self):
+        self._decoder = default_file_stream_decoder()
+
+    def decode(self, data):
+        if 'CC_DD' in data['filename']:
+            raise KeyError('unexpected')
+        return self._decoder.decode(data)
+
+
+class _BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._input = os.path.join(self._directory, 'input')
+        self._output = os.path.join(self._directory, 'output')
+        os.makedirs(self._input)
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def _write(self, name, contents=None):
+        if contents is None:
+            contents = _two_groups()
+
+        path = os.path.join(self._input, name)
+        with open(path, 'w', encoding='latin-1') as stream:
+            stream.write(contents)
+
+        return path
+
+
+class TestFindFiles(_BatchTestCase):
+    def test_folder(self):
+        self._write('CW120001AA_BB.V21')
+        self._write('CW120002AA_BB.V21')
+        self._write('.hidden')
+
+        self.assertEqual(['CW120001AA_BB.V21', 'CW120002AA_BB.V21'],
+                         [os.path.basename(path)
+                          for path in find_files([self._input])])
+
+    def test_recursive(self):
+        os.makedirs(os.path.join(self._input, 'sub'))
+        self._write('CW120001AA_BB.V21')
+        self._write(os.path.join('sub', 'CW120002AA_BB.V21'))
+
+        self.assertEqual(1, len(find_files([self._input])))
+        self.assertEqual(2, len(find_files([self._input], recursive=True)))
+
+    def test_glob(self):
+        self._write('CW120001AA_BB.V21')
+        self._write('notes.txt')
+
+        paths = find_files([os.path.join(self._input, '*.V21'),
+                            os.path.join(self._input, 'CW*')])
+
+        self.assertEqual(['CW120001AA_BB.V21'],
+                         [os.path.basename(path) for path in paths])
+
+
+class TestOrderFiles(unittest.TestCase):
+    def test_order(self):
+        paths = ['notes.txt',
+                 'CW130001BB_SO.V21',
+                 'CW130002AA_SO.V21',
+                 'CW120010AA_SO.V21',
+                 'CW130001AA_SO.V21']
+
+        self.assertEqual(['CW120010AA_SO.V21',
+                          'CW130001AA_SO.V21',
+                          'CW130002AA_SO.V21',
+                          'CW130001BB_SO.V21',
+                          'notes.txt'],
+                         order_files(paths, default_filename_decoder()))
+
+
+class TestBatchDecoder(_BatchTestCase):
+    def test_decode(self):
+        paths = [self._write('CW120002AA_BB.V21'),
+                 self._write('CW120001AA_BB.V21')]
+
+        reports = []
+        report = BatchDecoder(max_workers=0, output_dir=self._output).decode(
+            paths, reports.append)
+
+        self.assertEqual(['CW120001AA_BB.V21', 'CW120002AA_BB.V21'],
+                         [file_report.file_name
+                          for file_report in report.files])
+        self.assertEqual(2, len(reports))
+        self.assertEqual(0, report.invalid)
+        self.assertEqual(68, report.records)
+
+        file_report = report.files[0]
+        self.assertTrue(file_report.valid)
+        self.assertEqual(2, file_report.groups)
+        self.assertEqual(4, file_report.transactions)
+        self.assertEqual(34, file_report.records)
+        self.assertEqual(os.path.getsize(paths[1]), file_report.bytes)
+
+    def test_json_output(self):
+        path = self._write('CW120001AA_BB.V21')
+
+        report = BatchDecoder(max_workers=0, output_dir=self._output).decode(
+            [path])
+
+        output = report.files[0].output
+        self.assertEqual(os.path.join(self._output, 'CW120001AA_BB.V21.json'),
+                         output)
+        self.assertEqual(['CW120001AA_BB.V21.json'],
+                         os.listdir(self._output))
+
+        data = {}
+        data['filename'] = 'CW120001AA_BB.V21'
+        data['contents'] = _two_groups()
+        expected = FileDictionaryEncoder().encode(
+            default_file_stream_decoder().decode(data))
+
+        with open(output, encoding='utf-8') as stream:
+            result = json.load(stream)
+
+        self.assertEqual(len(expected['transmission']['groups']),
+                         len(result['transmission']['groups']))
+        self.assertEqual(expected['tag']['sender'], result['tag']['sender'])
+
+    def test_invalid(self):
+        paths = [self._write('CW120001AA_BB.V21', _invalid()),
+                 self._write('CW120002AA_BB.V21'),
+                 os.path.join(self._input, 'CW120003AA_BB.V21')]
+
+        report = BatchDecoder(max_workers=0, output_dir=self._output).decode(
+            paths)
+
+        self.assertEqual(2, report.invalid)
+        self.assertEqual(34, report.records)
+
+        invalid = report.files[0]
+        self.assertFalse(invalid.valid)
+        self.assertIn('ParseException', invalid.error)
+        self.assertIsNone(invalid.output)
+
+        self.assertIn('FileNotFoundError', report.files[2].error)
+
+        self.assertEqual(['CW120002AA_BB.V21.json'],
+                         os.listdir(self._output))
+
+    def test_unexpected_error(self):
+        paths = [self._write('CW120001CC_DD.V21'),
+                 self._write('CW120002AA_BB.V21')]
+
+        report = BatchDecoder(_FailingDecoder, max_workers=0).decode(paths)
+
+        self.assertEqual(1, report.invalid)
+        self.assertEqual(34, report.records)
+        self.assertIn('KeyError', [file_report for file_report in
+                                   report.files
+                                   if not file_report.valid][0].error)
+
+    def test_process_pool(self):
+        paths = [self._write('CW1200%02dAA_BB.V21' % i) for i in range(6)]
+        paths.append(self._write('CW120099AA_BB.V21', _invalid()))
+
+        reports = []
+        report = BatchDecoder(max_workers=2).decode(paths, reports.append)
+
+        self.assertEqual(7, len(reports))
+        self.assertEqual([os.path.basename(path) for path in paths],
+                         [file_report.file_name
+                          for file_report in report.files])
+        self.assertEqual(1, report.invalid)
+        self.assertEqual(6 * 34, report.records)
+        self.assertEqual(2, report.as_dict()['workers'])
+
+
+class TestBatchCommand(_BatchTestCase):
+    def _main(self, argv):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            status = main(argv)
+
+        return status, stdout.getvalue()
+
+    def test_report(self):
+        self._write('CW120001AA_BB.V21')
+        self._write('CW120002AA_BB.V21')
+
+        status, out = self._main(['-w', '0', '-o', self._output,
+                                  self._input])
+
+        self.assertEqual(0, status)
+        self.assertIn('CW120001AA_BB.V21: 34 records', out)
+        self.assertIn('Decoded 2 files (0 invalid)', out)
+
+        with open(os.path.join(self._output, 'report.json'),
+                  encoding='utf-8') as stream:
+            report = json.load(stream)
+
+        self.assertEqual(2, report['files'])
+        self.assertEqual(68, report['records'])
+        self.assertEqual(2, len(report['reports']))
+        self.assertTrue(report['records_per_second'] > 0)
+
+        self.assertEqual(['CW120001AA_BB.V21.json', 'CW120002AA_BB.V21.json',
+                          'report.json'], sorted(os.listdir(self._output)))
+
+    def test_no_json(self):
+        self._write('CW120001AA_BB.V21')
+
+        status, out = self._main(['-w', '0', '-q', '--no-json', '-o',
+                                  self._output, self._input])
+
+        self.assertEqual(0, status)
+        self.assertNotIn('CW120001AA_BB.V21:', out)
+        self.assertEqual(['report.json'], os.listdir(self._output))
+
+    def test_invalid_status(self):
+        self._write('CW120001AA_BB.V21', _invalid())
+
+        status, out = self._main(['-w', '0', self._input])
+
+        self.assertEqual(1, status)
+        self.assertIn('CW120001AA_BB.V21: invalid', out)
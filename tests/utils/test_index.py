@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cwr.parser.decoder.file import default_file_automaton_decoder, \
+    default_file_stream_decoder
+from cwr.utils.generator import default_file_generator
+from cwr.utils.index import IndexEntry, TransmissionIndex, normalize
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+Transmission index tests.
+
+The following cases are tested:
+- Codes are found on the records containing them
+- Codes are normalized
+- Files added again replace their previous entries
+- Files can be removed
+- Several codes can be found at once
+- The index is kept on disk
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _decode(contents):
+    data = {}
+    data['filename'] = 'CW12012311_22.V21'
+    data['contents'] = contents
+
+    return default_file_stream_decoder().decode(data)
+
+
+class TestTransmissionIndexLookup(unittest.TestCase):
+    def setUp(self):
+        self._file = _decode(_two_groups())
+
+        self._index = TransmissionIndex()
+        self._index.add('CW12012311_22.V21', self._file)
+
+    def tearDown(self):
+        self._index.close()
+
+    def test_files(self):
+        self.assertEqual(['CW12012311_22.V21'], self._index.files)
+
+    def test_submitter_work_n(self):
+        entries = self._index.lookup('submitter_work_n', '1450455')
+
+        self.assertEqual(2, len(entries))
+        self.assertEqual(IndexEntry('CW12012311_22.V21', 1, 0, 0, 'NWR',
+                                    'submitter_work_n', 'submitter_work_n',
+                                    '1450455'), entries[0])
+        self.assertEqual(1, entries[1].transaction_n)
+
+    def test_ipi_name_n_agreement(self):
+        entries = self._index.lookup('ipi_name_n', 261661375)
+
+        self.assertEqual(2, len(entries))
+        self.assertEqual((0, 0, 2), (entries[0].group_n,
+                                     entries[0].transaction_n,
+                                     entries[0].record_n))
+        self.assertEqual('IPA', entries[0].record_type)
+        self.assertEqual('ipi_name_n', entries[0].field)
+
+    def test_ipi_name_n_publisher(self):
+        entries = self._index.lookup('ipi_name_n', '00510173404')
+
+        self.assertEqual(2, len(entries))
+        self.assertEqual('SPU', entries[0].record_type)
+        self.assertEqual('publisher.ipi_name_n', entries[0].field)
+
+    def test_ipi_name_n_writer(self):
+        entries = self._index.lookup('ipi_name_n', '260583078')
+
+        self.assertEqual(['writer.ipi_name_n'] * 2,
+                         [entry.field for entry in entries])
+
+    def test_shared_ipi_name_n(self):
+        # The same party appears on the agreements and the works
+        entries = self._index.lookup('ipi_name_n', 250165006)
+
+        self.assertEqual(set(['IPA', 'SPU']),
+                         set(entry.record_type for entry in entries))
+
+    def test_not_found(self):
+        self.assertEqual([], self._index.lookup('iswc', 'T0345246801'))
+
+    def test_empty_values_not_indexed(self):
+        self.assertEqual([], self._index.lookup('ipi_name_n', 0))
+        self.assertEqual([], self._index.lookup('ipi_name_n', None))
+
+    def test_lookup_many(self):
+        result = self._index.lookup_many('ipi_name_n',
+                                         [510173404, '250165006', 1])
+
+        self.assertEqual(2, len(result[510173404]))
+        self.assertEqual(4, len(result['250165006']))
+        self.assertNotIn(1, result)
+
+    def test_invalid_key_type(self):
+        self.assertRaises(ValueError, self._index.lookup, 'title', 'A')
+
+
+class TestTransmissionIndexUpdate(unittest.TestCase):
+    def setUp(self):
+        self._index = TransmissionIndex()
+        self._file = _decode(_two_groups())
+
+    def tearDown(self):
+        self._index.close()
+
+    def test_several_files(self):
+        self._index.add('CW120001AA_BB.V21', self._file)
+        self._index.add('CW120002AA_BB.V21', self._file)
+
+        entries = self._index.lookup('submitter_work_n', '1450455')
+
+        self.assertEqual(['CW120001AA_BB.V21'] * 2 + ['CW120002AA_BB.V21'] * 2,
+                         [entry.file_name for entry in entries])
+
+    def test_replace(self):
+        self._index.add('CW120001AA_BB.V21', self._file)
+
+        revised = _decode(_two_groups().replace('1450455', '1450456'))
+        self._index.add('CW120001AA_BB.V21', revised)
+
+        self.assertEqual(['CW120001AA_BB.V21'], self._index.files)
+        self.assertEqual([], self._index.lookup('submitter_work_n',
+                                                '1450455'))
+        self.assertEqual(2, len(self._index.lookup('submitter_work_n',
+                                                   '1450456')))
+
+    def test_remove(self):
+        self._index.add('CW120001AA_BB.V21', self._file)
+        self._index.add('CW120002AA_BB.V21', self._file)
+
+        self._index.remove('CW120001AA_BB.V21')
+
+        self.assertEqual(['CW120002AA_BB.V21'], self._index.files)
+        self.assertEqual(2, len(self._index.lookup('submitter_work_n',
+                                                   '1450455')))
+
+    def test_generated(self):
+        data = {}
+        data['filename'] = 'CW150001PB_SO.V21'
+        data['contents'] = list(default_file_generator(3).lines(2000))
+
+        cwr_file = default_file_automaton_decoder().decode(data)
+
+        count = self._index.add('CW150001PB_SO.V21', cwr_file)
+
+        self.assertTrue(count > 0)
+
+        works = [record for group in cwr_file.transmission.groups
+                 for transaction in group.transactions
+                 for record in transaction if record.record_type == 'NWR']
+
+        values = [work.iswc for work in works if work.iswc]
+        result = self._index.lookup_many('iswc', values)
+
+        self.assertEqual(set(values), set(result))
+
+
+class TestTransmissionIndexPersistent(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_reopen(self):
+        path = os.path.join(self._directory, 'index.db')
+
+        with TransmissionIndex(path) as index:
+            index.add('CW12012311_22.V21', _decode(_two_groups()))
+
+        with TransmissionIndex(path) as index:
+            self.assertEqual(['CW12012311_22.V21'], index.files)
+            self.assertEqual(2, len(index.lookup('submitter_work_n',
+                                                 '1450455')))
+
+
+class TestNormalize(unittest.TestCase):
+    def test_ipi_name_n(self):
+        self.assertEqual('00014107338', normalize('ipi_name_n', 14107338))
+        self.assertEqual('00014107338', normalize('ipi_name_n',
+                                                  '00014107338'))
+        self.assertIsNone(normalize('ipi_name_n', 0))
+        self.assertIsNone(normalize('ipi_name_n', 'ABC'))
+
+    def test_iswc(self):
+        self.assertEqual('T0345246801', normalize('iswc', 'T-034.524.680-1'))
+        self.assertEqual('T0345246801', normalize('iswc', 't0345246801'))
+
+    def test_ipi_base_n(self):
+        self.assertEqual('I-000000229-7', normalize('ipi_base_n',
+                                                    'i-000000229-7 '))
+
+    def test_empty(self):
+        self.assertIsNone(normalize('submitter_work_n', '  '))
+        self.assertIsNone(normalize('iswc', None))
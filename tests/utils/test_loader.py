@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.utils.generator import default_file_generator
+from cwr.utils.loader import default_sqlite_loader
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+SQLite loader tests.
+
+The following cases are tested:
+- Each record is written on the table for its record type
+- Records refer to their file, group and transaction
+- Dates and times are stored in the ISO format
+- Small batches and database transactions load the same rows
+- Several files can be loaded on the same database
+- Invalid files are rejected, and their rows removed
+- The status of each file is stored
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _count(connection, table):
+    return connection.execute('SELECT COUNT(*) FROM "%s"' %
+                              table).fetchone()[0]
+
+
+class TestSQLiteLoader(unittest.TestCase):
+    def setUp(self):
+        self._loader = default_sqlite_loader(':memory:')
+        self._connection = self._loader.connection
+
+    def tearDown(self):
+        self._loader.close()
+
+    def test_stats(self):
+        stats = self._loader.load('CW12012311_22.V21', _two_groups())
+
+        self.assertEqual(34, stats.records)
+        # File, groups and transactions rows are added to the records
+        self.assertEqual(34 + 1 + 2 + 4, stats.rows)
+        self.assertEqual(6, stats.tables['SPU'])
+        self.assertTrue(stats.rows_per_second > 0)
+
+    def test_tables(self):
+        self._loader.load('CW12012311_22.V21', _two_groups())
+
+        self.assertEqual(1, _count(self._connection, 'files'))
+        self.assertEqual(2, _count(self._connection, 'groups'))
+        self.assertEqual(4, _count(self._connection, 'transactions'))
+        self.assertEqual(1, _count(self._connection, 'HDR'))
+        self.assertEqual(2, _count(self._connection, 'AGR'))
+        self.assertEqual(4, _count(self._connection, 'IPA'))
+        self.assertEqual(6, _count(self._connection, 'SPU'))
+        self.assertEqual(1, _count(self._connection, 'TRL'))
+
+    def test_columns(self):
+        self._loader.load('CW12012311_22.V21', _two_groups())
+
+        row = self._connection.execute(
+            'SELECT title, submitter_work_n, transaction_sequence_n, '
+            '_line_n FROM NWR ORDER BY _id').fetchone()
+
+        self.assertEqual(('WORK NAME', '1450455', 199, 13), row)
+
+    def test_references(self):
+        self._loader.load('CW12012311_22.V21', _two_groups())
+
+        rows = self._connection.execute(
+            'SELECT groups.transaction_type, transactions._position, '
+            'COUNT(*) FROM SPU '
+            'JOIN transactions ON transactions._id = SPU._transaction_id '
+            'JOIN groups ON groups._id = SPU._group_id '
+            'GROUP BY SPU._transaction_id ORDER BY SPU._transaction_id'
+        ).fetchall()
+
+        self.assertEqual([('NWR', 0, 3), ('NWR', 1, 3)], rows)
+
+    def test_control_records(self):
+        self._loader.load('CW12012311_22.V21', _two_groups())
+
+        header = self._connection.execute(
+            'SELECT _group_id, _transaction_id FROM HDR').fetchone()
+        self.assertEqual((None, None), header)
+
+        trailers = self._connection.execute(
+            'SELECT _group_id, _transaction_id FROM GRT ORDER BY _id'
+        ).fetchall()
+        self.assertEqual([(1, None), (2, None)], trailers)
+
+    def test_dates(self):
+        self._loader.load('CW12012311_22.V21', _two_groups())
+
+        row = self._connection.execute(
+            'SELECT creation_date_time, transmission_date FROM HDR'
+        ).fetchone()
+
+        self.assertEqual(('2013-08-09T02:59:11', '2013-08-09'), row)
+
+    def test_small_batches(self):
+        loader = default_sqlite_loader(':memory:', batch_size=3,
+                                       commit_size=5)
+
+        stats = loader.load('CW12012311_22.V21', _two_groups())
+
+        self.assertEqual(34, stats.records)
+        self.assertEqual(6, _count(loader.connection, 'SPU'))
+        self.assertEqual(4, _count(loader.connection, 'transactions'))
+
+        loader.close()
+
+    def test_several_files(self):
+        self._loader.load('CW120001AA_BB.V21', _two_groups())
+        self._loader.load('CW120002AA_BB.V21', _two_groups())
+
+        self.assertEqual(4, _count(self._connection, 'groups'))
+        self.assertEqual(8, _count(self._connection, 'transactions'))
+
+        rows = self._connection.execute(
+            'SELECT files.name, COUNT(*) FROM NWR '
+            'JOIN transactions ON transactions._id = NWR._transaction_id '
+            'JOIN groups ON groups._id = transactions._group_id '
+            'JOIN files ON files._id = groups._file_id '
+            'GROUP BY files.name ORDER BY files.name').fetchall()
+
+        self.assertEqual([('CW120001AA_BB.V21', 2),
+                          ('CW120002AA_BB.V21', 2)], rows)
+
+    def test_generated(self):
+        lines = list(default_file_generator(6).lines(3000))
+
+        stats = self._loader.load('CW150001PB_SO.V21', lines)
+
+        self.assertEqual(len(lines), stats.records)
+
+        trailer = self._connection.execute(
+            'SELECT transaction_count, record_count FROM TRL').fetchone()
+        self.assertEqual(trailer[0],
+                         _count(self._connection, 'transactions'))
+        self.assertEqual(trailer[1], stats.records)
+
+    def test_invalid_record(self):
+        contents = _two_groups().replace('TER0000000000000000I2136',
+                                         'TER0000000000000000X2136')
+
+        self.assertRaises(ParseException, self._loader.load,
+                          'CW12012311_22.V21', contents)
+
+        self.assertEqual([('CW12012311_22.V21', 'failed')],
+                         self._connection.execute(
+                             'SELECT name, status FROM files').fetchall())
+        self.assertEqual(0, _count(self._connection, 'groups'))
+
+    def test_invalid_record_committed(self):
+        lines = list(default_file_generator(6).lines(3000))
+        lines[2000] = lines[2000][:3] + 'X' + lines[2000][4:]
+
+        self._loader.load('CW120001AA_BB.V21', _two_groups())
+
+        loader = default_sqlite_loader(self._connection, batch_size=10,
+                                       commit_size=100)
+        self.assertRaises(ParseException, loader.load, 'CW150001PB_SO.V21',
+                          lines)
+
+        # Only the rows of the valid file are kept
+        self.assertEqual([('complete',), ('failed',)],
+                         self._connection.execute(
+                             'SELECT status FROM files ORDER BY _id'
+                         ).fetchall())
+        self.assertEqual(2, _count(self._connection, 'groups'))
+        self.assertEqual(4, _count(self._connection, 'transactions'))
+        self.assertEqual(2, _count(self._connection, 'NWR'))
+        self.assertEqual(0, self._connection.execute(
+            'SELECT COUNT(*) FROM SPU WHERE _file_id = 2').fetchone()[0])
+
+    def test_valid_after_invalid(self):
+        loader = default_sqlite_loader(':memory:', batch_size=3)
+        # Invalid record after the last group, once its tables were created
+        lines = _two_groups().split('\n')[:-1] + ['SPT0000000000000000X']
+
+        self.assertRaises(ParseException, loader.load, 'CW120001AA_BB.V21',
+                          '\n'.join(lines))
+
+        stats = loader.load('CW120002AA_BB.V21', _two_groups())
+
+        self.assertEqual(34, stats.records)
+        self.assertEqual(2, _count(loader.connection, 'GRT'))
+
+        loader.close()
+
+    def test_status(self):
+        stats = self._loader.load('CW12012311_22.V21', _two_groups())
+
+        self.assertEqual(('complete',), self._connection.execute(
+            'SELECT status FROM files WHERE _id = ?',
+            (stats.file_id,)).fetchone())
+
+    def test_delete(self):
+        first = self._loader.load('CW120001AA_BB.V21', _two_groups())
+        self._loader.load('CW120002AA_BB.V21', _two_groups())
+
+        self._loader.delete(first.file_id)
+
+        self.assertEqual(1, _count(self._connection, 'files'))
+        self.assertEqual(2, _count(self._connection, 'groups'))
+        self.assertEqual(4, _count(self._connection, 'transactions'))
+        self.assertEqual(6, _count(self._connection, 'SPU'))
+        self.assertEqual([(2,)], self._connection.execute(
+            'SELECT DISTINCT _file_id FROM HDR').fetchall())
+
+
+class TestSQLiteLoaderFile(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_reopen(self):
+        path = os.path.join(self._directory, 'cwr.db')
+
+        with default_sqlite_loader(path) as loader:
+            loader.load('CW120001AA_BB.V21', _two_groups())
+
+        with default_sqlite_loader(path) as loader:
+            loader.load('CW120002AA_BB.V21', _two_groups())
+
+            connection = loader.connection
+
+            self.assertEqual(2, _count(connection, 'files'))
+            # The ids continue after those of the first file
+            self.assertEqual([(3,), (4,)], connection.execute(
+                'SELECT _id FROM groups WHERE _file_id = 2 ORDER BY _id'
+            ).fetchall())
+            self.assertEqual([(4,)], connection.execute(
+                'SELECT DISTINCT _group_id FROM NWR WHERE _file_id = 2 '
+                'ORDER BY _group_id').fetchall())
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from cwr.parser.decoder.file import default_file_automaton_decoder, \
+    default_file_stream_decoder
+from cwr.utils.generator import default_file_generator
+from cwr.utils.validator import SHARE_RANGE, SHARE_TOTAL, StreamValidator
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+Stream validator tests.
+
+The following cases are tested:
+- The trailer counts are checked against the contents
+- The group ids and sequence numbers are checked
+- The ownership shares are checked
+- Rules can be disabled
+- The violations kept are limited
+- The decoders check the files with the validator received
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _data(contents):
+    data = {}
+    data['filename'] = 'CW12012311_22.V21'
+    data['contents'] = contents
+
+    return data
+
+
+def _events(contents):
+    return list(default_file_stream_decoder().events(contents.splitlines()))
+
+
+def _work(events):
+    # First work transaction on the sample file
+    return [value for piece, value in events if piece == 'transaction'][2]
+
+
+class TestStreamValidatorSample(unittest.TestCase):
+    """
+    The sample file has wrong counts and sequence numbers, but valid shares.
+    """
+
+    def setUp(self):
+        self._validator = StreamValidator()
+        self._parser = default_file_stream_decoder(self._validator)
+
+    def test_counts(self):
+        self._parser.decode(_data(_two_groups()))
+
+        self.assertFalse(self._validator.valid)
+        self.assertEqual({'group_id': 1,
+                          'group_transaction_count': 2,
+                          'group_record_count': 2,
+                          'transmission_transaction_count': 1,
+                          'transmission_record_count': 1,
+                          'transaction_sequence': 3,
+                          'record_sequence': 4}, self._validator.counts)
+
+    def test_trailers(self):
+        self._parser.decode(_data(_two_groups()))
+
+        violations = self._validator.violations
+
+        group = violations['group_record_count']
+        self.assertEqual(['Group record count 719 should be 10',
+                          'Group record count 719 should be 22'],
+                         [violation.message for violation in group])
+        self.assertEqual([11, 33], [violation.record_n
+                                    for violation in group])
+        self.assertEqual([0, 1], [violation.group_n for violation in group])
+
+        transmission = violations['transmission_record_count'][0]
+        self.assertEqual('Transmission record count 5703 should be 34',
+                         transmission.message)
+        self.assertIsNone(transmission.group_n)
+
+    def test_group_id(self):
+        self._parser.decode(_data(_two_groups()))
+
+        violation = self._validator.violations['group_id'][0]
+
+        self.assertEqual('Group id 1 should be 2', violation.message)
+        self.assertEqual(12, violation.record_n)
+
+    def test_sequences(self):
+        self._parser.decode(_data(_two_groups()))
+
+        violations = self._validator.violations
+
+        self.assertEqual([(7, 0, 1), (13, 1, 0), (23, 1, 1)],
+                         [(violation.record_n, violation.group_n,
+                           violation.transaction_n)
+                          for violation in violations['transaction_sequence']])
+
+        # Each error is reported once, the sequence continues after it
+        self.assertEqual([4, 8, 14, 24],
+                         [violation.record_n for violation in
+                          violations['record_sequence']])
+
+    def test_reused(self):
+        self._parser.decode(_data(_two_groups()))
+        self._parser.decode(_data(_two_groups()))
+
+        self.assertEqual(1, self._validator.counts['group_id'])
+
+    def test_automaton_decoder(self):
+        validator = StreamValidator()
+        parser = default_file_automaton_decoder(validator=validator)
+
+        parser.decode(_data(_two_groups()))
+
+        self.assertEqual(self._validator.rules, validator.rules)
+        self.assertEqual(4, validator.counts['record_sequence'])
+
+    def test_without_validator(self):
+        self.assertIsNone(default_file_stream_decoder().validator)
+        self.assertIsNone(default_file_automaton_decoder().validator)
+
+
+class TestStreamValidatorShares(unittest.TestCase):
+    def setUp(self):
+        self._validator = StreamValidator([SHARE_RANGE, SHARE_TOTAL])
+
+    def _check(self, events):
+        for _ in self._validator.check(events):
+            pass
+
+    def test_valid(self):
+        self._check(_events(_two_groups()))
+
+        self.assertTrue(self._validator.valid)
+
+    def test_publisher_range(self):
+        events = _events(_two_groups())
+        _work(events)[1].pr_ownership_share = 60.0
+
+        self._check(events)
+
+        violation = self._validator.violations[SHARE_RANGE][0]
+        self.assertEqual('SPU PR ownership share 60.0 should be between 0 '
+                         'and 50.0', violation.message)
+        self.assertEqual(14, violation.record_n)
+        self.assertEqual(1, violation.group_n)
+
+        total = self._validator.violations[SHARE_TOTAL][0]
+        self.assertEqual('Total PR ownership share 110.0 exceeds 100',
+                         total.message)
+        self.assertEqual(13, total.record_n)
+
+    def test_total(self):
+        events = _events(_two_groups())
+        _work(events)[2].mr_ownership_share = 0.05
+        _work(events)[5].sr_ownership_share = 10.0
+
+        self._check(events)
+
+        # The MR total is within the tolerance
+        self.assertEqual({SHARE_TOTAL: 1}, self._validator.counts)
+        self.assertEqual('Total SR ownership share 110.0 exceeds 100',
+                         self._validator.violations[SHARE_TOTAL][0].message)
+
+
+class TestStreamValidatorGenerated(unittest.TestCase):
+    def setUp(self):
+        self._lines = list(default_file_generator(8).lines(3000))
+
+    def _validate(self, lines, **kwargs):
+        validator = StreamValidator(**kwargs)
+        parser = default_file_automaton_decoder(validator=validator)
+
+        parser.decode(_data(lines))
+
+        return validator
+
+    def test_valid(self):
+        validator = self._validate(self._lines)
+
+        self.assertTrue(validator.valid)
+        self.assertEqual({}, validator.violations)
+
+    def test_group_trailer(self):
+        lines = list(self._lines)
+        i = next(i for i, line in enumerate(lines) if line.startswith('GRT'))
+        # Transaction count increased
+        count = int(lines[i][8:16]) + 1
+        lines[i] = lines[i][:8] + '%08d' % count + lines[i][16:]
+
+        validator = self._validate(lines)
+
+        self.assertEqual({'group_transaction_count': 1}, validator.counts)
+        self.assertEqual(i + 1, validator.violations[
+            'group_transaction_count'][0].record_n)
+
+    def test_record_sequence(self):
+        lines = list(self._lines)
+        i = next(i for i, line in enumerate(lines) if line.startswith('SPU'))
+        lines[i] = lines[i][:11] + '%08d' % 99 + lines[i][19:]
+
+        validator = self._validate(lines)
+
+        # The wrong number, and the next record after it
+        self.assertEqual({'record_sequence': 2}, validator.counts)
+
+    def test_max_violations(self):
+        lines = [line[:11] + '00000000' + line[19:]
+                 if line[:3] in ('SPU', 'SWR') else line
+                 for line in self._lines]
+
+        validator = self._validate(lines, max_violations=5)
+
+        self.assertEqual(5, len(validator.violations['record_sequence']))
+        self.assertTrue(validator.counts['record_sequence'] > 5)
+
+    def test_invalid_rule(self):
+        self.assertRaises(ValueError, StreamValidator, ['record_order'])
@@ -42,11 +42,11 @@ if __name__ == '__main__':
 
     data = {}
     data['filename'] = os.path.basename(path)
-    data['contents'] = codecs.open(path, 'r', 'latin-1').read()
+    data['path'] = path
 
-    start = time.clock()
+    start = time.perf_counter()
     data = decoder.decode(data)
-    end = time.clock()
+    end = time.perf_counter()
     time_parse = (end - start)
 
     print('Parsed the file in %s seconds' % time_parse)